@@ -0,0 +1,200 @@
+# action_metrics.py
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+def _label_value(value: str) -> str:
+    # Prometheus text format: backslash, double quote and newline must be escaped inside label values.
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_current_span: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("current_span", default=None)
+
+class ActionStats:
+    __slots__ = ("calls", "errors", "total", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, duration: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.calls if self.calls else 0.0,
+            "max_seconds": self.max,
+            "buckets": {str(bound): count for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.buckets)},
+        }
+
+class ActionMetrics:
+    def __init__(self, enabled: bool = False, trace_capacity: int = 1000):
+        self.enabled = enabled
+        self.stats: Dict[str, ActionStats] = {}
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=trace_capacity)
+        self.lock = threading.Lock()
+        self.epoch = time.perf_counter()
+        self.actions = {
+            'metrics': self.snapshot,
+            'metrics_export': self.export
+        }
+
+    def wrap(self, action_name: str, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def instrumented_async(*args: Any, **kwargs: Any) -> Any:
+                span, token, root = self._start(action_name)
+                failed = True
+                try:
+                    result = await func(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    self._finish(action_name, span, token, root, failed)
+            return instrumented_async
+
+        @functools.wraps(func)
+        def instrumented(*args: Any, **kwargs: Any) -> Any:
+            span, token, root = self._start(action_name)
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self._finish(action_name, span, token, root, failed)
+        return instrumented
+
+    def _start(self, action_name: str) -> Any:
+        parent = _current_span.get()
+        span = {"action": action_name, "start": time.perf_counter(), "duration": None, "error": False,
+                "thread": threading.get_ident(), "children": []}
+        if parent is not None:
+            parent["children"].append(span)
+        return span, _current_span.set(span), parent is None
+
+    def _finish(self, action_name: str, span: Dict[str, Any], token: contextvars.Token, root: bool, failed: bool) -> None:
+        duration = time.perf_counter() - span["start"]
+        span["duration"] = duration
+        span["error"] = failed
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Token created in another context (e.g. a coroutine finished on a different task); just clear it.
+            _current_span.set(None)
+        with self.lock:
+            stats = self.stats.get(action_name)
+            if stats is None:
+                stats = self.stats[action_name] = ActionStats()
+            stats.observe(duration, failed)
+            if root:
+                self.spans.append(span)
+
+    def snapshot(self, *args: Any, reset: bool = False, **kwargs: Any) -> Dict[str, Any]:
+        with self.lock:
+            data = {
+                "enabled": self.enabled,
+                "actions": {name: stats.to_dict() for name, stats in self.stats.items()},
+                "spans": [self._span_dict(span) for span in self.spans],
+            }
+            if reset:
+                self.stats.clear()
+                self.spans.clear()
+        return data
+
+    def _span_dict(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "action": span["action"],
+            "start": span["start"] - self.epoch,
+            "duration": span["duration"],
+            "error": span["error"],
+            "children": [self._span_dict(child) for child in span["children"] if child["duration"] is not None],
+        }
+
+    def export(self, *args: Any, format: str = "prometheus", path: Optional[str] = None, **kwargs: Any) -> str:
+        if format == "prometheus":
+            content = self.to_prometheus()
+        elif format == "chrome":
+            content = json.dumps(self.to_chrome_trace())
+        else:
+            raise ValueError(f"Unknown metrics export format '{format}'.")
+        if path is None:
+            return content
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            file.write(content)
+        os.replace(temp_path, path)
+        return path
+
+    def to_prometheus(self) -> str:
+        with self.lock:
+            stats = {_label_value(name): (s.calls, s.errors, s.total, list(s.buckets)) for name, s in self.stats.items()}
+        lines = [
+            "# HELP promptflow_action_calls_total Number of action executions.",
+            "# TYPE promptflow_action_calls_total counter",
+        ]
+        lines += [f'promptflow_action_calls_total{{action="{name}"}} {calls}' for name, (calls, _, _, _) in stats.items()]
+        lines += [
+            "# HELP promptflow_action_errors_total Number of action executions that raised.",
+            "# TYPE promptflow_action_errors_total counter",
+        ]
+        lines += [f'promptflow_action_errors_total{{action="{name}"}} {errors}' for name, (_, errors, _, _) in stats.items()]
+        lines += [
+            "# HELP promptflow_action_duration_seconds Action execution latency.",
+            "# TYPE promptflow_action_duration_seconds histogram",
+        ]
+        for name, (calls, _, total, buckets) in stats.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += count
+                lines.append(f'promptflow_action_duration_seconds_bucket{{action="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'promptflow_action_duration_seconds_sum{{action="{name}"}} {total}')
+            lines.append(f'promptflow_action_duration_seconds_count{{action="{name}"}} {calls}')
+        return "\n".join(lines) + "\n"
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        events: List[Dict[str, Any]] = []
+        pid = os.getpid()
+        with self.lock:
+            pending = list(self.spans)
+        while pending:
+            span = pending.pop()
+            if span["duration"] is None:
+                continue
+            events.append({
+                "name": span["action"], "cat": "action", "ph": "X", "pid": pid, "tid": span["thread"],
+                "ts": (span["start"] - self.epoch) * 1e6, "dur": span["duration"] * 1e6,
+                "args": {"error": span["error"]},
+            })
+            pending.extend(span["children"])
+        events.sort(key=lambda event: event["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def get_actions(self) -> List[str]:
+        return list(self.actions.keys())
+
+    def register_with_plugin_manager(self, plugin_manager: Any) -> None:
+        for action_name in self.actions:
+            plugin_manager.register_action(action_name, self)
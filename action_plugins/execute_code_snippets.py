@@ -1,13 +1,32 @@
 from plugin_base import PluginBase
-import io
-from contextlib import redirect_stdout, redirect_stderr
+from snippet_executor import create_executor
 
 class ExecuteCodeSnippetsPlugin(PluginBase):
     def __init__(self, di_container, debug=False):
         super().__init__(di_container, debug)
+        self.executor = None
         self.register_action('execute_code_snippets', self.execute_code_snippets)
+        self.register_action('execute_code_snippet', self.execute_code_snippet)
 
-    def execute_code_snippets(self, *args, **kwargs):
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = self.container.get('snippet_executor')
+        if self.executor is None:
+            config = self.container.get('config') or {}
+            self.executor = create_executor(config.get('snippet_executor'))
+            self.container.set('snippet_executor', self.executor)
+        return self.executor
+
+    def unload(self):
+        # An executor published in the container is shared (also with a reloaded instance of this plugin).
+        if self.executor is not None and self.container.get('snippet_executor') is not self.executor:
+            self.executor.shutdown()
+        self.executor = None
+
+    def execute_code_snippet(self, code, *args, on_output=None, **kwargs):
+        return self.get_executor().run(str(code), on_output)
+
+    def execute_code_snippets(self, *args, on_output=None, **kwargs):
         if self.debug:
             print("ExecuteCodeSnippetsPlugin: Executing execute_code_snippets")
 
@@ -16,28 +35,10 @@ class ExecuteCodeSnippetsPlugin(PluginBase):
         if self.debug:
             print(f"ExecuteCodeSnippetsPlugin: Retrieved {len(snippets)} snippets")
 
-        results = []
-        for i, snippet in enumerate(snippets):
-            if self.debug:
-                print(f"ExecuteCodeSnippetsPlugin: Executing snippet {i+1}")
-
-            local_env = {}
-            global_env = {}
-            try:
-                output_capture = io.StringIO()
-                error_capture = io.StringIO()
-                with redirect_stdout(output_capture), redirect_stderr(error_capture):
-                    exec(str(snippet[0]), global_env, local_env)
-                output = output_capture.getvalue()
-                error = error_capture.getvalue()
-                result = {"output": output, "error": error, "env": local_env}
-            except Exception as e:
-                result = {"error": str(e), "env": local_env}
-            
-            results.append(result)
-            print(results)
-
-            if self.debug:
+        results = self.get_executor().run_many([str(snippet[0]) for snippet in snippets], on_output)
+
+        if self.debug:
+            for i, result in enumerate(results):
                 print(f"ExecuteCodeSnippetsPlugin: Snippet {i+1} execution result: {result}")
 
-        return results
\ No newline at end of file
+        return results
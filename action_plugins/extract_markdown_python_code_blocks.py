@@ -1,12 +1,12 @@
 from plugin_base import PluginBase
-import re
+from code_block_extractor import PYTHON_LANGUAGES, extract_code_blocks
 
 class ExtractMarkdownPythonCodeBlocksPlugin(PluginBase):
     def __init__(self, di_container, debug=False):
         super().__init__(di_container, debug)
         self.register_action('extract_markdown_python_code_blocks', self.extract_markdown_python_code_blocks)
 
-    def extract_markdown_python_code_blocks(self, *args, **kwargs):
+    def extract_markdown_python_code_blocks(self, *args, languages=PYTHON_LANGUAGES, **kwargs):
         if self.debug:
             print("ExtractMarkdownPythonCodeBlocksPlugin: Executing extract_markdown_python_code_blocks")
 
@@ -15,9 +15,8 @@ class ExtractMarkdownPythonCodeBlocksPlugin(PluginBase):
         if self.debug:
             print(f"ExtractMarkdownPythonCodeBlocksPlugin: Retrieved answer text: {text[:100]}...")  # Print first 100 chars
 
-        # Updated pattern to match both ``` and ''' delimiters, and to capture the content
-        pattern = r"(?:```|''')python\s*(.*?)(?:```|''')"
-        code_blocks = re.findall(pattern, text, re.DOTALL)
+        # Single linear pass over ``` and ''' fences; a block only closes on the delimiter that opened it
+        code_blocks = [block.code for block in extract_code_blocks(text, languages)]
         
         if self.debug:
             print(f"ExtractMarkdownPythonCodeBlocksPlugin: Found {len(code_blocks)} code blocks")
@@ -28,4 +27,4 @@ class ExtractMarkdownPythonCodeBlocksPlugin(PluginBase):
         code_blocks = [(block,) for block in code_blocks]
 
         self.execute('container_set', key='snippets', value=code_blocks)
-        return code_blocks
\ No newline at end of file
+        return code_blocks
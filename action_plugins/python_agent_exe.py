@@ -1,31 +1,239 @@
 # action_plugins/python_agent_exe.py
 from plugin_base import PluginBase
-import ollama
+from code_block_extractor import StreamingCodeBlockExtractor
+from llm_cache import ResponseCache
+from llm_backend import LIMIT_OPTIONS, ClientBackend, create_backend
+from run_store import RunRecord, RunStore
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
 import logging
 class PythonAgentExePlugin(PluginBase):
     def __init__(self, container, debug=False):
         super().__init__(container, debug)
         self.logger.debug("Initializing PythonAgentExePlugin")
+        self.backend = None
+        self.client_backend = None
+        self.backend_lock = threading.Lock()
+        self.response_cache = None
+        self.run_store = None
         self.register_action('python_agent_exe', self.python_agent_exe)
-        self.logger.debug("Registered action python_agent_exe")
+        self.register_action('apython_agent_exe', self.apython_agent_exe)
+        self.register_action('llm_chat', self.llm_chat)
+        self.register_action('llm_cache_stats', self.llm_cache_stats)
+        self.register_action('llm_backend_stats', self.llm_backend_stats)
+        self.register_action('query_runs', self.query_runs)
+        self.register_action('run_stats', self.run_stats)
+        self.logger.debug("Registered actions python_agent_exe, apython_agent_exe, llm_chat, llm_cache_stats, llm_backend_stats, "
+                          "query_runs, run_stats")
+
+    def get_backend(self):
+        backend = self.container.get('llm_backend')
+        if backend is not None:
+            return backend
+        options = (self.container.get('config') or {}).get('llm_backend') or {}
+        client = self.container.get('llm_client')
+        with self.backend_lock:
+            if client is not None:
+                # A bare Ollama-compatible client in the container still gets the configured limits.
+                if self.client_backend is None or self.client_backend.client is not client:
+                    self.client_backend = ClientBackend(client, **{name: options[name] for name in LIMIT_OPTIONS if name in options})
+                return self.client_backend
+            if self.backend is None:
+                self.backend = create_backend(options)
+                self.container.set('llm_backend', self.backend)
+            return self.backend
+
+    def unload(self):
+        # A backend published in the container is shared (also with a reloaded instance of this plugin).
+        if self.backend is not None and self.container.get('llm_backend') is not self.backend:
+            self.backend.close()
+        self.backend = None
+
+    def llm_backend_stats(self, *args, **kwargs):
+        return self.get_backend().get_stats()
+
+    def get_cache(self):
+        if self.response_cache is None:
+            self.response_cache = self.container.get('llm_cache')
+        if self.response_cache is None:
+            options = (self.container.get('config') or {}).get('llm_cache')
+            if options:
+                self.response_cache = ResponseCache(**options)
+                self.container.set('llm_cache', self.response_cache)
+        return self.response_cache
+
+    def llm_cache_stats(self, *args, **kwargs):
+        cache = self.get_cache()
+        return cache.get_stats() if cache else None
+
+    def get_run_store(self):
+        if self.run_store is None:
+            self.run_store = self.container.get('run_store')
+        if self.run_store is None:
+            options = (self.container.get('config') or {}).get('run_store')
+            if options:
+                self.run_store = RunStore(**options)
+                self.container.set('run_store', self.run_store)
+        return self.run_store
+
+    def start_run(self, task, model, template):
+        return RunRecord(self.get_run_store(), task=task, model=model, template=template)
+
+    def finish_run(self, run, result):
+        if run.store is not None:
+            snippets = self.execute('container_get', 'snippets') or []
+            run.set(snippets=[str(snippet[0]) for snippet in snippets])
+            run.finish(result)
+
+    def query_runs(self, *args, **kwargs):
+        store = self.get_run_store()
+        if store is None:
+            raise ValueError("No run store configured; set config['run_store'].")
+        return store.scan(*args, **kwargs)
+
+    def run_stats(self, *args, **kwargs):
+        store = self.get_run_store()
+        if store is None:
+            raise ValueError("No run store configured; set config['run_store'].")
+        return store.stats(*args, **kwargs)
+
+    def _cache_lookup(self, model, prompt, options, bypass_cache):
+        cache = None if bypass_cache else self.get_cache()
+        if cache is None:
+            return None, None, None
+        key = cache.make_key(model, prompt, options)
+        return cache, key, cache.get(key)
+
+    def llm_chat(self, prompt, model=None, options=None, bypass_cache=False, **kwargs):
+        model = model or self.execute('container_get', 'model')
+        cache, key, answer = self._cache_lookup(model, prompt, options, bypass_cache)
+        if answer is None:
+            answer = self.get_backend().chat(model, prompt, options)
+            if cache is not None:
+                cache.set(key, answer, model)
+        return answer
 
     def python_agent_exe(self, *args, **kwargs):
-        task = self.execute('container_get', 'task')
-        model = self.execute('container_get', 'model')
-        
-        prompt = self.execute('render_template', 'render_template', 'python_dev_final.j2', task=task)
-        print(prompt)
-        
-        response = ollama.chat(model=model, messages=[
-            {
-                'role': 'user',
-                'content': prompt,
-            },
-        ])
-        answer = response['message']['content']
-        self.execute('container_set', key='answer', value=answer)
-        self.execute('extract_markdown_python_code_blocks')
-        result = self.execute('execute_code_snippets')
-        
+        task = kwargs.get('task') or self.execute('container_get', 'task')
+        model = kwargs.get('model') or self.execute('container_get', 'model')
+        stream = kwargs.get('stream', (self.container.get('config') or {}).get('agent_stream', False))
+        options = kwargs.get('options')
+
+        run = self.start_run(task, model, 'python_dev_final.j2')
+        try:
+            with run.phase('render'):
+                prompt = self.execute('render_template', 'render_template', 'python_dev_final.j2', task=task)
+            run.set(prompt=prompt)
+            print(prompt)
+
+            if stream:
+                cache, key, answer = self._cache_lookup(model, prompt, options, kwargs.get('bypass_cache', False))
+            else:
+                with run.phase('llm'):
+                    answer = self.llm_chat(prompt, model, options, kwargs.get('bypass_cache', False))
+                run.set(answer=answer)
+                self.execute('container_set', key='answer', value=answer)
+                with run.phase('extract'):
+                    self.execute('extract_markdown_python_code_blocks')
+                with run.phase('execute'):
+                    result = self.execute('execute_code_snippets')
+        except Exception as e:
+            run.finish(error=e)
+            raise
+        if stream:
+            return self._python_agent_exe_stream(model, prompt, options, cache, key, answer, run)
+        self.finish_run(run, result)
+
+        print(f"Execution result: {result}")
+        return result
+
+    def _stream_answer(self, model, prompt, options, cache, key, cached_answer):
+        if cached_answer is not None:
+            yield cached_answer
+            return
+        chunks = []
+        for chunk in self.get_backend().stream(model, prompt, options):
+            chunks.append(chunk)
+            yield chunk
+        if cache is not None:
+            cache.set(key, "".join(chunks), model)
+
+    def _python_agent_exe_stream(self, model, prompt, options, cache, key, cached_answer, run):
+        extractor = StreamingCodeBlockExtractor()
+        chunks = []
+        snippets = []
+        futures = []
+        try:
+            execute_snippet = self.action('execute_code_snippet')
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-snippets") as pool:
+                # Snippets run while the answer streams in, so 'llm' includes overlapping execution time.
+                with run.phase('llm'):
+                    for text in self._stream_answer(model, prompt, options, cache, key, cached_answer):
+                        chunks.append(text)
+                        for block in extractor.feed(text):
+                            if self.debug:
+                                print(f"PythonAgentExePlugin: Code block {len(snippets) + 1} closed, executing while generation continues")
+                            snippets.append((block.code,))
+                            futures.append(pool.submit(execute_snippet, block.code))
+                    extractor.close()
+                with run.phase('execute'):
+                    result = [future.result() for future in futures]
+        except Exception as e:
+            run.finish(error=e)
+            raise
+
+        self.execute('container_set', key='answer', value="".join(chunks))
+        self.execute('container_set', key='snippets', value=snippets)
+        run.set(answer="".join(chunks))
+        self.finish_run(run, result)
+
         print(f"Execution result: {result}")
-        return result
\ No newline at end of file
+        return result
+
+    async def apython_agent_exe(self, *args, **kwargs):
+        task = kwargs.get('task') or self.execute('container_get', 'task')
+        model = kwargs.get('model') or self.execute('container_get', 'model')
+        options = kwargs.get('options')
+
+        # Rendering, the cache, extraction and the snippets are blocking, so they run in worker
+        # threads (asyncio.to_thread carries the container scope) and the loop stays free.
+        run = self.start_run(task, model, 'python_dev_final.j2')
+        try:
+            with run.phase('render'):
+                prompt = await asyncio.to_thread(self.execute, 'render_template', 'render_template',
+                                                 'python_dev_final.j2', task=task)
+            run.set(prompt=prompt)
+            if self.debug:
+                print(prompt)
+
+            with run.phase('llm'):
+                cache, key, answer = await asyncio.to_thread(self._cache_lookup, model, prompt, options,
+                                                             kwargs.get('bypass_cache', False))
+                if answer is None:
+                    answer = await self.get_backend().achat(model, prompt, options)
+                    if cache is not None:
+                        await asyncio.to_thread(cache.set, key, answer, model)
+            run.set(answer=answer)
+            snippets, result = await asyncio.to_thread(self._extract_and_execute, answer, run)
+        except Exception as e:
+            run.finish(error=e)
+            raise
+        # Published together with no await in between, as the sync path leaves them.
+        self.execute('container_set', key='answer', value=answer)
+        self.execute('container_set', key='snippets', value=snippets)
+        self.finish_run(run, result)
+
+        if self.debug:
+            print(f"Execution result: {result}")
+        return result
+
+    def _extract_and_execute(self, answer, run):
+        # A private scope keeps concurrent runs from reading each other's answer and snippets.
+        with self.container.scope():
+            self.execute('container_set', key='answer', value=answer)
+            with run.phase('extract'):
+                self.execute('extract_markdown_python_code_blocks')
+            with run.phase('execute'):
+                result = self.execute('execute_code_snippets')
+            return self.execute('container_get', 'snippets'), result
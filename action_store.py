@@ -0,0 +1,211 @@
+# action_store.py
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import sqlite_util
+from file_manager import FileManager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    name TEXT PRIMARY KEY,
+    func_name TEXT NOT NULL,
+    source TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sequence (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO sequence (name, value) SELECT 'revision', COALESCE(MAX(revision), 0) FROM actions;
+"""
+
+class StoredAction(NamedTuple):
+    name: str
+    func_name: str
+    source: str
+    revision: int
+
+class ActionStore(ABC):
+    @abstractmethod
+    def get(self, name: str) -> Optional[StoredAction]:
+        pass
+
+    def revision(self, name: str) -> Optional[int]:
+        action = self.get(name)
+        return action.revision if action else None
+
+    def put(self, name: str, func_name: str, source: str) -> int:
+        return self.put_many([(name, func_name, source)])
+
+    @abstractmethod
+    def put_many(self, actions: Iterable[Tuple[str, str, str]]) -> int:
+        pass
+
+    @abstractmethod
+    def remove(self, name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def names(self) -> List[str]:
+        pass
+
+    def close(self) -> None:
+        pass
+
+class SqliteActionStore(ActionStore):
+    """Action metadata and source in one SQLite table; WAL mode lets several processes share it."""
+
+    def __init__(self, path: str = "data/actions/actions.sqlite"):
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        return sqlite_util.connection(self.local, self.path)
+
+    def get(self, name: str) -> Optional[StoredAction]:
+        row = self._connection().execute("SELECT name, func_name, source, revision FROM actions WHERE name = ?",
+                                         (name,)).fetchone()
+        return StoredAction(*row) if row else None
+
+    def revision(self, name: str) -> Optional[int]:
+        row = self._connection().execute("SELECT revision FROM actions WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, actions: Iterable[Tuple[str, str, str]]) -> int:
+        connection = self._connection()
+        now = time.time()
+        count = 0
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for name, func_name, source in actions:
+                # Revisions come from one store-wide sequence, so a removed and re-added action never reuses
+                # a revision that another process may still have cached.
+                connection.execute("UPDATE sequence SET value = value + 1 WHERE name = 'revision'")
+                revision = connection.execute("SELECT value FROM sequence WHERE name = 'revision'").fetchone()[0]
+                connection.execute(
+                    "INSERT INTO actions (name, func_name, source, revision, updated) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET func_name = excluded.func_name, source = excluded.source, "
+                    "revision = excluded.revision, updated = excluded.updated",
+                    (name, func_name, source, revision, now))
+                count += 1
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return count
+
+    def remove(self, name: str) -> bool:
+        return self._connection().execute("DELETE FROM actions WHERE name = ?", (name,)).rowcount > 0
+
+    def names(self) -> List[str]:
+        return [row[0] for row in self._connection().execute("SELECT name FROM actions ORDER BY name")]
+
+    def close(self) -> None:
+        sqlite_util.close(self.local)
+
+class JsonActionStore(ActionStore):
+    """
+    The original layout: a JSON mapping of name to (filename, func_name) next to one source file per action.
+    The mapping is re-read whenever its mtime or size changes, so other processes' edits are seen, but
+    concurrent writers are not serialised; use the SQLite store when several processes add actions.
+    """
+
+    def __init__(self, directory: str = "data/actions", mapping_file: str = "action_mapping.json"):
+        self.directory = directory
+        self.mapping_file = os.path.join(directory, mapping_file)
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.mapping: Dict[str, Dict[str, Any]] = {}
+        self.mapping_stat: Optional[Tuple[int, int]] = None
+        self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.mapping_file)
+            current = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            current = None
+        if current != self.mapping_stat:
+            self.mapping = (FileManager.read_json(self.mapping_file) or {}) if current else {}
+            self.mapping_stat = current
+
+    def get(self, name: str) -> Optional[StoredAction]:
+        self._refresh()
+        info = self.mapping.get(name)
+        if info is None:
+            return None
+        with open(os.path.join(self.directory, info["filename"]), "r") as file:
+            source = file.read()
+        return StoredAction(name, info["func_name"], source, info.get("revision", 1))
+
+    def revision(self, name: str) -> Optional[int]:
+        self._refresh()
+        info = self.mapping.get(name)
+        return info.get("revision", 1) if info else None
+
+    def put_many(self, actions: Iterable[Tuple[str, str, str]]) -> int:
+        count = 0
+        with self.lock:
+            self._refresh()
+            for name, func_name, source in actions:
+                filename = f"{uuid.uuid4()}.py"
+                with open(os.path.join(self.directory, filename), "w") as file:
+                    file.write(source)
+                previous = self.mapping.get(name)
+                # Nanosecond timestamps keep revisions increasing across removal and re-adding.
+                revision = max(time.time_ns(), previous.get("revision", 1) + 1 if previous else 1)
+                self.mapping[name] = {"filename": filename, "func_name": func_name, "revision": revision}
+                if previous:
+                    FileManager.delete_file(os.path.join(self.directory, previous["filename"]))
+                count += 1
+            self._save()
+        return count
+
+    def remove(self, name: str) -> bool:
+        with self.lock:
+            self._refresh()
+            info = self.mapping.pop(name, None)
+            if info is None:
+                return False
+            FileManager.delete_file(os.path.join(self.directory, info["filename"]))
+            self._save()
+        return True
+
+    def names(self) -> List[str]:
+        self._refresh()
+        return sorted(self.mapping)
+
+    def _save(self) -> None:
+        # Write to a temporary file and rename, so a crash never leaves a truncated mapping behind.
+        temp_path = f"{self.mapping_file}.{os.getpid()}.tmp"
+        FileManager.write_json(temp_path, self.mapping)
+        os.replace(temp_path, self.mapping_file)
+        stat = os.stat(self.mapping_file)
+        self.mapping_stat = (stat.st_mtime_ns, stat.st_size)
+
+def import_legacy_actions(store: ActionStore, directory: str = "data/actions", mapping_file: str = "action_mapping.json") -> int:
+    mapping = FileManager.read_json(os.path.join(directory, mapping_file)) or {}
+    actions = []
+    for name, info in mapping.items():
+        filepath = os.path.join(directory, info["filename"])
+        if not os.path.exists(filepath):
+            continue
+        with open(filepath, "r") as file:
+            actions.append((name, info["func_name"], file.read()))
+    return store.put_many(actions) if actions else 0
+
+ACTION_STORES = {
+    "sqlite": SqliteActionStore,
+    "json": JsonActionStore,
+}
+
+def create_action_store(options: Optional[Dict[str, Any]] = None) -> ActionStore:
+    options = dict(options or {})
+    backend = options.pop("backend", "sqlite")
+    if backend not in ACTION_STORES:
+        raise ValueError(f"Unknown action store backend '{backend}'.")
+    return ACTION_STORES[backend](**options)
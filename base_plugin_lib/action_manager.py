@@ -1,24 +1,49 @@
 import os
-import importlib.util
-import uuid
 import inspect
-from file_manager import FileManager
+import threading
+from collections import OrderedDict
+from action_store import ActionStore, create_action_store, import_legacy_actions
 from plugin_base import PluginBase
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 class ActionManagerPlugin(PluginBase):
     def __init__(self, container: Any, debug: bool = False, directory: str = "data/actions", mapping_file: str = "action_mapping.json"):
         super().__init__(container, debug)
-        self.file_manager = FileManager()
         self.directory = directory
-        self.mapping_file = os.path.join(directory, mapping_file)
-        os.makedirs(directory, exist_ok=True)
-        self.actions_mapping: Dict[str, Dict[str, str]] = self._load_action_mapping()
-        self.module_cache: Dict[str, Any] = {}
+        self.mapping_file = mapping_file
+        config = self.container.get('config') or {}
+        self.store: ActionStore = self._create_store(config.get('action_store'))
+        self.module_cache: "OrderedDict[str, Tuple[int, Callable]]" = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.cache_size: Optional[int] = config.get('action_cache_size')
+        self.cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
         self.register_action('add_action', self.add_action)
         self.register_action('execute_action', self.execute_action)
         self.register_action('list_actions', self.list_actions)
         self.register_action('remove_action', self.remove_action)
+        self.register_action('action_cache_stats', self.action_cache_stats)
+        self.register_action('import_actions', self.import_actions)
+
+    def _create_store(self, options: Optional[Dict[str, Any]]) -> ActionStore:
+        options = dict(options or {})
+        backend = options.setdefault('backend', "sqlite")
+        if backend == "sqlite":
+            options.setdefault('path', os.path.join(self.directory, "actions.sqlite"))
+        elif backend == "json":
+            options.setdefault('directory', self.directory)
+            options.setdefault('mapping_file', self.mapping_file)
+        store = create_action_store(options)
+        # First start on a SQLite store: carry over actions saved by the JSON mapping layout.
+        if backend == "sqlite" and os.path.exists(os.path.join(self.directory, self.mapping_file)) and not store.names():
+            imported = import_legacy_actions(store, self.directory, self.mapping_file)
+            self.logger.info("Imported %d actions from %s", imported, self.mapping_file)
+        return store
+
+    def import_actions(self, directory: Optional[str] = None, mapping_file: Optional[str] = None) -> int:
+        count = import_legacy_actions(self.store, directory or self.directory, mapping_file or self.mapping_file)
+        with self.cache_lock:
+            self.module_cache.clear()
+        return count
 
     def list_actions(self, *args, **kwargs):
         plugin_manager = self.container.get('plugin_manager')
@@ -30,10 +55,10 @@ class ActionManagerPlugin(PluginBase):
             if self.debug:
                 print(f"ActionManagerPlugin: Registered self as 'action_manager'")
 
-    def add_action(self, action_name, func, func_name=None):
-        filename = f"{uuid.uuid4()}.py"
-        filepath = os.path.join(self.directory, filename)
+    def unload(self):
+        self.store.close()
 
+    def add_action(self, action_name, func, func_name=None):
         if not func_name:
             func_name = action_name
 
@@ -45,47 +70,65 @@ class ActionManagerPlugin(PluginBase):
         if func.__name__ != func_name:
             source = source.replace(f"def {func.__name__}", f"def {func_name}", 1)
 
-        with open(filepath, 'w') as file:
-            file.write(source)
-
-        self.actions_mapping[action_name] = {"filename": filename, "func_name": func_name}
-        self._save_action_mapping()
-        print(f"Added action: {action_name} with file: {filename}")
+        self.store.put(action_name, func_name, source)
+        self._invalidate(action_name)
+        print(f"Added action: {action_name}")
 
     def execute_action(self, action_name, *args, **kwargs):
         print(f"Executing action in ActionManagerPlugin: {action_name} with args: {args} kwargs: {kwargs}")
         plugin_manager = self.container.get('plugin_manager')
-        if action_name in plugin_manager.actions:
+        if action_name in plugin_manager.registry.actions:
             return plugin_manager.execute_action(action_name, *args, **kwargs)
-        elif action_name in self.actions_mapping:
-            action_info = self.actions_mapping[action_name]
-            filename = action_info["filename"]
-            func_name = action_info["func_name"]
-            filepath = os.path.join(self.directory, filename)
-
-            spec = importlib.util.spec_from_file_location("module_" + action_name, filepath)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            action_func = getattr(module, func_name)
-
-            return action_func(*args, **kwargs)
-        else:
+        action_func = self._resolve_action(action_name)
+        if action_func is None:
             raise ValueError(f"No action defined for '{action_name}'.")
+        return action_func(*args, **kwargs)
+
+    def _resolve_action(self, action_name: str) -> Optional[Callable]:
+        # The revision check is one primary-key lookup, so edits from other processes are picked up on the next call.
+        revision = self.store.revision(action_name)
+        if revision is None:
+            self._invalidate(action_name)
+            return None
+        with self.cache_lock:
+            cached = self.module_cache.get(action_name)
+            if cached is not None and cached[0] == revision:
+                self.module_cache.move_to_end(action_name)
+                self.cache_stats["hits"] += 1
+                return cached[1]
+            self.cache_stats["misses"] += 1
+
+        stored = self.store.get(action_name)
+        if stored is None:
+            return None
+        namespace: Dict[str, Any] = {"__name__": "module_" + action_name}
+        exec(compile(stored.source, f"<action {action_name}>", "exec"), namespace)
+        action_func = namespace[stored.func_name]
+
+        with self.cache_lock:
+            self.module_cache[action_name] = (stored.revision, action_func)
+            self.module_cache.move_to_end(action_name)
+            while self.cache_size is not None and len(self.module_cache) > self.cache_size:
+                self.module_cache.popitem(last=False)
+                self.cache_stats["evictions"] += 1
+        return action_func
 
-    def _load_action_mapping(self):
-        return self.file_manager.read_json(self.mapping_file) or {}
+    def _invalidate(self, action_name: str) -> None:
+        with self.cache_lock:
+            if self.module_cache.pop(action_name, None) is not None:
+                self.cache_stats["invalidations"] += 1
 
-    def _save_action_mapping(self):
-        self.file_manager.write_json(self.mapping_file, self.actions_mapping)
+    def action_cache_stats(self, *args, **kwargs):
+        with self.cache_lock:
+            stats = dict(self.cache_stats)
+            stats["size"] = len(self.module_cache)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
 
     def remove_action(self, action_name):
-        if action_name in self.actions_mapping:
-            filename = self.actions_mapping[action_name]["filename"]
-            filepath = os.path.join(self.directory, filename)
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            del self.actions_mapping[action_name]
-            self._save_action_mapping()
+        if self.store.remove(action_name):
+            self._invalidate(action_name)
             print(f"Removed action: {action_name}")
         else:
             print(f"Action '{action_name}' not found.")
@@ -1,17 +1,43 @@
-import json
 import os
-from jinja2 import Environment, FileSystemLoader, Template
+import weakref
+from collections import ChainMap
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 from plugin_base import PluginBase
-from typing import Any, Dict
+from string_catalog import StringCatalog
+from typing import Any, Dict, List, Optional
 
 class StringManagerPlugin(PluginBase):
     def __init__(self, container: Any, debug: bool = False, template_dir: str = "data/templates", string_dir: str = "data/strings"):
         super().__init__(container, debug)
         self.template_dir = template_dir
         self.string_dir = string_dir
-        self.env = Environment(loader=FileSystemLoader(template_dir))
-        self.strings: Dict[str, Any] = self._load_strings()
+        config = self.container.get('config') or {}
+        bytecode_dir = config.get('template_bytecode_cache')
+        if bytecode_dir:
+            os.makedirs(bytecode_dir, exist_ok=True)
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            auto_reload=False,
+            cache_size=-1,
+            bytecode_cache=FileSystemBytecodeCache(bytecode_dir) if bytecode_dir else None,
+        )
+        self.templates: Dict[str, Template] = {}
+        catalog_options = config.get('string_catalog') or {}
+        self.catalog = StringCatalog(
+            string_dir,
+            index_path=catalog_options.get('index_path', "data/string_index.sqlite"),
+            locale=catalog_options.get('locale'),
+            check_interval=catalog_options.get('check_interval'),
+            debug=debug,
+        )
         self.register_action('render_template', self.render_template)
+        self.register_action('warm_up_templates', self.warm_up_templates)
+        self.register_action('get_string', self.get_string)
+        self.register_action('reload_strings', self.reload_strings)
+
+    @property
+    def strings(self) -> Dict[str, Any]:
+        return self.catalog.view()
 
     def load(self):
         if not self.container.get('string_manager'):
@@ -19,16 +45,40 @@ class StringManagerPlugin(PluginBase):
             if self.debug:
                 print(f"StringManagerPlugin: Registered self as 'string_manager'")
 
-    def _load_strings(self):
-        strings = {}
-        for filename in os.listdir(self.string_dir):
-            if filename.endswith('.json'):
-                with open(os.path.join(self.string_dir, filename), 'r') as f:
-                    strings.update(json.load(f))
-        return strings
-
-    def render_template(self, action_name: str, template_name: str, **kwargs):
-        template = self.env.get_template(template_name)
-        context = self.strings.copy()
-        context.update(kwargs)
-        return template.render(context)
\ No newline at end of file
+    def get_string(self, key: str, locale: Optional[str] = None, default: Any = None, *args, **kwargs) -> Any:
+        self.catalog.maybe_refresh()
+        return self.catalog.get(key, locale, default)
+
+    def reload_strings(self, *args, **kwargs) -> List[str]:
+        return self.catalog.refresh()
+
+    def get_template(self, template_name: str) -> Template:
+        template = self.templates.get(template_name)
+        if template is None:
+            template = self.templates[template_name] = self.env.get_template(template_name)
+        return template
+
+    def invalidate_template(self, template_name: str) -> None:
+        # Compiled code of other templates does not embed this one (includes and extends resolve at render time).
+        self.templates.pop(template_name, None)
+        if self.env.cache is not None:
+            try:
+                del self.env.cache[(weakref.ref(self.env.loader), template_name)]
+            except KeyError:
+                pass
+
+    def warm_up_templates(self, *args, **kwargs) -> List[str]:
+        names = self.env.list_templates()
+        for name in names:
+            self.get_template(name)
+        return names
+
+    def render_template(self, action_name: str, template_name: str, locale: Optional[str] = None, **kwargs):
+        template = self.get_template(template_name)
+        self.catalog.maybe_refresh()
+        # Shared context: lookups fall through kwargs -> strings -> globals without copying any layer.
+        context = template.new_context(ChainMap(kwargs, self.catalog.view(locale), template.globals), shared=True)
+        try:
+            return self.env.concat(template.root_render_func(context))
+        except Exception:
+            return self.env.handle_exception()
\ No newline at end of file
@@ -0,0 +1,60 @@
+import os
+from plugin_base import PluginBase
+from workflow_engine import Workflow, WorkflowEngine
+from custom_exceptions import WorkflowError
+from typing import Any, Dict, List, Optional, Tuple
+
+class WorkflowManagerPlugin(PluginBase):
+    def __init__(self, container: Any, debug: bool = False, workflow_dir: Optional[str] = None):
+        super().__init__(container, debug)
+        self.options: Dict[str, Any] = dict((self.container.get('config') or {}).get('workflows') or {})
+        self.workflow_dir = workflow_dir or self.options.pop('workflow_dir', "data/workflows")
+        self.workflows: Dict[str, Tuple[int, Workflow]] = {}
+        self.engines: Dict[str, WorkflowEngine] = {}
+        self.register_action('run_workflow', self.run_workflow)
+        self.register_action('list_workflows', self.list_workflows)
+
+    def load(self):
+        if not self.container.get('workflow_manager'):
+            self.container.set('workflow_manager', self)
+            if self.debug:
+                print(f"WorkflowManagerPlugin: Registered self as 'workflow_manager'")
+
+    def unload(self):
+        for engine in self.engines.values():
+            engine.shutdown()
+        self.engines = {}
+
+    def list_workflows(self, *args, **kwargs) -> List[str]:
+        if not os.path.isdir(self.workflow_dir):
+            return []
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(self.workflow_dir) if name.endswith('.json'))
+
+    def get_workflow(self, name_or_path: str) -> Workflow:
+        path = name_or_path if os.path.isfile(name_or_path) else os.path.join(self.workflow_dir, f"{name_or_path}.json")
+        if not os.path.isfile(path):
+            raise WorkflowError(f"No workflow named '{name_or_path}' in {self.workflow_dir}.")
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.workflows.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = self.workflows[path] = (mtime, Workflow.from_file(path))
+        return cached[1]
+
+    def get_engine(self, executor: Optional[str] = None) -> WorkflowEngine:
+        executor = executor or self.options.get('executor', "thread")
+        engine = self.engines.get(executor)
+        if engine is None:
+            engine = self.engines[executor] = WorkflowEngine(
+                self.container.get('core_system'), executor,
+                self.options.get('max_workers'), self.options.get('memo_dir'), self.options.get('memo_entries', 256),
+                self.options.get('memo_dir_bytes', 256 * 1024 * 1024))
+        return engine
+
+    def run_workflow(self, name_or_path: str, inputs: Optional[Dict[str, Any]] = None, executor: Optional[str] = None, **kwargs):
+        workflow = self.get_workflow(name_or_path)
+        result = self.get_engine(executor).run(workflow, inputs or kwargs)
+        if self.debug:
+            for name, step in result["steps"].items():
+                timing = "cached" if step["cached"] else f"{step['duration'] * 1000:.1f} ms"
+                print(f"WorkflowManagerPlugin: {workflow.name}.{name} ({step['action']}) {timing}")
+        return result
@@ -0,0 +1,101 @@
+# batch_executor.py
+import contextvars
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from custom_exceptions import CoreSystemError
+
+_process_core: Any = None
+
+class BatchResult(NamedTuple):
+    index: int
+    input: Any
+    value: Any
+    error: Optional[str]
+    duration: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def split_input(item: Any) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    # A dict is passed as keyword arguments, a tuple or list as positional arguments, anything else as the single argument.
+    if isinstance(item, dict):
+        return (), item
+    if isinstance(item, (tuple, list)):
+        return tuple(item), {}
+    return (item,), {}
+
+def execute_item(core_system: Any, action_name: str, item: Any) -> Tuple[Any, Optional[str], float]:
+    args, kwargs = split_input(item)
+    start = time.perf_counter()
+    try:
+        # Each item writes to its own container overlay, so keys like 'task' or 'answer' never leak between items.
+        with core_system.scope():
+            value = core_system.execute(action_name, *args, **kwargs)
+        return value, None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e) or type(e).__name__, time.perf_counter() - start
+
+def _execute_in_process(action_name: str, item: Any) -> Tuple[Any, Optional[str], float]:
+    return execute_item(_process_core, action_name, item)
+
+class BatchExecutor:
+    def __init__(self, core_system: Any, max_concurrency: Optional[int] = None, executor: str = "thread"):
+        self.core_system = core_system
+        self.max_concurrency = max(1, max_concurrency or os.cpu_count() or 1)
+        self.executor_kind = executor
+
+    def _create_pool(self) -> Executor:
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="batch")
+        if self.executor_kind == "process":
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise CoreSystemError("The process batch executor needs the 'fork' start method to share the CoreSystem.")
+            global _process_core
+            _process_core = self.core_system
+            # With the fork context every worker is forked at the first submit, from a process that already runs
+            # other threads (reloader, log listener, pools). A lock one of them holds at that moment stays held in
+            # the child; the logger re-arms after fork and the SQLite stores open per-pid connections, but other
+            # shared locks are not safe. forkserver/spawn would not carry the live CoreSystem over, so use the
+            # thread executor for actions that touch such state.
+            return ProcessPoolExecutor(max_workers=self.max_concurrency, mp_context=multiprocessing.get_context("fork"))
+        raise CoreSystemError(f"Unknown batch executor '{self.executor_kind}'.")
+
+    def _submit(self, pool: Executor, action_name: str, item: Any) -> Future:
+        if self.executor_kind == "process":
+            return pool.submit(_execute_in_process, action_name, item)
+        context = contextvars.copy_context()
+        return pool.submit(context.run, execute_item, self.core_system, action_name, item)
+
+    def run(self, action_name: str, inputs: Iterable[Any]) -> Iterator[BatchResult]:
+        # Inputs are pulled lazily and at most max_concurrency items are in flight, so a slow consumer
+        # (or an unbounded input generator) holds back submission instead of piling up results.
+        items = enumerate(inputs)
+        pool = self._create_pool()
+        running: Dict[Future, Tuple[int, Any]] = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(running) < self.max_concurrency:
+                    try:
+                        index, item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    running[self._submit(pool, action_name, item)] = (index, item)
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, item = running.pop(future)
+                    try:
+                        value, error, duration = future.result()
+                    except Exception as e:
+                        # Only reached when the worker itself failed (e.g. an unpicklable result or a dead process).
+                        value, error, duration = None, str(e) or type(e).__name__, 0.0
+                    yield BatchResult(index, item, value, error, duration)
+        finally:
+            pool.shutdown(wait=not running, cancel_futures=True)
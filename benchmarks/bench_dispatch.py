@@ -0,0 +1,65 @@
+# benchmarks/bench_dispatch.py
+import os
+import sys
+import time
+from typing import Any, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core_system import CoreSystem
+from plugin_base import PluginBase
+
+CONFIG = {
+    'plugin_directory': ["action_plugins", "base_plugin_lib"],
+    'template_dir': "data/templates/",
+    'string_dir': "data/strings/",
+    'debug': False
+}
+
+class NoopPlugin(PluginBase):
+    def __init__(self, container, debug=False):
+        super().__init__(container, debug)
+        self.register_action('noop', self.noop)
+
+    def noop(self, *args, **kwargs):
+        return None
+
+def legacy_execute(core: CoreSystem, action_name: str, *args: Any, **kwargs: Any) -> Any:
+    # Replays the pre-dispatch-table chain: CoreSystem -> DI -> management -> registry -> plugin,
+    # with one lookup and one formatted debug record per layer.
+    core.logger.debug(f"Executing action: {action_name}")
+    di = core.di_layer
+    if action_name in di.actions:
+        return di.actions[action_name](*args, **kwargs)
+    plugin_manager = di.data['plugin_manager']
+    plugin_manager.logger.debug(f"Executing action: {action_name}")
+    registry = plugin_manager.registry
+    registry.logger.debug(f"Executing action: {action_name}")
+    plugin_instance = registry.actions[action_name]
+    plugin_instance.logger.debug(f"Executing action in {plugin_instance.__class__.__name__}: {action_name}")
+    return plugin_instance.actions[action_name](*args, **kwargs)
+
+def measure(label: str, call: Callable[[], Any], iterations: int) -> float:
+    for _ in range(1000):
+        call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    per_call = (time.perf_counter() - start) / iterations * 1e9
+    print(f"{label:<32} {per_call:10.1f} ns/call")
+    return per_call
+
+def main(iterations: int = 200000) -> None:
+    os.chdir(ROOT)
+    core = CoreSystem(CONFIG)
+    NoopPlugin(core.di_layer, False)
+    handle = core.action('noop')
+
+    legacy = measure("legacy layered dispatch", lambda: legacy_execute(core, 'noop'), iterations)
+    fast = measure("CoreSystem.execute", lambda: core.execute('noop'), iterations)
+    direct = measure("ActionHandle call", lambda: handle(), iterations)
+    print(f"speedup execute: {legacy / fast:.2f}x, handle: {legacy / direct:.2f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
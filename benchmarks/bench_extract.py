@@ -0,0 +1,49 @@
+# benchmarks/bench_extract.py
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from code_block_extractor import StreamingCodeBlockExtractor, extract_code_blocks
+
+LEGACY_PATTERN = r"(?:```|''')python\s*(.*?)(?:```|''')"
+CHUNK_SIZE = 4096
+
+def build_inputs(megabytes: int, adversarial_kb: int) -> Dict[str, str]:
+    block = "Some explanation of the approach.\n```python\nimport os\nfor name in os.listdir('.'):\n    print(name)\n```\n"
+    prose = "The model keeps talking about unrelated things for a while. " * 20 + "\n"
+    unit = block + prose
+    repeat = max(1, megabytes * 1024 * 1024 // len(unit))
+    return {
+        f"{megabytes}MB answer, many blocks": unit * repeat,
+        f"{megabytes}MB unterminated block": "```python\n" + "x = 1\n" * (megabytes * 1024 * 1024 // 6),
+        # Unterminated fence followed by whitespace: the legacy pattern backtracks through \s* quadratically.
+        f"{adversarial_kb}KB whitespace after fence": "```python" + " " * (adversarial_kb * 1024),
+    }
+
+def timed(call: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+def chunked(text: str) -> int:
+    extractor = StreamingCodeBlockExtractor()
+    count = 0
+    for start in range(0, len(text), CHUNK_SIZE):
+        count += len(extractor.feed(text[start:start + CHUNK_SIZE]))
+    return count + len(extractor.close())
+
+def main(megabytes: int = 4, adversarial_kb: int = 16) -> None:
+    for label, text in build_inputs(megabytes, adversarial_kb).items():
+        legacy = timed(lambda: re.findall(LEGACY_PATTERN, text, re.DOTALL))
+        whole = timed(lambda: extract_code_blocks(text))
+        stream = timed(lambda: chunked(text))
+        print(f"{label:<34} regex {legacy * 1000:9.1f} ms   extractor {whole * 1000:8.1f} ms   "
+              f"chunked {stream * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,51 @@
+# benchmarks/bench_render.py
+import os
+import sys
+import time
+from typing import Any, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jinja2 import Environment, FileSystemLoader
+from core_system import CoreSystem
+
+CONFIG = {
+    'plugin_directory': ["action_plugins", "base_plugin_lib"],
+    'template_dir': "data/templates/",
+    'string_dir': "data/strings/",
+    'debug': False,
+    'warm_up_templates': True
+}
+
+def measure(label: str, call: Callable[[], Any], iterations: int) -> float:
+    for _ in range(100):
+        call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    rate = iterations / (time.perf_counter() - start)
+    print(f"{label:<32} {rate:12.0f} renders/s")
+    return rate
+
+def main(iterations: int = 20000) -> None:
+    os.chdir(ROOT)
+    core = CoreSystem(CONFIG)
+    string_manager = core.get('string_manager')
+
+    # Replays the previous render path: default loader checks and a full context copy per call.
+    legacy_env = Environment(loader=FileSystemLoader(string_manager.template_dir))
+    legacy_strings = dict(string_manager.strings.items())
+    def legacy_render() -> str:
+        template = legacy_env.get_template('python_dev_final.j2')
+        context = legacy_strings.copy()
+        context.update(task='list the current directory content')
+        return template.render(context)
+
+    assert legacy_render() == string_manager.render_template('render_template', 'python_dev_final.j2', task='list the current directory content')
+    legacy = measure("legacy render", legacy_render, iterations)
+    cached = measure("cached render", lambda: string_manager.render_template('render_template', 'python_dev_final.j2', task='list the current directory content'), iterations)
+    print(f"speedup: {cached / legacy:.2f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,39 @@
+# benchmarks/bench_startup.py
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from core_system import CoreSystem
+core = CoreSystem({{
+    'plugin_directory': ["action_plugins", "base_plugin_lib"],
+    'template_dir': "data/templates/",
+    'string_dir': "data/strings/",
+    'debug': False,
+    'lazy_plugins': {lazy!r},
+    'plugin_index': {index!r}
+}})
+core.execute('container_set', key='answer', value="```python\\nprint(1)\\n```")
+core.execute('extract_markdown_python_code_blocks')
+"""
+
+def run_once(lazy: bool, index: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", SCRIPT.format(root=ROOT, lazy=lazy, index=index)], cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+def main(runs: int = 5) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        index = os.path.join(tmp, "plugin_index.json")
+        for label, lazy in (("eager", False), ("lazy", True)):
+            timings = sorted(run_once(lazy, index) for _ in range(runs))
+            print(f"{label:<8} one-action CLI run: median {timings[len(timings) // 2] * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
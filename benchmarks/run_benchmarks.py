@@ -0,0 +1,216 @@
+# benchmarks/run_benchmarks.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core_system import CoreSystem
+from code_block_extractor import extract_code_blocks
+from fake_llm import FakeLLMClient
+from plugin_base import PluginBase
+from snippet_executor import create_executor
+
+CONFIG = {
+    'plugin_directory': ["action_plugins", "base_plugin_lib"],
+    'template_dir': "data/templates/",
+    'string_dir': "data/strings/",
+    'debug': False
+}
+
+STARTUP_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from core_system import CoreSystem
+config = {config!r}
+config.update(lazy_plugins={lazy!r}, plugin_index={index!r})
+CoreSystem(config)
+"""
+
+SNIPPET = "total = 0\nfor i in range(200):\n    total += i\nprint(total)\n"
+
+class NoopPlugin(PluginBase):
+    def __init__(self, container, debug=False):
+        super().__init__(container, debug)
+        self.register_action('noop', self.noop)
+
+    def noop(self, *args, **kwargs):
+        return None
+
+def metric(value: float, unit: str, better: str) -> Dict[str, Any]:
+    return {"value": value, "unit": unit, "better": better}
+
+def per_call(call: Callable[[], Any], iterations: int, repeats: int = 5) -> float:
+    for _ in range(min(iterations, 1000)):
+        call()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            call()
+        timings.append((time.perf_counter() - start) / iterations)
+    return min(timings)
+
+def bench_startup(scale: float) -> Dict[str, Dict[str, Any]]:
+    runs = max(3, int(5 * scale))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        index = os.path.join(tmp, "plugin_index.json")
+        for label, lazy in (("cold_eager_ms", False), ("cold_lazy_ms", True)):
+            script = STARTUP_SCRIPT.format(root=ROOT, config=CONFIG, lazy=lazy, index=index)
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+                timings.append(time.perf_counter() - start)
+            results[label] = metric(statistics.median(timings) * 1000, "ms", "lower")
+    CoreSystem(CONFIG)
+    warm = [per_call(lambda: CoreSystem(CONFIG), 1, repeats=1) for _ in range(runs)]
+    results["warm_ms"] = metric(statistics.median(warm) * 1000, "ms", "lower")
+    return results
+
+def bench_dispatch(core: CoreSystem, scale: float) -> Dict[str, Dict[str, Any]]:
+    iterations = int(100000 * scale)
+    handle = core.action('noop')
+    results = {
+        "execute_ns": metric(per_call(lambda: core.execute('noop'), iterations) * 1e9, "ns", "lower"),
+        "di_layer_execute_ns": metric(per_call(lambda: core.di_layer.execute('noop'), iterations) * 1e9, "ns", "lower"),
+        "handle_ns": metric(per_call(handle, iterations) * 1e9, "ns", "lower"),
+        "container_get_ns": metric(per_call(lambda: core.execute('container_get', 'task'), iterations) * 1e9, "ns", "lower"),
+    }
+    registry = core.plugin_layer.registry
+    registry.enable_metrics(True)
+    try:
+        results["execute_instrumented_ns"] = metric(per_call(lambda: core.execute('noop'), iterations) * 1e9, "ns", "lower")
+    finally:
+        registry.enable_metrics(False)
+        registry.metrics.snapshot(reset=True)
+    return results
+
+def bench_render(core: CoreSystem, scale: float) -> Dict[str, Dict[str, Any]]:
+    iterations = int(10000 * scale)
+    seconds = per_call(lambda: core.execute('render_template', 'render_template', 'python_dev_final.j2', task='benchmark task'), iterations)
+    return {"renders_per_s": metric(1 / seconds, "renders/s", "higher")}
+
+def bench_extract(scale: float) -> Dict[str, Dict[str, Any]]:
+    unit = "Explanation.\n```python\nimport os\nprint(os.listdir('.'))\n```\n" + "More prose from the model. " * 40 + "\n"
+    text = unit * max(1, int(4 * 1024 * 1024 * scale) // len(unit))
+    seconds = per_call(lambda: extract_code_blocks(text), 1, repeats=3)
+    return {
+        "answer_mb_per_s": metric(len(text) / seconds / (1024 * 1024), "MB/s", "higher"),
+        "blocks_per_s": metric(len(extract_code_blocks(text)) / seconds, "blocks/s", "higher"),
+    }
+
+def bench_snippets(scale: float) -> Dict[str, Dict[str, Any]]:
+    count = max(8, int(200 * scale))
+    codes = [SNIPPET] * count
+    results = {}
+    for backend in ("inprocess", "process_pool"):
+        executor = create_executor({"backend": backend, "timeout": 30})
+        try:
+            executor.run_many(codes[:4])
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds = per_call(lambda: executor.run_many(codes), 1, repeats=3)
+        finally:
+            executor.shutdown()
+        results[f"{backend}_per_s"] = metric(count / seconds, "snippets/s", "higher")
+    return results
+
+def bench_agent(core: CoreSystem, scale: float) -> Dict[str, Dict[str, Any]]:
+    iterations = max(5, int(50 * scale))
+    core.set('llm_client', FakeLLMClient())
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for label, stream in (("end_to_end_ms", False), ("streaming_end_to_end_ms", True)):
+            seconds = per_call(lambda: core.execute('python_agent_exe', task='benchmark task', model='stub', stream=stream), iterations, repeats=3)
+            results[label] = metric(seconds * 1000, "ms", "lower")
+        tasks = [{'task': f'benchmark task {i}', 'model': 'stub'} for i in range(iterations * 4)]
+        for concurrency in (1, 8):
+            start = time.perf_counter()
+            for _ in core.execute_many('python_agent_exe', tasks, max_concurrency=concurrency):
+                pass
+            results[f"batch_c{concurrency}_per_s"] = metric(len(tasks) / (time.perf_counter() - start), "runs/s", "higher")
+    return results
+
+def run(scale: float, only: List[str]) -> Dict[str, Any]:
+    os.chdir(ROOT)
+    with contextlib.redirect_stdout(io.StringIO()):
+        core = CoreSystem(CONFIG)
+    NoopPlugin(core.di_layer, False)
+    core.set('task', 'benchmark task')
+    suites = {
+        "startup": lambda: bench_startup(scale),
+        "dispatch": lambda: bench_dispatch(core, scale),
+        "render": lambda: bench_render(core, scale),
+        "extract": lambda: bench_extract(scale),
+        "snippets": lambda: bench_snippets(scale),
+        "agent": lambda: bench_agent(core, scale),
+    }
+    metrics: Dict[str, Any] = {}
+    for name, suite in suites.items():
+        if only and name not in only:
+            continue
+        for key, value in suite().items():
+            metrics[f"{name}.{key}"] = value
+            print(f"{name + '.' + key:<40} {value['value']:14.2f} {value['unit']}", file=sys.stderr)
+    return {
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "metrics": metrics,
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    rows = []
+    for name, new in current["metrics"].items():
+        old = baseline["metrics"].get(name)
+        if old is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        worse = change > threshold if new["better"] == "lower" else change < -threshold
+        rows.append({"metric": name, "baseline": old["value"], "current": new["value"], "change": change, "regression": worse})
+    return rows
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PromptFlow benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("-o", "--output", help="result file (default: stdout)")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="multiplier for iteration counts and input sizes")
+    run_parser.add_argument("--only", nargs="*", default=[], help="subset of suites to run")
+    compare_parser = commands.add_parser("compare", help="compare two result files and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="relative change treated as a regression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = json.dumps(run(args.scale, args.only), indent=4)
+        if args.output:
+            with open(args.output, "w") as output:
+                output.write(results)
+        else:
+            print(results)
+        return 0
+
+    with open(args.baseline) as baseline, open(args.current) as current:
+        rows = compare(json.load(baseline), json.load(current), args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<40} {row['baseline']:14.2f} {row['current']:14.2f} {row['change'] * 100:+8.1f}%  {flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
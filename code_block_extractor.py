@@ -0,0 +1,109 @@
+# code_block_extractor.py
+import re
+from typing import Iterable, List, NamedTuple, Optional
+
+FENCE_PATTERN = re.compile(r"```|'''")
+TAG_PATTERN = re.compile(r"[A-Za-z0-9_+\-.#]*")
+PYTHON_LANGUAGES = ("python", "py", "python3")
+MAX_TAG_LENGTH = 64
+
+_TEXT, _TAG, _INFO, _CODE = range(4)
+
+class CodeBlock(NamedTuple):
+    language: str
+    code: str
+
+class StreamingCodeBlockExtractor:
+    def __init__(self, languages: Optional[Iterable[str]] = PYTHON_LANGUAGES, max_block_size: Optional[int] = None):
+        self.languages = None if languages is None else frozenset(language.lower() for language in languages)
+        self.max_block_size = max_block_size
+        self.pending = ""
+        self.state = _TEXT
+        self.fence = ""
+        self.tag = ""
+        self.parts: List[str] = []
+        self.size = 0
+        self.keep = False
+
+    def feed(self, text: str) -> List[CodeBlock]:
+        buffer = self.pending + text if self.pending else text
+        self.pending = ""
+        blocks: List[CodeBlock] = []
+        pos = 0
+        end = len(buffer)
+        while pos < end:
+            if self.state == _TEXT:
+                match = FENCE_PATTERN.search(buffer, pos)
+                if match is None:
+                    # A fence may straddle chunks: hold back a possible two-character prefix.
+                    self.pending = buffer[max(pos, end - 2):]
+                    if self.pending and self.pending[-1] not in "`'":
+                        self.pending = ""
+                    return blocks
+                self.fence = match.group()
+                self.tag = ""
+                self.state = _TAG
+                pos = match.end()
+            elif self.state == _TAG:
+                tag_end = min(TAG_PATTERN.match(buffer, pos).end(), pos + MAX_TAG_LENGTH - len(self.tag))
+                self.tag += buffer[pos:tag_end]
+                pos = tag_end
+                if pos < end or len(self.tag) == MAX_TAG_LENGTH:
+                    self._open_block()
+            elif self.state == _INFO:
+                while pos < end and buffer[pos] in " \t":
+                    pos += 1
+                if pos == end:
+                    break
+                if buffer[pos] == "\r":
+                    if pos + 1 == end:
+                        self.pending = "\r"
+                        break
+                    pos += 2 if buffer[pos + 1] == "\n" else 1
+                elif buffer[pos] == "\n":
+                    pos += 1
+                self.state = _CODE
+            else:
+                index = buffer.find(self.fence, pos)
+                if index == -1:
+                    safe = max(pos, end - 2)
+                    self._append(buffer[pos:safe])
+                    self.pending = buffer[safe:]
+                    return blocks
+                self._append(buffer[pos:index])
+                if self.keep:
+                    blocks.append(CodeBlock(self.tag.lower(), "".join(self.parts)))
+                self.parts = []
+                self.size = 0
+                self.state = _TEXT
+                pos = index + len(self.fence)
+        return blocks
+
+    def close(self) -> List[CodeBlock]:
+        # Unterminated blocks are dropped, matching the behaviour of the non-streaming pattern.
+        self.pending = ""
+        self.parts = []
+        self.size = 0
+        self.state = _TEXT
+        return []
+
+    def _open_block(self) -> None:
+        language = self.tag.lower()
+        self.keep = self.languages is None or language in self.languages
+        self.parts = []
+        self.size = 0
+        self.state = _INFO
+
+    def _append(self, text: str) -> None:
+        if not self.keep or not text:
+            return
+        self.size += len(text)
+        if self.max_block_size is not None and self.size > self.max_block_size:
+            self.keep = False
+            self.parts = []
+            return
+        self.parts.append(text)
+
+def extract_code_blocks(text: str, languages: Optional[Iterable[str]] = PYTHON_LANGUAGES) -> List[CodeBlock]:
+    extractor = StreamingCodeBlockExtractor(languages)
+    return extractor.feed(text) + extractor.close()
@@ -1,60 +1,129 @@
 # core_system.py
 import logging
-from typing import List, Any, Optional, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Any, Optional, Dict, ContextManager, Iterable, Iterator, Tuple
+from batch_executor import BatchExecutor, BatchResult
+from hot_reload import HotReloader
 from plugin_management_layer import PluginManagementLayer
-from dependency_injection_layer import DependencyInjectionLayer
+from plugin_registry import ActionHandle
+from prefork_server import PreforkServer
+from dependency_injection_layer import DependencyInjectionLayer, ContainerScope
 from logger import LoggerFactory
 from custom_exceptions import CoreSystemError
 
 class CoreSystem:
     def __init__(self, config: Dict[str, Any]):
+        self.config = config
         self.debug = config.get('debug', True)
+        LoggerFactory.configure(self.debug, config.get('log_levels'), propagate=config.get('log_propagate', True))
         self.logger = LoggerFactory.create_logger(self.__class__.__name__, self.debug)
-        self.logger.debug(f"Initializing CoreSystem with config: {config}")
+        self.logger.debug("Initializing CoreSystem with config: %s", config)
 
-        self.di_layer = DependencyInjectionLayer(self.debug)
-        self.plugin_layer = PluginManagementLayer(config.get('plugin_directory', []), self.di_layer, self.debug)
+        self.di_layer = DependencyInjectionLayer(self.debug, **(config.get('container') or {}))
+        lazy_plugins = config.get('lazy_plugins', False)
+        self.plugin_layer = PluginManagementLayer(
+            config.get('plugin_directory', []), self.di_layer, self.debug,
+            lazy=lazy_plugins,
+            index_path=config.get('plugin_index', "data/plugin_index.json") if lazy_plugins else None,
+        )
+        self._resolve = self.plugin_layer.registry.resolve
+        self._resolve_async = self.plugin_layer.registry.resolve_async
+        metrics_config = config.get('metrics') or {}
+        if metrics_config.get('trace_capacity'):
+            self.plugin_layer.registry.metrics.spans = deque(maxlen=metrics_config['trace_capacity'])
+        if metrics_config.get('enabled'):
+            self.plugin_layer.registry.enable_metrics(True)
+        if config.get('async_workers'):
+            self.plugin_layer.registry.executor = ThreadPoolExecutor(max_workers=config['async_workers'])
         
+        hot_reload = config.get('hot_reload') or {}
+        if hot_reload.get('enabled'):
+            self.plugin_layer.registry.track_in_flight(True)
+
         self._initialize_dependencies()
-        self._initialize_core_plugins(config.get('template_dir', ""), config.get('string_dir', ""))
+        self._initialize_core_plugins()
+
+        self.reloader = HotReloader(self, hot_reload.get('interval', 1.0), self.debug)
+        if hot_reload.get('enabled'):
+            self.reloader.start()
 
     def _initialize_dependencies(self):
         self.logger.debug("Initializing dependencies")
         try:
             self.di_layer.set('core_system', self)
+            self.di_layer.set('config', self.config)
             self.di_layer.set('plugin_manager', self.plugin_layer)
             self.di_layer.register_with_plugin_manager(self.plugin_layer)
+            self.plugin_layer.registry.metrics.register_with_plugin_manager(self.plugin_layer)
+            # Core plugins found in a plugin directory, or rebuilt by a reload, get the configured arguments too.
+            for _, plugin_class, args in self._core_plugins():
+                self.plugin_layer.set_plugin_args(plugin_class, *args)
             self.plugin_layer.load_plugins()
         except Exception as e:
-            self.logger.error(f"Failed to initialize dependencies: {str(e)}")
+            self.logger.error("Failed to initialize dependencies: %s", e)
             raise CoreSystemError(f"Failed to initialize dependencies: {str(e)}")
 
-    def _initialize_core_plugins(self, template_dir: str, string_dir: str) -> None:
+    def _core_plugins(self) -> List[Tuple[str, Any, Tuple[Any, ...]]]:
         from base_plugin_lib.action_manager import ActionManagerPlugin
         from base_plugin_lib.string_manager import StringManagerPlugin
 
-        self._initialize_plugin('action_manager', ActionManagerPlugin, template_dir, string_dir)
-        self._initialize_plugin('string_manager', StringManagerPlugin, template_dir, string_dir)
+        template_dir = self.config.get('template_dir') or "data/templates"
+        string_dir = self.config.get('string_dir') or "data/strings"
+        return [('action_manager', ActionManagerPlugin, ()),
+                ('string_manager', StringManagerPlugin, (template_dir, string_dir))]
+
+    def _initialize_core_plugins(self) -> None:
+        for key, plugin_class, args in self._core_plugins():
+            self._initialize_plugin(key, plugin_class, *args)
+        if self.config.get('warm_up_templates'):
+            self.execute('warm_up_templates')
 
     def _initialize_plugin(self, key: str, plugin_class: Any, *args: Any):
         if not self.di_layer.get(key):
-            self.logger.debug(f"Initializing plugin: {key}")
+            self.logger.debug("Initializing plugin: %s", key)
             plugin = plugin_class(self.di_layer, self.debug, *args)
             plugin.load()
             self.di_layer.set(key, plugin)
 
     def execute(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
         try:
-            self.logger.debug(f"Executing action: {action_name}")
-            result = self.di_layer.execute(action_name, *args, **kwargs)
-            self.logger.debug(f"Action {action_name} executed successfully")
-            return result
+            return self._resolve(action_name)(*args, **kwargs)
+        except Exception as e:
+            self.logger.error("Error executing action '%s': %s", action_name, e)
+            raise CoreSystemError(f"Error executing action '{action_name}': {str(e)}")
+
+    async def aexecute(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await self._resolve_async(action_name)(*args, **kwargs)
         except Exception as e:
-            self.logger.error(f"Error executing action '{action_name}': {str(e)}")
+            self.logger.error("Error executing action '%s': %s", action_name, e)
             raise CoreSystemError(f"Error executing action '{action_name}': {str(e)}")
 
-    def set(self, key: str, value: Any, expected_type: Optional[type] = None) -> None:
-        self.di_layer.set(key, value, expected_type)
+    def execute_many(self, action_name: str, inputs: Iterable[Any], max_concurrency: Optional[int] = None,
+                     executor: Optional[str] = None) -> Iterator[BatchResult]:
+        batch_config = self.config.get('batch') or {}
+        batch = BatchExecutor(self, max_concurrency or batch_config.get('max_concurrency'),
+                              executor or batch_config.get('executor', "thread"))
+        return batch.run(action_name, inputs)
+
+    def serve(self, **options: Any) -> PreforkServer:
+        server_config = dict(self.config.get('server') or {}, **options)
+        server_config.setdefault('debug', self.debug)
+        return PreforkServer(self, **server_config).start()
+
+    def reload(self, *paths: str) -> Dict[str, List[str]]:
+        return self.reloader.reload(list(paths))
+
+    def action(self, action_name: str) -> ActionHandle:
+        return self.plugin_layer.handle(action_name)
+
+    def scope(self, **values: Any) -> ContextManager[ContainerScope]:
+        return self.di_layer.scope(**values)
+
+    def set(self, key: str, value: Any, expected_type: Optional[type] = None, ttl: Optional[float] = None,
+            evictable: Optional[bool] = None) -> None:
+        self.di_layer.set(key, value, expected_type, ttl, evictable)
 
     def get(self, key: str, expected_type: Optional[type] = None) -> Any:
         return self.di_layer.get(key, expected_type)
@@ -4,6 +4,10 @@ class CoreSystemError(Exception):
     """Exception raised for errors in the Core System."""
     pass
 
+class QueueFullError(CoreSystemError):
+    """Exception raised when a request arrives while the server's request queue is full."""
+    pass
+
 class DependencyInjectionError(Exception):
     """Exception raised for errors in the Dependency Injection Layer."""
     pass
@@ -19,3 +23,7 @@ class PluginLoaderError(Exception):
 class PluginRegistryError(Exception):
     """Exception raised for errors in the Plugin Registry."""
     pass
+
+class WorkflowError(Exception):
+    """Exception raised for errors in the Workflow Engine."""
+    pass
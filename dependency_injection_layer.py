@@ -1,30 +1,232 @@
 # dependency_injection_layer.py
+import contextvars
+import heapq
 import logging
-from typing import Any, Optional, Dict
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional, Dict, Iterable, Iterator, List, Set, Tuple
 from logger import LoggerFactory
 from custom_exceptions import DependencyInjectionError
 
+# Infrastructure keys are never sized, expired or evicted.
+PINNED_KEYS = ('core_system', 'config', 'plugin_manager', 'action_manager', 'string_manager')
+# Shared objects a value may reference without owning them; their size is not charged to the key.
+SHARED_TYPES = (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                types.CodeType, types.FrameType, threading.Thread)
+
+def deep_size(value: Any, shared: Iterable[int] = (), max_objects: int = 2000) -> int:
+    """
+    Approximate memory held by a value: sys.getsizeof over containers and instance attributes, each
+    object once. The walk stops after max_objects objects, so very large graphs are undercounted.
+    """
+    seen: Set[int] = set(shared)
+    limit = len(seen) + max_objects
+    stack = [value]
+    total = 0
+    while stack and len(seen) < limit:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        try:
+            total += sys.getsizeof(obj)
+        except TypeError:
+            continue
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            attributes = getattr(obj, '__dict__', None)
+            if isinstance(attributes, dict):
+                stack.append(attributes)
+            for slot in getattr(type(obj), '__slots__', ()):
+                if isinstance(slot, str) and hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+class ContainerEntry:
+    __slots__ = ('size', 'expires')
+
+    def __init__(self, size: int, expires: Optional[float]):
+        self.size = size
+        self.expires = expires
+
+class ContainerScope:
+    __slots__ = ('data', 'parent')
+
+    def __init__(self, parent: Optional['ContainerScope'], values: Dict[str, Any]):
+        self.data = values
+        self.parent = parent
+
 class DependencyInjectionLayer:
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, max_bytes: Optional[int] = None, ttl: Optional[Dict[str, float]] = None,
+                 evictable: Iterable[str] = (), pinned: Iterable[str] = (), accounting: bool = False,
+                 max_size_objects: int = 2000):
         self.debug = debug
         self.logger = LoggerFactory.create_logger(self.__class__.__name__, self.debug)
         self.data: Dict[str, Any] = {}
+        self.current_scope: contextvars.ContextVar[Optional[ContainerScope]] = contextvars.ContextVar(
+            f"container_scope_{id(self)}", default=None)
+        # Sizes, expiry and eviction only apply to the shared base; scope overlays are short-lived.
+        self.max_bytes = max_bytes
+        self.ttl: Dict[str, float] = dict(ttl or {})
+        self.evictable: Set[str] = set(evictable)
+        self.pinned: Set[str] = set(PINNED_KEYS) | set(pinned)
+        self.bounded = bool(accounting or max_bytes is not None or self.ttl)
+        self.max_size_objects = max_size_objects
+        self.entries: Dict[str, ContainerEntry] = {}
+        # (expires, key) pairs; stale pairs left by an overwrite or eviction are skipped when popped.
+        self.expiry: List[Tuple[float, str]] = []
+        self.lru: "OrderedDict[str, None]" = OrderedDict()
+        self.total_bytes = 0
+        self.counters = {'evictions': 0, 'evicted_bytes': 0, 'expirations': 0}
+        self.lock = threading.RLock()
         self.actions = {
             'container_set': self.set,
-            'container_get': self.get
+            'container_get': self.get,
+            'container_stats': self.stats
         }
 
-    def set(self, key: str, value: Any, expected_type: Optional[type] = None) -> None:
+    @contextmanager
+    def scope(self, **values: Any) -> Iterator[ContainerScope]:
+        # Writes inside the scope land in an overlay; reads fall through to enclosing scopes, then to the shared base.
+        scope = ContainerScope(self.current_scope.get(), values)
+        token = self.current_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            self.current_scope.reset(token)
+
+    def set(self, key: str, value: Any, expected_type: Optional[type] = None, ttl: Optional[float] = None,
+            evictable: Optional[bool] = None) -> None:
         if expected_type and not isinstance(value, expected_type):
             raise DependencyInjectionError(f"Value for {key} must be of type {expected_type}")
-        self.data[key] = value
-        self.logger.debug(f"Set {key} to {value}")
+        scope = self.current_scope.get()
+        if scope is None:
+            if self.bounded or ttl is not None or evictable is not None:
+                self._store(key, value, ttl, evictable)
+            else:
+                self.data[key] = value
+        else:
+            scope.data[key] = value
+        self.logger.debug("Set %s (%s)", key, type(value).__name__)
+
+    def _store(self, key: str, value: Any, ttl: Optional[float], evictable: Optional[bool]) -> None:
+        if key in self.pinned:
+            self.data[key] = value
+            return
+        self.bounded = True
+        if evictable is not None:
+            (self.evictable.add if evictable else self.evictable.discard)(key)
+        if ttl is None:
+            ttl = self.ttl.get(key)
+        # Objects reachable through the container itself or the infrastructure keys are not charged to this key.
+        shared = [id(self)] + [id(self.data[name]) for name in self.pinned if name in self.data]
+        size = deep_size(value, shared, self.max_size_objects)
+        with self.lock:
+            now = time.monotonic()
+            # Expired keys are swept on every write, so keys that are never read again still go away.
+            self._expire(now)
+            self.data[key] = value
+            previous = self.entries.get(key)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            expires = now + ttl if ttl is not None else None
+            self.entries[key] = ContainerEntry(size, expires)
+            if expires is not None:
+                heapq.heappush(self.expiry, (expires, key))
+                if len(self.expiry) > 2 * len(self.entries) + 64:
+                    self.expiry = [(entry.expires, name) for name, entry in self.entries.items() if entry.expires is not None]
+                    heapq.heapify(self.expiry)
+            self.total_bytes += size
+            if key in self.evictable:
+                self.lru[key] = None
+                self.lru.move_to_end(key)
+            else:
+                self.lru.pop(key, None)
+            self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        # Least recently used evictable keys go first; the key just written is kept even if it alone exceeds the budget.
+        if self.max_bytes is None or self.total_bytes <= self.max_bytes:
+            return
+        for key in list(self.lru):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key != keep:
+                self.counters['evicted_bytes'] += self.entries[key].size
+                self._drop(key, 'evictions')
+
+    def _expire(self, now: float) -> None:
+        expiry = self.expiry
+        while expiry and expiry[0][0] <= now:
+            expires, key = heapq.heappop(expiry)
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires == expires:
+                self._drop(key, 'expirations')
+
+    def _drop(self, key: str, reason: str) -> None:
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry.size
+        self.lru.pop(key, None)
+        self.data.pop(key, None)
+        self.counters[reason] += 1
+        self.logger.debug("Dropped %s (%s, %d bytes)", key, reason, entry.size)
+
+    def _touch(self, key: str, value: Any) -> Any:
+        entry = self.entries.get(key)
+        if entry is None or (entry.expires is None and key not in self.lru):
+            return value
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return value
+            if entry.expires is not None and entry.expires <= time.monotonic():
+                self._drop(key, 'expirations')
+                return None
+            if key in self.lru:
+                self.lru.move_to_end(key)
+        return value
+
+    def pin(self, *keys: str) -> None:
+        with self.lock:
+            for key in keys:
+                self.pinned.add(key)
+                entry = self.entries.pop(key, None)
+                if entry is not None:
+                    self.total_bytes -= entry.size
+                self.lru.pop(key, None)
+
+    def stats(self, top: int = 5) -> Dict[str, Any]:
+        with self.lock:
+            self._expire(time.monotonic())
+            largest = sorted(self.entries.items(), key=lambda item: item[1].size, reverse=True)[:top]
+            return dict(self.counters, keys=len(self.data), tracked_keys=len(self.entries), bytes=self.total_bytes,
+                        max_bytes=self.max_bytes, evictable_keys=list(self.lru), pinned_keys=sorted(self.pinned & set(self.data)),
+                        largest=[(key, entry.size) for key, entry in largest])
 
     def get(self, key: str, expected_type: Optional[type] = None) -> Any:
-        value = self.data.get(key)
+        scope = self.current_scope.get()
+        while scope is not None:
+            if key in scope.data:
+                value = scope.data[key]
+                break
+            scope = scope.parent
+        else:
+            value = self.data.get(key)
+            if self.bounded:
+                value = self._touch(key, value)
         if expected_type and not isinstance(value, expected_type):
             raise DependencyInjectionError(f"Value for {key} is not of the expected type {expected_type}")
-        self.logger.debug(f"Retrieved {key}: {value}")
+        self.logger.debug("Retrieved %s", key)
         return value
 
     def execute(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
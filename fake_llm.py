@@ -0,0 +1,111 @@
+# fake_llm.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+DEFAULT_ANSWER = "Here is the code:\n```python\nimport os\nprint(os.listdir('.'))\n```\n"
+
+class FakeLLMClient:
+    def __init__(self, answer: str = DEFAULT_ANSWER, chunk_size: int = 8, token_delay: float = 0.0):
+        self.answer = answer
+        self.chunk_size = chunk_size
+        self.token_delay = token_delay
+        self.calls = 0
+
+    def respond(self, model: str, messages: List[Dict[str, Any]]) -> str:
+        return self.answer
+
+    def chat(self, model: str, messages: List[Dict[str, Any]], stream: bool = False,
+             options: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Union[Dict[str, Any], Iterator[Dict[str, Any]]]:
+        self.calls += 1
+        answer = self.respond(model, messages)
+        if stream:
+            return self._stream(model, answer)
+        time.sleep(self.token_delay * (len(answer) // self.chunk_size + 1))
+        return {'model': model, 'message': {'role': 'assistant', 'content': answer}, 'done': True}
+
+    def _stream(self, model: str, answer: str) -> Iterator[Dict[str, Any]]:
+        for start in range(0, len(answer), self.chunk_size):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield {'model': model, 'message': {'role': 'assistant', 'content': answer[start:start + self.chunk_size]}, 'done': False}
+        yield {'model': model, 'message': {'role': 'assistant', 'content': ''}, 'done': True}
+
+class FakeLLMServer:
+    """Serves FakeLLMClient answers over Ollama's /api/chat HTTP protocol on a local port."""
+
+    def __init__(self, client: Optional[FakeLLMClient] = None, host: str = "127.0.0.1", port: int = 0, fail_requests: int = 0):
+        self.client = client or FakeLLMClient()
+        self.fail_requests = fail_requests
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server.lock:
+                    server.requests += 1
+                    failing = server.requests <= server.fail_requests
+                if self.path != "/api/chat" or failing:
+                    status = 404 if self.path != "/api/chat" else 503
+                    self._send(status, "application/json", json.dumps({"error": "unavailable"}).encode("utf-8"))
+                    return
+                response = server.client.chat(body.get("model", ""), body.get("messages", []),
+                                              stream=body.get("stream", True), options=body.get("options"))
+                if isinstance(response, dict):
+                    self._send(200, "application/json", json.dumps(response).encode("utf-8"))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for part in response:
+                    line = json.dumps(part).encode("utf-8") + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _send(self, status: int, content_type: str, payload: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self) -> 'FakeLLMServer':
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-llm-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self) -> 'FakeLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
@@ -0,0 +1,131 @@
+# hot_reload.py
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from logger import LoggerFactory
+
+class FileWatcher:
+    """Polls directory trees for created, modified and deleted files; no platform-specific notification API needed."""
+
+    def __init__(self, paths: List[str], callback: Callable[[List[str]], None], interval: float = 1.0, debug: bool = False):
+        self.paths = [path for path in paths if path]
+        self.logger = LoggerFactory.create_logger(self.__class__.__name__, debug)
+        self.callback = callback
+        self.interval = interval
+        self.state = self.snapshot()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state: Dict[str, Tuple[int, int]] = {}
+        for root in self.paths:
+            for directory, dirnames, filenames in os.walk(root):
+                dirnames[:] = [name for name in dirnames if name != "__pycache__" and not name.startswith(".")]
+                for filename in filenames:
+                    path = os.path.join(directory, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    state[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def poll(self) -> List[str]:
+        state = self.snapshot()
+        changed = sorted(path for path in set(state) | set(self.state) if state.get(path) != self.state.get(path))
+        self.state = state
+        return changed
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            # A failing poll or callback is reported and retried on the next change; it never ends the watcher.
+            try:
+                changed = self.poll()
+                if changed:
+                    self.callback(changed)
+            except Exception as e:
+                self.logger.error("File watcher callback failed: %s", e)
+
+    def start(self) -> 'FileWatcher':
+        self.thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+class HotReloader:
+    """Maps changed files to the narrowest reload: one plugin module, one template, or the string index."""
+
+    def __init__(self, core_system: Any, interval: float = 1.0, debug: bool = False):
+        self.core_system = core_system
+        self.interval = interval
+        self.logger = LoggerFactory.create_logger(self.__class__.__name__, debug)
+        self.lock = threading.Lock()
+        self.watcher: Optional[FileWatcher] = None
+
+    def _roots(self) -> Dict[str, List[str]]:
+        string_manager = self.core_system.get('string_manager')
+        return {
+            "plugins": [os.path.abspath(path) for path in self.core_system.plugin_layer.loader.directories],
+            "templates": [os.path.abspath(string_manager.template_dir)] if string_manager else [],
+            "strings": [os.path.abspath(string_manager.string_dir)] if string_manager else [],
+        }
+
+    @staticmethod
+    def _relative(path: str, roots: List[str]) -> Optional[str]:
+        for root in roots:
+            if os.path.commonpath([root, path]) == root:
+                return os.path.relpath(path, root).replace(os.sep, "/")
+        return None
+
+    def reload(self, paths: List[str]) -> Dict[str, List[str]]:
+        summary: Dict[str, List[str]] = {"plugins": [], "templates": [], "strings": [], "errors": []}
+        roots = self._roots()
+        string_manager = self.core_system.get('string_manager')
+        strings_reloaded = False
+        with self.lock:
+            for path in paths:
+                path = os.path.abspath(path)
+                if path.endswith(".py") and self._relative(path, roots["plugins"]) is not None:
+                    if os.path.basename(path).startswith("__"):
+                        continue
+                    try:
+                        self.core_system.plugin_layer.reload_plugin_file(path)
+                        summary["plugins"].append(path)
+                    except Exception as e:
+                        summary["errors"].append(f"{path}: {str(e)}")
+                    continue
+                template_name = self._relative(path, roots["templates"])
+                if template_name is not None:
+                    try:
+                        string_manager.invalidate_template(template_name)
+                        summary["templates"].append(template_name)
+                    except Exception as e:
+                        summary["errors"].append(f"{path}: {str(e)}")
+                    continue
+                if path.endswith(".json") and self._relative(path, roots["strings"]) is not None and not strings_reloaded:
+                    strings_reloaded = True
+                    try:
+                        summary["strings"] = string_manager.reload_strings()
+                    except Exception as e:
+                        # Typically a string file caught half-saved; the next change to it triggers another attempt.
+                        summary["errors"].append(f"{path}: {str(e)}")
+        log = self.logger.warning if summary["errors"] else self.logger.info
+        log("Reloaded plugins=%s templates=%s strings=%s errors=%s",
+            summary["plugins"], summary["templates"], summary["strings"], summary["errors"])
+        return summary
+
+    def start(self) -> None:
+        roots = self._roots()
+        self.watcher = FileWatcher(roots["plugins"] + roots["templates"] + roots["strings"], self.reload, self.interval,
+                                   self.logger.level <= logging.DEBUG).start()
+
+    def stop(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
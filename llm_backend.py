@@ -0,0 +1,326 @@
+# llm_backend.py
+import asyncio
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from llm_cache import ResponseCache
+
+try:
+    import ollama
+except ImportError:
+    ollama = None
+
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+LIMIT_OPTIONS = ("max_concurrency", "rate", "burst", "retries", "backoff", "coalesce")
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # Takes a token now and returns how long the caller must wait before using it.
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class LeaderCancelled(Exception):
+    """The request a coalesced call was waiting on was cancelled; the waiter retries on its own."""
+
+class LLMBackend(ABC):
+    """Shared entry point for model calls: concurrency limit, rate limit, retries and coalescing of identical requests."""
+
+    def __init__(self, max_concurrency: Optional[int] = None, rate: Optional[float] = None, burst: Optional[float] = None,
+                 retries: int = 2, backoff: float = 0.5, coalesce: bool = True):
+        self.max_concurrency = max_concurrency
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.coalesce = coalesce
+        self.in_flight: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "upstream_calls": 0, "coalesced": 0, "retries": 0, "errors": 0,
+                      "active": 0, "throttled_seconds": 0.0}
+
+    # Backend specific calls; messages are in the Ollama chat format.
+    @abstractmethod
+    def _chat(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> str:
+        pass
+
+    def _stream(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> Iterator[str]:
+        yield self._chat(model, messages, options)
+
+    async def _achat(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> str:
+        return await asyncio.get_running_loop().run_in_executor(None, self._chat, model, messages, options)
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def messages(prompt: str) -> List[Dict[str, Any]]:
+        return [{'role': 'user', 'content': prompt}]
+
+    @staticmethod
+    def retryable(error: BaseException) -> bool:
+        return isinstance(error, (ConnectionError, TimeoutError)) or getattr(error, 'status_code', None) in RETRYABLE_STATUS
+
+    def _count(self, name: str, amount: Any = 1) -> None:
+        with self.lock:
+            self.stats[name] += amount
+
+    def _throttle(self) -> float:
+        delay = self.bucket.reserve() if self.bucket else 0.0
+        if delay:
+            self._count("throttled_seconds", delay)
+        return delay
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self.lock:
+            future = self.in_flight.get(key) if self.coalesce else None
+            if future is not None:
+                return future, False
+            future = Future()
+            if self.coalesce:
+                self.in_flight[key] = future
+            return future, True
+
+    def _settle(self, key: str, future: Future, answer: Optional[str], error: Optional[BaseException]) -> None:
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+        if error is None:
+            future.set_result(answer)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # Cancellation or interruption belongs to the leader alone; waiting callers elect a new leader.
+            future.set_exception(LeaderCancelled())
+
+    def chat(self, model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        key = ResponseCache.make_key(model, prompt, options)
+        self._count("requests")
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                answer = future.result()
+            except LeaderCancelled:
+                continue
+            self._count("coalesced")
+            return answer
+        answer, error = None, None
+        try:
+            answer = self._call(model, self.messages(prompt), options)
+        except BaseException as e:
+            error = e
+        self._settle(key, future, answer, error)
+        if error is not None:
+            raise error
+        return answer
+
+    def _call(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> str:
+        attempt = 0
+        while True:
+            time.sleep(self._throttle())
+            if self.slots:
+                self.slots.acquire()
+            self._count("active")
+            self._count("upstream_calls")
+            try:
+                return self._chat(model, messages, options)
+            except Exception as e:
+                if attempt >= self.retries or not self.retryable(e):
+                    self._count("errors")
+                    raise
+            finally:
+                self._count("active", -1)
+                if self.slots:
+                    self.slots.release()
+            attempt += 1
+            self._count("retries")
+            time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def stream(self, model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        # Streams are not coalesced, and only a failure before the first chunk is retried.
+        self._count("requests")
+        attempt = 0
+        while True:
+            time.sleep(self._throttle())
+            if self.slots:
+                self.slots.acquire()
+            self._count("active")
+            self._count("upstream_calls")
+            started = False
+            try:
+                for chunk in self._stream(model, self.messages(prompt), options):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or attempt >= self.retries or not self.retryable(e):
+                    self._count("errors")
+                    raise
+            finally:
+                self._count("active", -1)
+                if self.slots:
+                    self.slots.release()
+            attempt += 1
+            self._count("retries")
+            time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    async def achat(self, model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        key = ResponseCache.make_key(model, prompt, options)
+        self._count("requests")
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded so a cancelled waiter does not cancel the shared future under the leader.
+                answer = await asyncio.shield(asyncio.wrap_future(future))
+            except LeaderCancelled:
+                continue
+            self._count("coalesced")
+            return answer
+        answer, error = None, None
+        try:
+            answer = await self._acall(model, self.messages(prompt), options)
+        except BaseException as e:
+            error = e
+        self._settle(key, future, answer, error)
+        if error is not None:
+            raise error
+        return answer
+
+    async def _acall(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> str:
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._throttle())
+            # The slots are shared with threads and other event loops, so poll rather than block the loop.
+            while self.slots and not self.slots.acquire(blocking=False):
+                await asyncio.sleep(0.005)
+            self._count("active")
+            self._count("upstream_calls")
+            try:
+                return await self._achat(model, messages, options)
+            except Exception as e:
+                if attempt >= self.retries or not self.retryable(e):
+                    self._count("errors")
+                    raise
+            finally:
+                self._count("active", -1)
+                if self.slots:
+                    self.slots.release()
+            attempt += 1
+            self._count("retries")
+            await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["coalescing"] = len(self.in_flight)
+        stats["backend"] = self.__class__.__name__
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+
+class ClientBackend(LLMBackend):
+    """Wraps any object with Ollama's chat(model, messages, stream, options) signature, e.g. the ollama module."""
+
+    def __init__(self, client: Any, **options: Any):
+        super().__init__(**options)
+        self.client = client
+
+    @staticmethod
+    def _chat_kwargs(model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        chat_kwargs: Dict[str, Any] = {'model': model, 'messages': messages}
+        if options:
+            chat_kwargs['options'] = options
+        return chat_kwargs
+
+    def _chat(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> str:
+        return self.client.chat(**self._chat_kwargs(model, messages, options))['message']['content']
+
+    def _stream(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> Iterator[str]:
+        for part in self.client.chat(stream=True, **self._chat_kwargs(model, messages, options)):
+            yield part['message']['content']
+
+class OllamaBackend(ClientBackend):
+    """Persistent ollama.Client/AsyncClient pair; connections are kept alive and pooled by httpx."""
+
+    def __init__(self, host: Optional[str] = None, timeout: Optional[float] = None, **options: Any):
+        if ollama is None:
+            raise ImportError("The 'ollama' backend needs the ollama package.")
+        import httpx
+        client_options: Dict[str, Any] = {'timeout': timeout}
+        if options.get('max_concurrency'):
+            client_options['limits'] = httpx.Limits(max_connections=options['max_concurrency'],
+                                                    max_keepalive_connections=options['max_concurrency'])
+        super().__init__(ollama.Client(host=host, **client_options), **options)
+        self.host = host
+        self.client_options = client_options
+        self.async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+
+    def _async_client(self) -> Any:
+        # httpx async clients are bound to the event loop that first used them.
+        loop = asyncio.get_running_loop()
+        client = self.async_clients.get(loop)
+        if client is None:
+            client = self.async_clients[loop] = ollama.AsyncClient(host=self.host, **self.client_options)
+        return client
+
+    async def _achat(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]]) -> str:
+        response = await self._async_client().chat(**self._chat_kwargs(model, messages, options))
+        return response['message']['content']
+
+    def close(self) -> None:
+        self.client.close()
+        for loop, client in list(self.async_clients.items()):
+            self._close_async_client(loop, client)
+        self.async_clients.clear()
+
+    @staticmethod
+    def _close_async_client(loop: asyncio.AbstractEventLoop, client: Any) -> None:
+        # Each async client is closed on the loop that owns its connections. Connections of a loop that is
+        # already closed cannot be shut down through it; dropping the client lets them be collected.
+        if loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is running:
+            loop.create_task(client.close())
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.close(), loop).result()
+        else:
+            loop.run_until_complete(client.close())
+
+class FakeBackend(ClientBackend):
+    """Offline backend answering from fake_llm.FakeLLMClient."""
+
+    def __init__(self, answer: Optional[str] = None, chunk_size: int = 8, token_delay: float = 0.0, **options: Any):
+        from fake_llm import DEFAULT_ANSWER, FakeLLMClient
+        super().__init__(FakeLLMClient(answer or DEFAULT_ANSWER, chunk_size, token_delay), **options)
+
+LLM_BACKENDS = {
+    "ollama": OllamaBackend,
+    "fake": FakeBackend,
+}
+
+def create_backend(options: Optional[Dict[str, Any]] = None) -> LLMBackend:
+    options = dict(options or {})
+    backend = options.pop("backend", "ollama")
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{backend}'.")
+    return LLM_BACKENDS[backend](**options)
@@ -0,0 +1,151 @@
+# llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import sqlite_util
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    response TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE INDEX IF NOT EXISTS responses_created ON responses (created);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('total_size', 0);
+"""
+
+class ResponseCache:
+    def __init__(self, path: Optional[str] = None, memory_entries: int = 256, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, touch_interval: float = 60.0):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        # key -> (created, response, when the disk row's accessed time was last brought up to date)
+        self.memory: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._connection().executescript(SCHEMA)
+
+    @staticmethod
+    def make_key(model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps({"model": model, "options": options or {}, "prompt": prompt}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        return sqlite_util.connection(self.local, self.path)
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    touch = self.path is not None and now - entry[2] >= self.touch_interval
+                    if touch:
+                        self.memory[key] = (entry[0], entry[1], now)
+                else:
+                    del self.memory[key]
+                    entry = None
+        if entry is not None:
+            # Memory hits still refresh the disk row (throttled per key), so size eviction keeps hot entries.
+            if touch:
+                self._connection().execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return entry[1]
+        if self.path:
+            connection = self._connection()
+            row = connection.execute("SELECT created, response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and not self._expired(row[0], now):
+                connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                with self.lock:
+                    self._remember(key, row[0], row[1], now)
+                    self.stats["disk_hits"] += 1
+                return row[1]
+        with self.lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, response: str, model: str = "") -> None:
+        now = time.time()
+        with self.lock:
+            self._remember(key, now, response, now)
+            self.stats["writes"] += 1
+        if not self.path:
+            return
+        size = len(response.encode("utf-8"))
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            connection.execute("INSERT OR REPLACE INTO responses (key, model, created, accessed, size, response) "
+                               "VALUES (?, ?, ?, ?, ?, ?)", (key, model, now, now, size, response))
+            connection.execute("UPDATE meta SET value = value + ? WHERE name = 'total_size'", (size - (row[0] if row else 0),))
+            evicted = self._evict(connection, now)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if evicted:
+            with self.lock:
+                self.stats["evictions"] += evicted
+
+    def _remember(self, key: str, created: float, response: str, touched: float) -> None:
+        self.memory[key] = (created, response, touched)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> int:
+        evicted = 0
+        if self.ttl is not None:
+            expired = connection.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE created < ?",
+                                         (now - self.ttl,)).fetchone()
+            if expired[1]:
+                connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                connection.execute("UPDATE meta SET value = value - ? WHERE name = 'total_size'", (expired[0],))
+                evicted += expired[1]
+        if self.max_bytes is None:
+            return evicted
+        total = connection.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+        while total > self.max_bytes:
+            rows = connection.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        connection.execute("UPDATE meta SET value = ? WHERE name = 'total_size'", (total,))
+        return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self.memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        if self.path:
+            row = self._connection().execute("SELECT COUNT(*), (SELECT value FROM meta WHERE name = 'total_size') FROM responses").fetchone()
+            stats["disk_entries"], stats["disk_bytes"] = row
+        return stats
@@ -1,12 +1,108 @@
 # logger.py
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Dict, Optional, Union
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 class LoggerFactory:
-    @staticmethod
-    def create_logger(name: str, debug: bool = False) -> logging.Logger:
+    _lock = threading.Lock()
+    _queue_handler: Optional[logging.handlers.QueueHandler] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _handler: Optional[logging.Handler] = None
+    _levels: Dict[str, int] = {}
+    _default_level: Optional[int] = None
+    _propagate = True
+    _suspended = False
+
+    @classmethod
+    def configure(cls, debug: bool = False, levels: Optional[Dict[str, Union[str, int]]] = None,
+                  handler: Optional[logging.Handler] = None, propagate: bool = True) -> None:
+        # With propagate=False records reach only the queue handler, not handlers on the root or parent loggers.
+        levels = {name: cls._to_level(level) for name, level in (levels or {}).items()}
+        with cls._lock:
+            cls._default_level = logging.DEBUG if debug else logging.INFO
+            cls._levels = levels
+            cls._propagate = propagate
+            if handler is not None:
+                cls._stop_listener()
+            cls._ensure_handler(handler)
+        for name, level in cls._levels.items():
+            logging.getLogger(name).setLevel(level)
+        for logger in list(logging.root.manager.loggerDict.values()):
+            if isinstance(logger, logging.Logger) and cls._queue_handler in logger.handlers:
+                logger.propagate = propagate
+
+    @classmethod
+    def create_logger(cls, name: str, debug: bool = False) -> logging.Logger:
         logger = logging.getLogger(name)
-        logger.setLevel(logging.DEBUG if debug else logging.INFO)
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-        logger.addHandler(handler)
+        default_level = cls._default_level
+        if default_level is None:
+            default_level = logging.DEBUG if debug else logging.INFO
+        logger.setLevel(cls._levels.get(name, default_level))
+        queue_handler = cls._queue_handler
+        if queue_handler is None:
+            with cls._lock:
+                queue_handler = cls._ensure_handler()
+        if queue_handler not in logger.handlers:
+            logger.addHandler(queue_handler)
+        logger.propagate = cls._propagate
         return logger
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._lock:
+            cls._stop_listener()
+
+    @classmethod
+    def suspend(cls) -> None:
+        """Stops the listener thread in this process (records queue up); processes forked from it still start their own."""
+        with cls._lock:
+            if cls._listener is not None:
+                cls._stop_listener()
+                cls._suspended = True
+
+    @classmethod
+    def _ensure_handler(cls, handler: Optional[logging.Handler] = None) -> logging.handlers.QueueHandler:
+        if cls._queue_handler is None:
+            cls._queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        if cls._listener is None:
+            if handler is None:
+                handler = logging.StreamHandler()
+                handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            cls._handler = handler
+            cls._listener = logging.handlers.QueueListener(cls._queue_handler.queue, handler, respect_handler_level=True)
+            cls._listener.start()
+        return cls._queue_handler
+
+    @staticmethod
+    def _to_level(level: Union[str, int]) -> int:
+        if isinstance(level, int):
+            return level
+        value = logging.getLevelName(str(level).upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Unknown log level {level!r}; expected one of DEBUG, INFO, WARNING, ERROR, CRITICAL or an int.")
+        return value
+
+    @classmethod
+    def _stop_listener(cls) -> None:
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        # The listener thread does not survive fork; a forked worker gets a fresh queue and its own listener.
+        cls._lock = threading.Lock()
+        if cls._listener is not None or cls._suspended:
+            cls._suspended = False
+            cls._queue_handler.queue = queue.SimpleQueue()
+            cls._listener = logging.handlers.QueueListener(cls._queue_handler.queue, cls._handler, respect_handler_level=True)
+            cls._listener.start()
+
+atexit.register(LoggerFactory.shutdown)
+os.register_at_fork(after_in_child=LoggerFactory._after_fork_in_child)
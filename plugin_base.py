@@ -1,8 +1,10 @@
 # plugin_base.py
 from plugin_interface import Plugin
 from typing import Any, Callable, Dict
+import inspect
 import logging
 from logger import LoggerFactory
+from plugin_registry import _run_coroutine
 from custom_exceptions import PluginManagementError
 
 class PluginBase(Plugin):
@@ -16,29 +18,40 @@ class PluginBase(Plugin):
         self.load()
 
     def execute(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
-        self.logger.debug(f"Executing action: {action_name}")
-        return self.container.get('core_system').execute(action_name, *args, **kwargs)
+        core_system = self.core_system or self.container.get('core_system')
+        return core_system.execute(action_name, *args, **kwargs)
+
+    async def aexecute(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
+        core_system = self.core_system or self.container.get('core_system')
+        return await core_system.aexecute(action_name, *args, **kwargs)
+
+    def action(self, action_name: str) -> Any:
+        core_system = self.core_system or self.container.get('core_system')
+        return core_system.action(action_name)
 
     def register_action(self, action_name: str, func: Callable) -> None:
-        self.logger.debug(f"Registering action: {action_name}")
+        self.logger.debug("Registering action: %s", action_name)
         self.actions[action_name] = func
         plugin_manager = self.container.get('plugin_manager')
         plugin_manager.register_action(action_name, self)
-        self.logger.debug(f"Registered action: {action_name}")
+        self.logger.debug("Registered action: %s", action_name)
 
     def load(self) -> None:
-        self.logger.debug(f"Loading plugin: {self.__class__.__name__}")
+        self.logger.debug("Loading plugin: %s", self.__class__.__name__)
         for action_name, action_func in self.actions.items():
             self.register_action(action_name, action_func)
-        self.logger.debug(f"Actions registered for plugin: {self.__class__.__name__}")
+        self.logger.debug("Actions registered for plugin: %s", self.__class__.__name__)
 
     def unload(self) -> None:
         pass
 
     def execute_action(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
-        self.logger.debug(f"Executing action in {self.__class__.__name__}: {action_name}")
+        self.logger.debug("Executing action in %s: %s", self.__class__.__name__, action_name)
         if action_name in self.actions:
-            return self.actions[action_name](*args, **kwargs)
+            func = self.actions[action_name]
+            if inspect.iscoroutinefunction(func):
+                return _run_coroutine(func, *args, **kwargs)
+            return func(*args, **kwargs)
         else:
             raise PluginManagementError(f"No action defined for '{action_name}' in {self.__class__.__name__}.")
 
@@ -1,26 +1,34 @@
 # plugin_loader.py
+import ast
 import importlib.util
 import os
+import re
+import sys
 import logging
 import inspect
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from plugin_base import PluginBase
+from file_manager import FileManager
 from logger import LoggerFactory
 from custom_exceptions import PluginLoaderError
 
+INDEX_VERSION = 1
+
 class PluginLoader:
-    def __init__(self, directories: list[str], debug: bool = False):
+    def __init__(self, directories: list[str], debug: bool = False, index_path: Optional[str] = None):
         self.directories = directories
         self.debug = debug
+        self.index_path = index_path
+        self.modules: Dict[str, Any] = {}
         self.logger = LoggerFactory.create_logger(self.__class__.__name__, self.debug)
-        self.logger.debug(f"PluginLoader initialized with directories: {directories}")
+        self.logger.debug("PluginLoader initialized with directories: %s", directories)
 
     def load_plugins(self) -> Dict[str, Any]:
         plugins: Dict[str, Any] = {}
         for directory in self.directories:
-            self.logger.debug(f"Loading plugins from directory: {directory}")
+            self.logger.debug("Loading plugins from directory: %s", directory)
             if not os.path.exists(directory):
-                self.logger.warning(f"Plugin directory does not exist: {directory}")
+                self.logger.warning("Plugin directory does not exist: %s", directory)
                 continue
             plugins.update(self._load_plugins_from_directory(directory))
         return plugins
@@ -29,20 +37,128 @@ class PluginLoader:
         plugins: Dict[str, Any] = {}
         for filename in os.listdir(directory):
             if filename.endswith(".py") and not filename.startswith("__"):
-                self.logger.debug(f"Loading plugin: {filename}")
+                self.logger.debug("Loading plugin: %s", filename)
                 try:
                     module = self._load_module(os.path.join(directory, filename))
-                    for name, obj in inspect.getmembers(module):
-                        if inspect.isclass(obj) and issubclass(obj, PluginBase) and obj != PluginBase:
-                            plugins[obj.__name__] = obj
-                            self.logger.debug(f"Loaded plugin class: {obj.__name__}")
+                    for obj in self.plugin_classes(module, defined_only=False):
+                        plugins[obj.__name__] = obj
+                        self.logger.debug("Loaded plugin class: %s", obj.__name__)
                 except Exception as e:
-                    self.logger.error(f"Error loading plugin from {filename}: {str(e)}")
+                    self.logger.error("Error loading plugin from %s: %s", filename, e)
                     raise PluginLoaderError(f"Error loading plugin from {filename}: {str(e)}")
         return plugins
 
     def _load_module(self, filepath: str) -> Any:
-        spec = importlib.util.spec_from_file_location("plugin_module", filepath)
+        filepath = os.path.normpath(filepath)
+        if filepath in self.modules:
+            return self.modules[filepath]
+        module_name = self.module_name(filepath)
+        spec = importlib.util.spec_from_file_location(module_name, filepath)
         module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+        self.modules[filepath] = module
         return module
+
+    @staticmethod
+    def plugin_classes(module: Any, defined_only: bool = True) -> List[Any]:
+        return [obj for _, obj in inspect.getmembers(module, inspect.isclass)
+                if issubclass(obj, PluginBase) and obj != PluginBase and (not defined_only or obj.__module__ == module.__name__)]
+
+    def reload_module(self, filepath: str) -> Any:
+        # Executes the current source under the same module name; on failure the previous module stays in place.
+        filepath = os.path.normpath(filepath)
+        module_name = self.module_name(filepath)
+        previous = self.modules.pop(filepath, None)
+        previous_entry = sys.modules.get(module_name)
+        try:
+            return self._load_module(filepath)
+        except BaseException:
+            if previous is not None:
+                self.modules[filepath] = previous
+            if previous_entry is not None:
+                sys.modules[module_name] = previous_entry
+            raise
+
+    def forget(self, filepath: str) -> None:
+        self.modules.pop(os.path.normpath(filepath), None)
+
+    @staticmethod
+    def module_name(filepath: str) -> str:
+        stem = os.path.splitext(os.path.normpath(filepath))[0]
+        return "plugin_module_" + re.sub(r"\W", "_", stem)
+
+    def load_plugin_class(self, filepath: str, class_name: str) -> Any:
+        try:
+            plugin_class = getattr(self._load_module(filepath), class_name)
+        except Exception as e:
+            self.logger.error("Error loading plugin %s from %s: %s", class_name, filepath, e)
+            raise PluginLoaderError(f"Error loading plugin {class_name} from {filepath}: {str(e)}")
+        if not (inspect.isclass(plugin_class) and issubclass(plugin_class, PluginBase)):
+            raise PluginLoaderError(f"{class_name} in {filepath} is not a plugin class.")
+        return plugin_class
+
+    def build_index(self) -> Tuple[Dict[str, Tuple[str, str]], List[Tuple[str, str]]]:
+        stored = FileManager.read_json(self.index_path) if self.index_path else None
+        stored_files = stored["files"] if stored and stored.get("version") == INDEX_VERSION else {}
+        files: Dict[str, Any] = {}
+        changed = False
+        for directory in self.directories:
+            if not os.path.exists(directory):
+                self.logger.warning("Plugin directory does not exist: %s", directory)
+                continue
+            for filename in sorted(os.listdir(directory)):
+                if not filename.endswith(".py") or filename.startswith("__"):
+                    continue
+                filepath = os.path.normpath(os.path.join(directory, filename))
+                stat = os.stat(filepath)
+                entry = stored_files.get(filepath)
+                if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                    self.logger.debug("Indexing plugin source: %s", filepath)
+                    entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "classes": self._scan_source(filepath)}
+                    changed = True
+                files[filepath] = entry
+        if self.index_path and (changed or set(files) != set(stored_files)):
+            FileManager.write_json(self.index_path, {"version": INDEX_VERSION, "files": files})
+
+        actions: Dict[str, Tuple[str, str]] = {}
+        eager: List[Tuple[str, str]] = []
+        for filepath, entry in files.items():
+            for plugin in entry["classes"]:
+                if plugin["dynamic"]:
+                    eager.append((filepath, plugin["name"]))
+                for action_name in plugin["actions"]:
+                    actions[action_name] = (filepath, plugin["name"])
+        return actions, eager
+
+    def _scan_source(self, filepath: str) -> List[Dict[str, Any]]:
+        try:
+            with open(filepath, "r") as source:
+                tree = ast.parse(source.read(), filename=filepath)
+        except SyntaxError as e:
+            raise PluginLoaderError(f"Error indexing plugin source {filepath}: {str(e)}")
+
+        plugin_names = {"PluginBase"}
+        classes = []
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            bases = {base.id if isinstance(base, ast.Name) else getattr(base, "attr", None) for base in node.bases}
+            if not bases & plugin_names:
+                continue
+            plugin_names.add(node.name)
+            actions: List[str] = []
+            dynamic = False
+            for child in ast.walk(node):
+                if (isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)
+                        and child.func.attr == "register_action"):
+                    if child.args and isinstance(child.args[0], ast.Constant) and isinstance(child.args[0].value, str):
+                        actions.append(child.args[0].value)
+                    else:
+                        dynamic = True
+            classes.append({"name": node.name, "actions": actions, "dynamic": dynamic or not actions})
+        return classes
@@ -1,43 +1,132 @@
 # plugin_management_layer.py
+import inspect
 import logging
-from typing import Any, List
+import os
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from plugin_loader import PluginLoader
-from plugin_registry import PluginRegistry
+from plugin_registry import PluginRegistry, ActionHandle
 from logger import LoggerFactory
 from custom_exceptions import PluginManagementError
 
 class PluginManagementLayer:
-    def __init__(self, plugin_directories: list, container: Any, debug: bool = False):
+    def __init__(self, plugin_directories: list, container: Any, debug: bool = False,
+                 lazy: bool = False, index_path: Optional[str] = None):
         self.container = container
         self.debug = debug
+        self.lazy = lazy
         self.logger = LoggerFactory.create_logger(self.__class__.__name__, self.debug)
         self.logger.debug("Initializing PluginManagementLayer")
 
-        self.loader = PluginLoader(plugin_directories, debug)
+        self.loader = PluginLoader(plugin_directories, debug, index_path)
         self.registry = PluginRegistry(debug)
+        # Extra constructor arguments per plugin class name, reused when a plugin is rebuilt by a reload.
+        self.plugin_args: Dict[str, Tuple[Any, ...]] = {}
+
+    def set_plugin_args(self, plugin_class: Any, *args: Any) -> None:
+        self.plugin_args[plugin_class.__name__] = args
 
     def load_plugins(self) -> None:
         self.logger.debug("Loading plugins")
         try:
+            if self.lazy:
+                self._index_plugins()
+                return
             plugins = self.loader.load_plugins()
             for plugin_class in plugins.values():
-                self.logger.debug(f"Instantiating plugin class: {plugin_class}")
-                plugin_instance = plugin_class(self.container, self.debug)
-                self.logger.debug(f"Loading plugin instance: {plugin_instance}")
-                plugin_instance.load()
-                self.registry.register_plugin(plugin_instance)
-                self.logger.debug(f"Loaded and registered plugin: {plugin_instance.__class__.__name__}")
+                self._instantiate(plugin_class)
         except Exception as e:
-            self.logger.error(f"Failed to load plugins: {str(e)}")
+            self.logger.error("Failed to load plugins: %s", e)
             raise PluginManagementError(f"Failed to load plugins: {str(e)}")
 
+    def _instantiate(self, plugin_class: Any) -> Any:
+        self.logger.debug("Instantiating plugin class: %s", plugin_class)
+        plugin_instance = plugin_class(self.container, self.debug, *self.plugin_args.get(plugin_class.__name__, ()))
+        self.logger.debug("Loading plugin instance: %s", plugin_instance)
+        plugin_instance.load()
+        self.registry.register_plugin(plugin_instance)
+        self.logger.debug("Loaded and registered plugin: %s", plugin_instance.__class__.__name__)
+        return plugin_instance
+
+    def _index_plugins(self) -> None:
+        actions, eager = self.loader.build_index()
+        loaders: Dict[Tuple[str, str], Callable[[], Any]] = {}
+        for action_name, plugin_ref in actions.items():
+            if plugin_ref in eager:
+                continue
+            if plugin_ref not in loaders:
+                loaders[plugin_ref] = partial(self._load_indexed_plugin, *plugin_ref)
+            self.registry.register_lazy_action(action_name, loaders[plugin_ref])
+        for filepath, class_name in eager:
+            self._load_indexed_plugin(filepath, class_name)
+
+    def _load_indexed_plugin(self, filepath: str, class_name: str) -> Any:
+        try:
+            return self._instantiate(self.loader.load_plugin_class(filepath, class_name))
+        except Exception as e:
+            self.logger.error("Failed to load plugin %s: %s", class_name, e)
+            raise PluginManagementError(f"Failed to load plugin {class_name}: {str(e)}")
+
+    def _instances_from(self, filepath: str) -> List[Any]:
+        target = os.path.abspath(filepath)
+        instances: List[Any] = []
+        for plugin in list(self.registry.plugins.values()) + list(self.registry.actions.values()):
+            try:
+                source = os.path.abspath(inspect.getfile(type(plugin)))
+            except TypeError:
+                continue
+            if source == target and not any(plugin is known for known in instances):
+                instances.append(plugin)
+        return instances
+
+    def reload_plugin_file(self, filepath: str) -> List[str]:
+        """Re-imports one plugin source and swaps its actions in; returns the action names now served by it."""
+        filepath = os.path.normpath(filepath)
+        retired = self._instances_from(filepath)
+        if self.lazy and not retired:
+            # Nothing from this file has been loaded yet: refresh the index and let first use import it.
+            self.loader.forget(filepath)
+            self._index_plugins()
+            return []
+        classes: List[Any] = []
+        if os.path.exists(filepath):
+            try:
+                classes = self.loader.plugin_classes(self.loader.reload_module(filepath))
+            except Exception as e:
+                self.logger.error("Reloading %s failed, keeping the previous version: %s", filepath, e)
+                raise PluginManagementError(f"Failed to reload {filepath}: {str(e)}")
+        self.logger.debug("Reloading %s: retiring %d instance(s), loading %d class(es)", filepath, len(retired), len(classes))
+        try:
+            with self.registry.swap(retired):
+                fresh = [self._instantiate(plugin_class) for plugin_class in classes]
+        except Exception as e:
+            self.logger.error("Reloading %s failed, keeping the previous version: %s", filepath, e)
+            raise PluginManagementError(f"Failed to reload {filepath}: {str(e)}")
+        replacements = {plugin.__class__.__name__: plugin for plugin in fresh}
+        for old in retired:
+            replacement = replacements.get(old.__class__.__name__)
+            for key, value in list(self.container.data.items()):
+                if value is old and replacement is not None:
+                    self.container.set(key, replacement)
+            # Calls already running on the old instance finish there; unload() runs after the last one returns.
+            self.registry.retire(old, old.unload)
+        return [name for plugin in fresh for name in plugin.get_actions()]
+
     def register_action(self, action_name: str, plugin_instance: Any) -> None:
-        self.logger.debug(f"Registering action {action_name} from plugin {plugin_instance.__class__.__name__}")
+        self.logger.debug("Registering action %s from plugin %s", action_name, plugin_instance.__class__.__name__)
         self.registry.register_action(action_name, plugin_instance)
 
     def execute_action(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
-        self.logger.debug(f"Executing action: {action_name}")
-        return self.registry.execute_action(action_name, *args, **kwargs)
+        return self.registry.resolve(action_name)(*args, **kwargs)
+
+    async def aexecute_action(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
+        return await self.registry.resolve_async(action_name)(*args, **kwargs)
+
+    def resolve(self, action_name: str) -> Callable:
+        return self.registry.resolve(action_name)
+
+    def handle(self, action_name: str) -> ActionHandle:
+        return self.registry.handle(action_name)
 
     def list_actions(self) -> List[str]:
         return self.registry.get_actions()
@@ -1,15 +1,114 @@
 # plugin_registry.py
+import asyncio
+import contextvars
+import inspect
 import logging
-from typing import Dict, Any, List
+import threading
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from functools import partial, wraps
+from typing import Dict, Any, List, Callable, Iterator, Optional
 from logger import LoggerFactory
+from action_metrics import ActionMetrics
 from custom_exceptions import PluginRegistryError
 
+def _run_coroutine(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(func(*args, **kwargs))
+    raise PluginRegistryError(f"Async action '{func.__name__}' cannot be called synchronously from a running event loop; use aexecute.")
+
+class ActionHandle:
+    __slots__ = ('name', '_registry', '_func', '_version')
+
+    def __init__(self, registry: 'PluginRegistry', name: str):
+        self.name = name
+        self._registry = registry
+        self._func = registry.resolve(name)
+        self._version = registry.version
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self._version != self._registry.version:
+            self._func = self._registry.resolve(self.name)
+            self._version = self._registry.version
+        return self._func(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"ActionHandle({self.name!r})"
+
+class InFlightTracker:
+    """Counts running calls per plugin instance so a replaced instance is unloaded only once its calls have finished."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.retiring: Dict[int, Callable[[], None]] = {}
+        self.lock = threading.Lock()
+
+    def _enter(self, key: int) -> None:
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _exit(self, key: int) -> None:
+        with self.lock:
+            count = self.counts[key] - 1
+            if count:
+                self.counts[key] = count
+                return
+            del self.counts[key]
+            callback = self.retiring.pop(key, None)
+        if callback is not None:
+            callback()
+
+    def wrap(self, plugin_instance: Any, func: Callable) -> Callable:
+        key = id(plugin_instance)
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def tracked_async(*args: Any, **kwargs: Any) -> Any:
+                self._enter(key)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._exit(key)
+            return tracked_async
+
+        @wraps(func)
+        def tracked(*args: Any, **kwargs: Any) -> Any:
+            self._enter(key)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(key)
+        return tracked
+
+    def in_flight(self, plugin_instance: Any) -> int:
+        with self.lock:
+            return self.counts.get(id(plugin_instance), 0)
+
+    def retire(self, plugin_instance: Any, callback: Callable[[], None]) -> None:
+        key = id(plugin_instance)
+        with self.lock:
+            if self.counts.get(key):
+                self.retiring[key] = callback
+                return
+        callback()
+
 class PluginRegistry:
     def __init__(self, debug: bool = False):
         self.debug = debug
         self.logger = LoggerFactory.create_logger(self.__class__.__name__, self.debug)
         self.plugins: Dict[str, Any] = {}
         self.actions: Dict[str, Any] = {}
+        self.dispatch_table: Dict[str, Callable] = {}
+        self.async_dispatch_table: Dict[str, Callable] = {}
+        self.executor: Optional[Executor] = None
+        self.lazy_actions: Dict[str, Callable[[], Any]] = {}
+        self.lazy_lock = threading.RLock()
+        self.metrics = ActionMetrics()
+        self.in_flight: Optional[InFlightTracker] = None
+        self.staged: Optional[Dict[str, Any]] = None
+        self.swap_lock = threading.RLock()
+        self.version = 0
 
     def register_plugin(self, plugin_instance: Any) -> None:
         self.plugins[plugin_instance.__class__.__name__] = plugin_instance
@@ -20,17 +119,131 @@ class PluginRegistry:
             self.register_action(action_name, plugin_instance)
 
     def register_action(self, action_name: str, plugin_instance: Any) -> None:
-        self.logger.debug(f"Registering action {action_name} from plugin {plugin_instance.__class__.__name__}")
+        self.logger.debug("Registering action %s from plugin %s", action_name, plugin_instance.__class__.__name__)
+        if self.staged is not None:
+            self.staged[action_name] = plugin_instance
+            return
         self.actions[action_name] = plugin_instance
+        self.dispatch_table.pop(action_name, None)
+        self.async_dispatch_table.pop(action_name, None)
+        self.version += 1
 
-    def execute_action(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
-        self.logger.debug(f"Executing action: {action_name}")
-        if action_name in self.actions:
-            plugin_instance = self.actions[action_name]
-            return plugin_instance.execute_action(action_name, *args, **kwargs)
+    def enable_metrics(self, enabled: bool = True) -> None:
+        # Instrumentation is baked into the dispatch tables, so toggling it re-resolves every action.
+        self.metrics.enabled = enabled
+        self.dispatch_table.clear()
+        self.async_dispatch_table.clear()
+        self.version += 1
+
+    def track_in_flight(self, enabled: bool = True) -> None:
+        # Like metrics, call tracking is wrapped into the dispatch tables only while it is on.
+        self.in_flight = InFlightTracker() if enabled else None
+        self.dispatch_table.clear()
+        self.async_dispatch_table.clear()
+        self.version += 1
+
+    @contextmanager
+    def swap(self, retired: List[Any]) -> Iterator[None]:
+        """
+        Actions registered inside the block are staged and then published together with the removal
+        of every action owned by a retired instance, so callers see either the old set or the new one.
+        """
+        with self.swap_lock:
+            self.staged = {}
+            try:
+                yield
+                staged = self.staged
+            finally:
+                self.staged = None
+            actions = {name: plugin for name, plugin in self.actions.items() if not any(plugin is old for old in retired)}
+            actions.update(staged)
+            affected = set(staged) | (set(self.actions) - set(actions))
+            for name, plugin in list(self.plugins.items()):
+                if any(plugin is old for old in retired):
+                    del self.plugins[name]
+            for plugin in staged.values():
+                self.plugins.setdefault(plugin.__class__.__name__, plugin)
+            # Publish the action map before dropping cached callables, then bump the version for handles.
+            self.actions = actions
+            self.dispatch_table = {name: func for name, func in self.dispatch_table.items() if name not in affected}
+            self.async_dispatch_table = {name: func for name, func in self.async_dispatch_table.items() if name not in affected}
+            self.version += 1
+
+    def retire(self, plugin_instance: Any, callback: Callable[[], None]) -> None:
+        if self.in_flight is None:
+            callback()
         else:
-            self.logger.error(f"No action defined for '{action_name}'")
+            self.in_flight.retire(plugin_instance, callback)
+
+    def register_lazy_action(self, action_name: str, loader: Callable[[], Any]) -> None:
+        self.lazy_actions[action_name] = loader
+        self.version += 1
+
+    def _load_lazy(self, action_name: str) -> None:
+        with self.lazy_lock:
+            loader = self.lazy_actions.get(action_name)
+            if loader is None or action_name in self.actions:
+                return
+            self.logger.debug("Loading plugin on first use of action %s", action_name)
+            loader()
+            for name in [name for name, pending in self.lazy_actions.items() if pending is loader]:
+                del self.lazy_actions[name]
+
+    def resolve(self, action_name: str) -> Callable:
+        func = self.dispatch_table.get(action_name)
+        if func is not None:
+            return func
+        version = self.version
+        func = self._lookup(action_name)
+        if inspect.iscoroutinefunction(func):
+            func = partial(_run_coroutine, func)
+        if self.version == version:
+            self.dispatch_table[action_name] = func
+        return func
+
+    def resolve_async(self, action_name: str) -> Callable:
+        func = self.async_dispatch_table.get(action_name)
+        if func is not None:
+            return func
+        version = self.version
+        func = self._lookup(action_name)
+        if not inspect.iscoroutinefunction(func):
+            func = partial(self._run_in_executor, func)
+        if self.version == version:
+            self.async_dispatch_table[action_name] = func
+        return func
+
+    def _lookup(self, action_name: str) -> Callable:
+        if action_name not in self.actions and action_name in self.lazy_actions:
+            self._load_lazy(action_name)
+        if action_name not in self.actions:
+            self.logger.error("No action defined for '%s'", action_name)
             raise PluginRegistryError(f"No action defined for '{action_name}'.")
+        plugin_instance = self.actions[action_name]
+        plugin_actions = getattr(plugin_instance, 'actions', None)
+        if isinstance(plugin_actions, dict) and action_name in plugin_actions:
+            func = plugin_actions[action_name]
+        else:
+            func = partial(plugin_instance.execute_action, action_name)
+        if self.metrics.enabled:
+            func = self.metrics.wrap(action_name, func)
+        if self.in_flight is not None:
+            func = self.in_flight.wrap(plugin_instance, func)
+        return func
+
+    async def _run_in_executor(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, partial(context.run, func, *args, **kwargs))
+
+    def handle(self, action_name: str) -> ActionHandle:
+        return ActionHandle(self, action_name)
+
+    def execute_action(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve(action_name)(*args, **kwargs)
+
+    async def aexecute_action(self, action_name: str, *args: Any, **kwargs: Any) -> Any:
+        return await self.resolve_async(action_name)(*args, **kwargs)
 
     def get_actions(self) -> List[str]:
-        return list(self.actions.keys())
+        return list(self.actions.keys()) + [name for name in self.lazy_actions if name not in self.actions]
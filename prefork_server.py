@@ -0,0 +1,382 @@
+# prefork_server.py
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import recv_handle, send_handle
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from custom_exceptions import CoreSystemError, QueueFullError
+from logger import LoggerFactory
+
+class Request(NamedTuple):
+    action: str
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    deadline: float
+    future: Future
+
+def _worker_main(core_system: Any, connection: Any) -> None:
+    # Runs in a forked child: the CoreSystem, its plugins, templates and strings are inherited copy-on-write.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        action_name, args, kwargs = message
+        start = time.perf_counter()
+        try:
+            with core_system.scope():
+                value, error = core_system.execute(action_name, *args, **kwargs), None
+        except Exception as e:
+            value, error = None, str(e) or type(e).__name__
+        duration = time.perf_counter() - start
+        try:
+            connection.send((value, error, duration))
+        except Exception as e:
+            connection.send((None, f"Result of '{action_name}' cannot be sent back: {e}", duration))
+
+def _zygote_main(core_system: Any, control: Any) -> None:
+    # Forks every worker. The zygote runs no request or dispatch threads, and the log listener that the
+    # fork hook started here is stopped, so a child never inherits a lock that another thread happened to
+    # hold at fork time. Each worker starts its own listener from the same hook.
+    LoggerFactory.suspend()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Exited workers are reaped by the kernel; the master only ever signals them.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            message = control.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        parent_connection, child_connection = multiprocessing.Pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                control.close()
+                parent_connection.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                _worker_main(core_system, child_connection)
+            finally:
+                LoggerFactory.shutdown()
+                os._exit(0)
+        child_connection.close()
+        control.send(pid)
+        send_handle(control, parent_connection.fileno(), pid)
+        parent_connection.close()
+
+class Zygote:
+    """A process forked from the initialised CoreSystem before the server starts any thread; it forks the workers."""
+
+    def __init__(self, core_system: Any):
+        self.core_system = core_system
+        self.lock = threading.Lock()
+        self.process: Optional[Any] = None
+        self.control: Optional[Any] = None
+
+    def start(self) -> None:
+        context = multiprocessing.get_context("fork")
+        self.control, child_control = context.Pipe()
+        self.process = context.Process(target=_zygote_main, args=(self.core_system, child_control),
+                                       name="prefork-zygote", daemon=True)
+        self.process.start()
+        child_control.close()
+
+    def spawn(self) -> Tuple[int, Connection]:
+        with self.lock:
+            try:
+                self.control.send("spawn")
+                pid = self.control.recv()
+                return pid, Connection(recv_handle(self.control))
+            except (EOFError, OSError) as e:
+                raise CoreSystemError(f"The prefork zygote is gone, no worker can be started: {e}")
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        with self.lock:
+            try:
+                self.control.send(None)
+            except OSError:
+                pass
+        self.process.join()
+        self.control.close()
+        self.process, self.control = None, None
+
+class WorkerSlot:
+    """One pre-forked worker process plus the master thread that feeds it requests from the shared queue."""
+
+    def __init__(self, server: 'PreforkServer', number: int):
+        self.server = server
+        self.number = number
+        self.pid: Optional[int] = None
+        self.connection: Optional[Connection] = None
+        self.served = 0
+        self.busy_since: Optional[float] = None
+        self.thread = threading.Thread(target=self._run, name=f"prefork-dispatch-{number}", daemon=True)
+
+    def spawn(self) -> None:
+        self.pid, self.connection = self.server.zygote.spawn()
+        self.served = 0
+
+    def retire(self, kill: bool = False) -> None:
+        if self.pid is None:
+            return
+        if not kill:
+            try:
+                self.connection.send(None)
+                # The worker sends nothing after a stop message, so the pipe turns readable only at its EOF.
+                kill = not self.connection.poll(self.server.shutdown_timeout)
+            except OSError:
+                pass
+        if kill:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.connection.close()
+        self.pid, self.connection = None, None
+
+    def _run(self) -> None:
+        server = self.server
+        while True:
+            request = server.queue.get()
+            if request is None:
+                return
+            remaining = request.deadline - time.monotonic()
+            if remaining <= 0:
+                server._count("timeouts")
+                request.future.set_exception(TimeoutError(f"Request for '{request.action}' timed out in the queue."))
+                continue
+            if self.pid is None:
+                try:
+                    self.spawn()
+                except CoreSystemError as e:
+                    server._count("errors")
+                    request.future.set_exception(e)
+                    continue
+            self.busy_since = time.monotonic()
+            try:
+                self._dispatch(request, remaining)
+            finally:
+                self.busy_since = None
+            if self.pid is not None and server.max_requests and self.served >= server.max_requests:
+                server._count("recycled")
+                self.retire()
+
+    def _dispatch(self, request: Request, remaining: float) -> None:
+        server = self.server
+        try:
+            self.connection.send((request.action, request.args, request.kwargs))
+        except Exception as e:
+            # Arguments that cannot be pickled fail here, before the worker sees anything.
+            server._count("errors")
+            request.future.set_exception(CoreSystemError(f"Request for '{request.action}' cannot be sent to a worker: {e}"))
+            return
+        try:
+            ready = self.connection.poll(remaining)
+            reply = self.connection.recv() if ready else None
+        except (EOFError, OSError):
+            ready, reply = True, None
+        if reply is None:
+            # Timed out or crashed: the worker's state is unknown, so it is replaced (on the next request) rather than reused.
+            self.retire(kill=True)
+            server._count("restarts")
+            if not ready:
+                server._count("timeouts")
+                request.future.set_exception(TimeoutError(f"Request for '{request.action}' timed out."))
+            else:
+                server._count("errors")
+                request.future.set_exception(CoreSystemError(f"Worker exited while executing '{request.action}'."))
+            return
+        value, error, duration = reply
+        self.served += 1
+        server._count("completed")
+        if error is not None:
+            server._count("errors")
+            request.future.set_exception(CoreSystemError(error))
+        else:
+            request.future.set_result(value)
+
+    def stats(self) -> Dict[str, Any]:
+        busy_since = self.busy_since
+        return {"pid": self.pid, "served": self.served,
+                "busy_seconds": time.monotonic() - busy_since if busy_since is not None else None}
+
+class PreforkServer:
+    """
+    HTTP front end over a pool of worker processes forked from a fully initialised CoreSystem, so each
+    worker starts warm. Requests wait in a bounded queue; a worker that exceeds the request timeout is
+    killed and replaced, and workers are recycled after max_requests requests.
+
+        POST /execute  {"action": "...", "args": [...], "kwargs": {...}, "timeout": 10}
+        GET  /health   worker, queue and request counters
+    """
+
+    def __init__(self, core_system: Any, workers: Optional[int] = None, host: str = "127.0.0.1", port: int = 8765,
+                 queue_size: int = 1024, timeout: float = 30.0, max_requests: Optional[int] = 1000,
+                 shutdown_timeout: float = 5.0, debug: bool = False):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise CoreSystemError("The prefork server needs the 'fork' start method to share the CoreSystem.")
+        self.core_system = core_system
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_requests = max_requests
+        self.shutdown_timeout = shutdown_timeout
+        self.logger = LoggerFactory.create_logger(self.__class__.__name__, debug)
+        self.queue: "queue.Queue[Optional[Request]]" = queue.Queue(maxsize=queue_size)
+        self.zygote = Zygote(core_system)
+        self.slots: List[WorkerSlot] = []
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "completed": 0, "errors": 0, "timeouts": 0, "rejected": 0,
+                         "recycled": 0, "restarts": 0}
+        self.http_server: Optional[ThreadingHTTPServer] = None
+        self.http_thread: Optional[threading.Thread] = None
+        self.started: Optional[float] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.http_server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] += amount
+
+    def start(self, http: bool = True) -> 'PreforkServer':
+        self.zygote.start()
+        self.slots = [WorkerSlot(self, number) for number in range(self.workers)]
+        for slot in self.slots:
+            slot.spawn()
+        for slot in self.slots:
+            slot.thread.start()
+        if http:
+            self.http_server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+            self.http_server.daemon_threads = True
+            self.http_thread = threading.Thread(target=self.http_server.serve_forever, name="prefork-http", daemon=True)
+            self.http_thread.start()
+            self.logger.info("Serving on %s with %d workers", self.url, self.workers)
+        self.started = time.monotonic()
+        return self
+
+    def serve_forever(self) -> None:
+        if self.started is None:
+            self.start()
+        stopped = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopped.set())
+        stopped.wait()
+        self.stop()
+
+    def stop(self) -> None:
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+            self.http_server = None
+        while True:
+            try:
+                request = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.future.set_exception(CoreSystemError("Server is shutting down."))
+        for _ in self.slots:
+            self.queue.put(None)
+        for slot in self.slots:
+            slot.thread.join()
+            slot.retire()
+        self.slots = []
+        self.zygote.stop()
+        self.started = None
+
+    def submit(self, action_name: str, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Future:
+        """Queues an execute request; the future fails with QueueFullError, TimeoutError or CoreSystemError."""
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+            raise ValueError(f"timeout must be a positive number of seconds, not {timeout!r}")
+        now = time.monotonic()
+        request = Request(action_name, args, kwargs, now + (timeout or self.timeout), Future())
+        self._count("requests")
+        try:
+            self.queue.put_nowait(request)
+        except queue.Full:
+            self._count("rejected")
+            request.future.set_exception(QueueFullError(f"Request queue is full ({self.queue.maxsize} waiting)."))
+        return request.future
+
+    def execute(self, action_name: str, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        return self.submit(action_name, *args, timeout=timeout, **kwargs).result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.counters)
+        slots = [slot.stats() for slot in self.slots]
+        stats.update({
+            "workers": len(slots),
+            "busy": sum(1 for slot in slots if slot["busy_seconds"] is not None),
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "uptime": time.monotonic() - self.started if self.started is not None else 0.0,
+            "worker_stats": slots,
+        })
+        return stats
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                server.logger.debug(format, *args)
+
+            def _send(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                if self.path != "/health":
+                    self._send(404, {"error": f"Unknown path '{self.path}'."})
+                    return
+                self._send(200, server.stats())
+
+            def do_POST(self) -> None:
+                if self.path != "/execute":
+                    self._send(404, {"error": f"Unknown path '{self.path}'."})
+                    return
+                start = time.perf_counter()
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    action_name = body["action"]
+                    args, kwargs = list(body.get("args") or []), dict(body.get("kwargs") or {})
+                    future = server.submit(action_name, *args, timeout=body.get("timeout"), **kwargs)
+                except (ValueError, KeyError, TypeError) as e:
+                    self._send(400, {"error": f"Invalid request: {e}"})
+                    return
+                try:
+                    value = future.result()
+                except QueueFullError as e:
+                    self._send(503, {"error": str(e)})
+                except TimeoutError as e:
+                    self._send(504, {"error": str(e)})
+                except CoreSystemError as e:
+                    self._send(500, {"error": str(e)})
+                else:
+                    self._send(200, {"value": value, "duration": time.perf_counter() - start})
+
+        return Handler
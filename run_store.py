@@ -0,0 +1,323 @@
+# run_store.py
+import atexit
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from logger import LoggerFactory
+
+FORMAT = "promptflow-runs"
+VERSION = 1
+COLUMNS = ("run_id", "started", "duration", "status", "model", "template", "task", "prompt", "answer",
+           "snippets", "results", "timings", "error")
+STARTED, MODEL, STATUS = COLUMNS.index("started"), COLUMNS.index("model"), COLUMNS.index("status")
+# Columns holding one scalar or text reference per run; snippets, results and timings are collections.
+GROUP_COLUMNS = ("run_id", "started", "duration", "status", "model", "template", "task", "prompt", "answer", "error")
+
+class TextStore:
+    """Content-addressed, zlib-compressed texts; a text seen twice (a template, a cached answer) is stored once."""
+
+    def __init__(self, directory: str, inline_chars: int = 256, level: int = 6, cache_entries: int = 256):
+        self.directory = directory
+        self.inline_chars = inline_chars
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+        self._read = functools.lru_cache(maxsize=cache_entries)(self._read_blob)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.z")
+
+    def put(self, text: Optional[str]) -> Any:
+        # Short texts stay inline in the record; longer ones become {"sha256": ..., "chars": ...} references.
+        if text is None or len(text) <= self.inline_chars:
+            return text
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file and rename, so concurrent writers of the same text never see a partial blob.
+            with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), delete=False) as file:
+                file.write(zlib.compress(data, self.level))
+            os.replace(file.name, path)
+        return {"sha256": digest, "chars": len(text)}
+
+    def _read_blob(self, digest: str) -> str:
+        with open(self._path(digest), "rb") as file:
+            return zlib.decompress(file.read()).decode("utf-8")
+
+    def get(self, value: Any) -> Any:
+        if isinstance(value, dict) and "sha256" in value:
+            return self._read(value["sha256"])
+        return value
+
+class SegmentWriter:
+    """Appends records to one segment file and keeps its index: time range, models and statuses per block of records."""
+
+    def __init__(self, path: str, block_records: int):
+        self.path = path
+        self.block_records = block_records
+        self.file = open(path, "ab")
+        self.file.write(json.dumps({"format": FORMAT, "version": VERSION, "columns": COLUMNS}).encode("utf-8") + b"\n")
+        self.file.flush()
+        self.records = 0
+        self.index: Dict[str, Any] = {"records": 0, "min_started": None, "max_started": None,
+                                      "models": {}, "statuses": {}, "blocks": []}
+
+    def append(self, row: List[Any]) -> None:
+        line = json.dumps(row, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+        offset = self.file.tell()
+        self.file.write(line)
+        self.file.flush()
+        started, model, status = row[STARTED], row[MODEL], row[STATUS]
+        blocks = self.index["blocks"]
+        if not blocks or blocks[-1]["records"] >= self.block_records:
+            blocks.append({"offset": offset, "records": 0, "min_started": started, "max_started": started, "models": []})
+        block = blocks[-1]
+        block["records"] += 1
+        block["min_started"] = min(block["min_started"], started)
+        block["max_started"] = max(block["max_started"], started)
+        if model not in block["models"]:
+            block["models"].append(model)
+        index = self.index
+        index["records"] += 1
+        index["min_started"] = started if index["min_started"] is None else min(index["min_started"], started)
+        index["max_started"] = started if index["max_started"] is None else max(index["max_started"], started)
+        index["models"][model] = index["models"].get(model, 0) + 1
+        index["statuses"][status] = index["statuses"].get(status, 0) + 1
+        self.records += 1
+
+    def seal(self) -> None:
+        self.index["bytes"] = self.file.tell()
+        self.file.close()
+        temp_path = f"{self.path}.idx.{os.getpid()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.index, file, separators=(",", ":"))
+        os.replace(temp_path, f"{self.path}.idx")
+
+class RunRecord:
+    """Collects one agent run (texts, snippet results, per-phase timings) and appends it to the store when finished."""
+
+    def __init__(self, store: Optional['RunStore'], **fields: Any):
+        self.store = store
+        self.fields = fields
+        self.timings: Dict[str, float] = {}
+        self.started = time.time()
+        self.clock = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def set(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+    def finish(self, results: Optional[List[Dict[str, Any]]] = None, error: Optional[BaseException] = None) -> Optional[str]:
+        if self.store is None:
+            return None
+        # Recording must never fail the run it describes.
+        try:
+            return self.store.record(started=self.started, duration=time.perf_counter() - self.clock, results=results,
+                                     timings=self.timings, error=f"{type(error).__name__}: {error}" if error else None,
+                                     **self.fields)
+        except Exception as e:
+            self.store.logger.warning("Failed to record run: %s", e)
+            return None
+
+class RunStore:
+    """
+    Append-only log of agent runs. Each process appends rows (one JSON array per line, columns named once
+    in the segment header) to its own segment file; a segment is sealed with a small index once it holds
+    segment_records rows or the store is closed. Texts above inline_chars go to a deduplicating TextStore.
+    """
+
+    def __init__(self, directory: str = "data/runs", segment_records: int = 10000, block_records: int = 1024,
+                 inline_chars: int = 256, debug: bool = False):
+        self.directory = directory
+        self.segment_dir = os.path.join(directory, "segments")
+        self.segment_records = segment_records
+        self.block_records = block_records
+        self.texts = TextStore(os.path.join(directory, "texts"), inline_chars)
+        self.logger = LoggerFactory.create_logger(self.__class__.__name__, debug)
+        self.lock = threading.Lock()
+        self.writer: Optional[SegmentWriter] = None
+        self.writer_pid: Optional[int] = None
+        os.makedirs(self.segment_dir, exist_ok=True)
+        # An unsealed segment stays readable, but every query then has to scan it whole.
+        atexit.register(self.close)
+
+    @staticmethod
+    def status(results: Optional[List[Dict[str, Any]]], error: Optional[str]) -> str:
+        if error:
+            return "failed"
+        if not results:
+            return "no_code"
+        return "ok" if all(result.get("status") == "ok" for result in results) else "error"
+
+    def record(self, started: float, duration: float, model: Optional[str] = None, template: Optional[str] = None,
+               task: Optional[str] = None, prompt: Optional[str] = None, answer: Optional[str] = None,
+               snippets: Optional[Sequence[str]] = None, results: Optional[List[Dict[str, Any]]] = None,
+               timings: Optional[Dict[str, float]] = None, error: Optional[str] = None, run_id: Optional[str] = None) -> str:
+        run_id = run_id or uuid.uuid4().hex
+        put = self.texts.put
+        row = [
+            run_id, started, duration, self.status(results, error), model, template,
+            put(task), put(prompt), put(answer), [put(snippet) for snippet in snippets or ()],
+            [{"status": result.get("status"), "duration": result.get("duration"), "output": put(result.get("output")),
+              "error": put(result.get("error")), "truncated": result.get("output_truncated", False)}
+             for result in results or ()],
+            timings or {}, error,
+        ]
+        with self.lock:
+            self._writer().append(row)
+            if self.writer.records >= self.segment_records:
+                self.writer.seal()
+                self.writer = None
+        return run_id
+
+    def _writer(self) -> SegmentWriter:
+        # A forked child starts its own segment rather than appending through its parent's file object.
+        if self.writer is None or self.writer_pid != os.getpid():
+            name = f"{time.time_ns():020d}-{os.getpid()}.jsonl"
+            self.writer = SegmentWriter(os.path.join(self.segment_dir, name), self.block_records)
+            self.writer_pid = os.getpid()
+        return self.writer
+
+    def close(self) -> None:
+        with self.lock:
+            if self.writer is not None and self.writer_pid == os.getpid():
+                self.writer.seal()
+            self.writer = None
+
+    def segments(self) -> List[str]:
+        return sorted(os.path.join(self.segment_dir, name) for name in os.listdir(self.segment_dir) if name.endswith(".jsonl"))
+
+    @staticmethod
+    def _read_index(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(f"{path}.idx", "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _overlaps(low: Optional[float], high: Optional[float], since: Optional[float], until: Optional[float]) -> bool:
+        if low is None:
+            return False
+        return (since is None or high >= since) and (until is None or low < until)
+
+    def _ranges(self, path: str, since: Optional[float], until: Optional[float],
+                models: Optional[Set[Any]], statuses: Optional[Set[str]]) -> Iterator[Tuple[int, Optional[int]]]:
+        # Yields (offset, record count) ranges worth reading; unsealed segments are read whole.
+        index = self._read_index(path)
+        if index is None:
+            yield 0, None
+            return
+        if not self._overlaps(index["min_started"], index["max_started"], since, until):
+            return
+        if models is not None and not models.intersection(index["models"]):
+            return
+        if statuses is not None and not statuses.intersection(index["statuses"]):
+            return
+        for block in index["blocks"]:
+            if not self._overlaps(block["min_started"], block["max_started"], since, until):
+                continue
+            if models is not None and not models.intersection(block["models"]):
+                continue
+            yield block["offset"], block["records"]
+
+    @staticmethod
+    def _rows(file: Any, offset: int, count: Optional[int]) -> Iterator[List[Any]]:
+        file.seek(offset)
+        for number, line in enumerate(file):
+            if count is not None and number >= count:
+                return
+            # Skips the header and a trailing line still being written by another process.
+            if not line.endswith(b"\n") or line.startswith(b"{"):
+                continue
+            yield json.loads(line)
+
+    def scan(self, since: Optional[float] = None, until: Optional[float] = None, model: Any = None, status: Any = None,
+             where: Optional[Callable[[Dict[str, Any]], bool]] = None, fields: Optional[Sequence[str]] = None,
+             texts: bool = False, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams runs started in [since, until) in segment order, one segment block at a time. model and
+        status take a value or a collection of values; fields projects the columns returned; texts=True
+        replaces text references with the texts themselves.
+        """
+        models = None if model is None else {model} if isinstance(model, str) else set(model)
+        statuses = None if status is None else {status} if isinstance(status, str) else set(status)
+        columns = fields or COLUMNS
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown run fields: {sorted(unknown)}")
+        matched = 0
+        for path in self.segments():
+            with open(path, "rb") as file:
+                for offset, count in self._ranges(path, since, until, models, statuses):
+                    for row in self._rows(file, offset, count):
+                        started = row[STARTED]
+                        if (since is not None and started < since) or (until is not None and started >= until):
+                            continue
+                        if (models is not None and row[MODEL] not in models) or (statuses is not None and row[STATUS] not in statuses):
+                            continue
+                        run = dict(zip(COLUMNS, row))
+                        if where is not None and not where(run):
+                            continue
+                        if texts:
+                            run = self.resolve(run)
+                        yield run if fields is None else {name: run[name] for name in columns}
+                        matched += 1
+                        if limit is not None and matched >= limit:
+                            return
+
+    def resolve(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        run = dict(run)
+        get = self.texts.get
+        for name in ("task", "prompt", "answer"):
+            run[name] = get(run[name])
+        run["snippets"] = [get(snippet) for snippet in run["snippets"]]
+        run["results"] = [dict(result, output=get(result["output"]), error=get(result["error"])) for result in run["results"]]
+        return run
+
+    def stats(self, group_by: str = "model", **filters: Any) -> Dict[Any, Dict[str, Any]]:
+        """
+        Per-group run counts, status counts and duration/timing averages over a streaming scan. Texts
+        stored by reference are grouped by their sha256, so long prompts or answers group by content.
+        """
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group runs by '{group_by}'; expected one of {', '.join(GROUP_COLUMNS)}.")
+        groups: Dict[Any, Dict[str, Any]] = {}
+        for run in self.scan(**filters):
+            key = run[group_by]
+            if isinstance(key, dict):
+                key = key["sha256"]
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {"runs": 0, "statuses": {}, "duration_total": 0.0, "duration_max": 0.0,
+                                       "snippets": 0, "timings": {}}
+            group["runs"] += 1
+            group["statuses"][run["status"]] = group["statuses"].get(run["status"], 0) + 1
+            group["duration_total"] += run["duration"]
+            group["duration_max"] = max(group["duration_max"], run["duration"])
+            group["snippets"] += len(run["snippets"])
+            for name, seconds in run["timings"].items():
+                group["timings"][name] = group["timings"].get(name, 0.0) + seconds
+        for group in groups.values():
+            runs = group["runs"]
+            group["duration_mean"] = group.pop("duration_total") / runs
+            group["ok_rate"] = group["statuses"].get("ok", 0) / runs
+            group["failure_rate"] = (runs - group["statuses"].get("ok", 0) - group["statuses"].get("no_code", 0)) / runs
+            group["timings"] = {name: total / runs for name, total in group["timings"].items()}
+        return groups
@@ -0,0 +1,354 @@
+# snippet_executor.py
+import io
+import multiprocessing
+import os
+import queue
+import reprlib
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_env_repr = reprlib.Repr()
+_env_repr.maxstring = 200
+_env_repr.maxother = 200
+
+DEFAULT_MAX_OUTPUT = 1024 * 1024
+ENV_MODES = ("live", "summary", "none")
+
+OutputCallback = Callable[[str, str], None]
+
+def summarize_env(env: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    return {name: {"type": type(value).__name__, "repr": _env_repr.repr(value)} for name, value in env.items()}
+
+class OutputCapture(io.TextIOBase):
+    """
+    Text stream that keeps only the last max_chars characters in memory. Everything written can
+    also go to a spill file on disk and to a callback, so callers can follow the output live.
+    """
+
+    def __init__(self, name: str, max_chars: Optional[int] = DEFAULT_MAX_OUTPUT, spill: bool = False,
+                 spill_dir: Optional[str] = None, on_output: Optional[OutputCallback] = None):
+        self.name = name
+        self.max_chars = max_chars
+        self.on_output = on_output
+        self.chunks: Deque[str] = deque()
+        self.size = 0
+        self.dropped = 0
+        # Trimming only once twice the limit is buffered keeps print() cheap (amortised O(1) per character).
+        self.threshold = 2 * max_chars if max_chars is not None else float("inf")
+        self.spill_file = tempfile.NamedTemporaryFile("w", prefix=f"snippet-{name}-", suffix=".log", dir=spill_dir,
+                                                      delete=False, encoding="utf-8") if spill else None
+        if self.spill_file is not None or on_output is not None:
+            self.write = self._write_through
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text.__class__ is not str and not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        self.chunks.append(text)
+        self.size += len(text)
+        if self.size > self.threshold:
+            self._trim()
+        return len(text)
+
+    def _write_through(self, text: str) -> int:
+        length = OutputCapture.write(self, text)
+        if self.spill_file is not None:
+            self.spill_file.write(text)
+        if self.on_output is not None and length:
+            self.on_output(self.name, text)
+        return length
+
+    def _trim(self) -> None:
+        if self.max_chars is not None and self.size > self.max_chars:
+            tail = "".join(self.chunks)[-self.max_chars:] if self.max_chars else ""
+            self.dropped += self.size - len(tail)
+            self.chunks = deque([tail])
+            self.size = len(tail)
+
+    def getvalue(self) -> str:
+        self._trim()
+        return "".join(self.chunks)
+
+    @property
+    def total(self) -> int:
+        return self.dropped + self.size
+
+    @property
+    def truncated(self) -> bool:
+        self._trim()
+        return self.dropped > 0
+
+    def finish(self) -> Optional[str]:
+        if self.spill_file is None:
+            return None
+        self.spill_file.close()
+        return self.spill_file.name
+
+class StreamRouter:
+    """
+    Stands in for sys.stdout or sys.stderr while snippets run, sending each thread's writes to the
+    capture that thread installed and everything else to the stream it replaced. Unlike
+    contextlib.redirect_stdout, concurrent snippets in different threads never see each other's output.
+    """
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self.local = threading.local()
+
+    def target(self) -> Any:
+        return getattr(self.local, "target", None) or self.stream
+
+    def write(self, text: str) -> int:
+        return self.target().write(text)
+
+    def flush(self) -> None:
+        self.target().flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.target(), name)
+
+_routers_lock = threading.Lock()
+_routers: Dict[str, Any] = {"captures": 0, "stdout": None, "stderr": None}
+
+@contextmanager
+def capture_streams(stdout: Any, stderr: Any) -> Iterator[None]:
+    """Routes this thread's sys.stdout/sys.stderr writes to the given streams; the routers are removed with the last capture."""
+    with _routers_lock:
+        if _routers["captures"] == 0 or sys.stdout is not _routers["stdout"] or sys.stderr is not _routers["stderr"]:
+            if not isinstance(sys.stdout, StreamRouter):
+                sys.stdout = StreamRouter(sys.stdout)
+            if not isinstance(sys.stderr, StreamRouter):
+                sys.stderr = StreamRouter(sys.stderr)
+            _routers["stdout"], _routers["stderr"] = sys.stdout, sys.stderr
+        _routers["captures"] += 1
+        out_router, err_router = _routers["stdout"], _routers["stderr"]
+    previous = (getattr(out_router.local, "target", None), getattr(err_router.local, "target", None))
+    out_router.local.target, err_router.local.target = stdout, stderr
+    try:
+        yield
+    finally:
+        out_router.local.target, err_router.local.target = previous
+        with _routers_lock:
+            _routers["captures"] -= 1
+            if _routers["captures"] == 0:
+                if sys.stdout is out_router:
+                    sys.stdout = out_router.stream
+                if sys.stderr is err_router:
+                    sys.stderr = err_router.stream
+                _routers["stdout"], _routers["stderr"] = None, None
+
+def run_snippet(code: str, env: str = "live", max_output: Optional[int] = DEFAULT_MAX_OUTPUT, spill: bool = False,
+                spill_dir: Optional[str] = None, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+    local_env: Dict[str, Any] = {}
+    global_env: Dict[str, Any] = {}
+    output_capture = OutputCapture("stdout", max_output, spill, spill_dir, on_output)
+    error_capture = OutputCapture("stderr", max_output, spill, spill_dir, on_output)
+    start = time.perf_counter()
+    try:
+        with capture_streams(output_capture, error_capture):
+            exec(code, global_env, local_env)
+        result = {"status": "ok", "output": output_capture.getvalue(), "error": error_capture.getvalue()}
+    except Exception as e:
+        result = {"status": "error", "output": output_capture.getvalue(), "error": str(e) or type(e).__name__}
+    if env == "live":
+        result["env"] = local_env
+    elif env == "summary":
+        result["env"] = summarize_env(local_env)
+    else:
+        result["env"] = {}
+    result["output_truncated"] = output_capture.truncated or error_capture.truncated
+    output_file, error_file = output_capture.finish(), error_capture.finish()
+    if spill:
+        result["output_file"], result["error_file"] = output_file, error_file
+    result["duration"] = time.perf_counter() - start
+    return result
+
+class SnippetExecutor(ABC):
+    @abstractmethod
+    def run(self, code: str, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+        pass
+
+    def run_many(self, codes: List[str], on_output: Optional[Callable[[int, str, str], None]] = None) -> List[Dict[str, Any]]:
+        return [self.run(code, partial(on_output, index) if on_output else None) for index, code in enumerate(codes)]
+
+    def stream(self, code: str) -> Iterator[Tuple[str, Any]]:
+        """Yields ("stdout" | "stderr", text) while the snippet runs, then ("result", result)."""
+        events: "queue.SimpleQueue[Tuple[str, Any]]" = queue.SimpleQueue()
+        def execute() -> None:
+            try:
+                events.put(("result", self.run(code, lambda name, text: events.put((name, text)))))
+            except BaseException as e:
+                events.put(("exception", e))
+        thread = threading.Thread(target=execute, name="snippet-stream", daemon=True)
+        thread.start()
+        while True:
+            kind, payload = events.get()
+            if kind == "exception":
+                raise payload
+            yield kind, payload
+            if kind == "result":
+                return
+
+    def shutdown(self) -> None:
+        pass
+
+class InProcessSnippetExecutor(SnippetExecutor):
+    def __init__(self, env: str = "live", max_output: Optional[int] = DEFAULT_MAX_OUTPUT, spill: bool = False,
+                 spill_dir: Optional[str] = None, **options: Any):
+        if env not in ENV_MODES:
+            raise ValueError(f"Unknown snippet env mode '{env}'.")
+        self.capture = {"env": env, "max_output": max_output, "spill": spill, "spill_dir": spill_dir}
+
+    def run(self, code: str, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+        return run_snippet(code, on_output=on_output, **self.capture)
+
+def _address_space_size() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+def _worker_main(conn: Any, memory_limit: Optional[int], capture: Dict[str, Any]) -> None:
+    if memory_limit and resource is not None:
+        limit = _address_space_size() + memory_limit
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    forward = lambda name, text: conn.send(("output", name, text))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        code, stream = request
+        conn.send(("result", run_snippet(code, on_output=forward if stream else None, **capture)))
+
+class _Worker:
+    def __init__(self, context: Any, memory_limit: Optional[int], capture: Dict[str, Any]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit, capture), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, EOFError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+class ProcessPoolSnippetExecutor(SnippetExecutor):
+    def __init__(self, workers: int = 0, timeout: float = 30.0, memory_limit_mb: Optional[int] = None,
+                 start_method: Optional[str] = None, env: str = "summary", max_output: Optional[int] = DEFAULT_MAX_OUTPUT,
+                 spill: bool = False, spill_dir: Optional[str] = None, **options: Any):
+        if env not in ("summary", "none"):
+            raise ValueError(f"The process pool returns env as 'summary' or 'none', not '{env}'.")
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError(f"The process pool timeout must be a positive number of seconds, not {timeout!r}.")
+        self.capture = {"env": env, "max_output": max_output, "spill": spill, "spill_dir": spill_dir}
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        if start_method is None:
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(start_method)
+        self.idle: "queue.Queue[_Worker]" = queue.Queue()
+        self.lock = threading.Lock()
+        self.all_workers: List[_Worker] = []
+        for _ in range(self.workers):
+            self._release(self._spawn())
+        self.dispatcher = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="snippet-dispatch")
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self.context, self.memory_limit, self.capture)
+        with self.lock:
+            self.all_workers.append(worker)
+        return worker
+
+    def _release(self, worker: _Worker) -> None:
+        self.idle.put(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        with self.lock:
+            self.all_workers.remove(worker)
+        self._release(self._spawn())
+
+    def run(self, code: str, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+        worker = self.idle.get()
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        # Streamed output is also kept here, so a snippet that is killed still reports what it printed.
+        received = {name: OutputCapture(name, self.capture["max_output"], on_output=on_output)
+                    for name in ("stdout", "stderr")} if on_output else None
+        released = False
+        try:
+            worker.conn.send((code, on_output is not None))
+            while worker.conn.poll(max(0.0, deadline - time.perf_counter())):
+                message = worker.conn.recv()
+                if message[0] == "output":
+                    received[message[1]].write(message[2])
+                    continue
+                self._release(worker)
+                released = True
+                return message[1]
+            status, error = "timeout", f"Snippet exceeded the {self.timeout}s time limit"
+        except (EOFError, OSError) as e:
+            status, error = "crashed", f"Snippet worker exited unexpectedly: {str(e) or 'connection closed'}"
+        finally:
+            # A worker left mid-snippet (timeout, crash or a failing callback) still has output in its pipe.
+            if not released:
+                self._replace(worker)
+        if received:
+            error = received["stderr"].getvalue() + error
+        return {"status": status, "output": received["stdout"].getvalue() if received else "", "error": error, "env": {},
+                "output_truncated": any(capture.truncated for capture in received.values()) if received else False,
+                "duration": time.perf_counter() - start}
+
+    def run_many(self, codes: List[str], on_output: Optional[Callable[[int, str, str], None]] = None) -> List[Dict[str, Any]]:
+        callbacks = [partial(on_output, index) if on_output else None for index in range(len(codes))]
+        return list(self.dispatcher.map(self.run, codes, callbacks))
+
+    def shutdown(self) -> None:
+        self.dispatcher.shutdown(wait=True)
+        with self.lock:
+            workers, self.all_workers = self.all_workers, []
+        for worker in workers:
+            worker.stop()
+
+EXECUTOR_BACKENDS = {
+    "inprocess": InProcessSnippetExecutor,
+    "process_pool": ProcessPoolSnippetExecutor,
+}
+
+def create_executor(options: Optional[Dict[str, Any]] = None) -> SnippetExecutor:
+    options = dict(options or {})
+    backend = options.pop("backend", "inprocess")
+    if backend not in EXECUTOR_BACKENDS:
+        raise ValueError(f"Unknown snippet executor backend '{backend}'.")
+    return EXECUTOR_BACKENDS[backend](**options)
@@ -0,0 +1,24 @@
+# sqlite_util.py
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+def connection(local: threading.local, database: str) -> sqlite3.Connection:
+    """Returns the calling thread's WAL-mode connection to database, opening it on first use."""
+    # One connection per thread and per process; a forked child must not reuse its parent's handle.
+    current: Optional[sqlite3.Connection] = getattr(local, "connection", None)
+    if current is None or local.pid != os.getpid():
+        current = sqlite3.connect(database, timeout=30, isolation_level=None, uri=database.startswith("file:"))
+        current.execute("PRAGMA journal_mode=WAL")
+        current.execute("PRAGMA synchronous=NORMAL")
+        local.connection = current
+        local.pid = os.getpid()
+    return current
+
+def close(local: threading.local) -> None:
+    """Closes the calling thread's connection, if this process opened one."""
+    current: Optional[sqlite3.Connection] = getattr(local, "connection", None)
+    if current is not None and local.pid == os.getpid():
+        current.close()
+        local.connection = None
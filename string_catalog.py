@@ -0,0 +1,328 @@
+# string_catalog.py
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+import sqlite_util
+from logger import LoggerFactory
+
+# Rows are scoped by the absolute string directory, so one index file can serve several catalogs.
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    root TEXT NOT NULL,
+    relpath TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (root, relpath)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS strings (
+    root TEXT NOT NULL,
+    layer TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    relpath TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (root, layer, key, namespace)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS strings_relpath ON strings (root, relpath);
+CREATE TABLE IF NOT EXISTS generations (
+    root TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+BASE_LAYER = ""
+
+def scan_offsets(data: bytes) -> Dict[str, Tuple[int, int]]:
+    """Maps each top-level key of a JSON object to the byte offset and length of its value."""
+    text = data.decode("utf-8")
+    decoder = json.JSONDecoder()
+    offsets: Dict[str, Tuple[int, int]] = {}
+    position = WHITESPACE.match(text, 0).end()
+    if text[position:position + 1] != "{":
+        raise ValueError("String files must contain a JSON object.")
+    position += 1
+    # Character positions are converted to byte offsets incrementally, so the scan stays linear.
+    char_mark, byte_mark = 0, 0
+    while True:
+        position = WHITESPACE.match(text, position).end()
+        if text[position:position + 1] == "}":
+            return offsets
+        key, position = decoder.raw_decode(text, position)
+        position = WHITESPACE.match(text, position).end()
+        if text[position:position + 1] != ":":
+            raise ValueError(f"Expected ':' after key {key!r}.")
+        start = WHITESPACE.match(text, position + 1).end()
+        _, end = decoder.raw_decode(text, start)
+        byte_mark += len(text[char_mark:start].encode("utf-8"))
+        length = len(text[start:end].encode("utf-8"))
+        offsets[key] = (byte_mark, length)
+        char_mark, byte_mark = end, byte_mark + length
+        position = WHITESPACE.match(text, end).end()
+        if text[position:position + 1] == ",":
+            position += 1
+
+def locale_layers(locale: Optional[str]) -> Tuple[str, ...]:
+    # "fr_CA" reads fr_CA/, then fr/, then the base files.
+    if not locale:
+        return (BASE_LAYER,)
+    parts = re.split(r"[_-]", locale)
+    return tuple("_".join(parts[:count]) for count in range(len(parts), 0, -1)) + (BASE_LAYER,)
+
+class StringView(dict):
+    """Strings as seen from one locale; values are fetched on first access and then served from the dict itself."""
+
+    def __init__(self, catalog: 'StringCatalog', layers: Tuple[str, ...]):
+        super().__init__()
+        self.catalog = catalog
+        self.layers = layers
+        self.missing: Set[Any] = set()
+
+    def __missing__(self, key: str) -> Any:
+        if key in self.missing:
+            raise KeyError(key)
+        try:
+            value = self.catalog.fetch(key, self.layers)
+        except KeyError:
+            self.missing.add(key)
+            raise
+        self[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        if key in self.missing:
+            return False
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def invalidate(self) -> None:
+        dict.clear(self)
+        self.missing = set()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.catalog.keys(self.layers))
+
+    def keys(self) -> List[str]:
+        return self.catalog.keys(self.layers)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self) -> List[Any]:
+        return [self[key] for key in self.keys()]
+
+    def __len__(self) -> int:
+        return len(self.catalog.keys(self.layers))
+
+class StringCatalog:
+    """
+    JSON string files behind a SQLite index of key -> (file, byte offset, length), so a single
+    string is read without parsing its file and start-up only stats the files. Each file in
+    string_dir is a namespace; files in a locale subdirectory (string_dir/fr/dev_strings.json)
+    overlay the base files. Keys are reachable bare ("your_code") or qualified by namespace
+    ("dev_strings.your_code").
+    """
+
+    def __init__(self, string_dir: str, index_path: Optional[str] = None, locale: Optional[str] = None,
+                 check_interval: Optional[float] = None, debug: bool = False):
+        self.string_dir = string_dir
+        self.root = os.path.abspath(string_dir)
+        self.locale = locale
+        self.check_interval = check_interval
+        self.logger = LoggerFactory.create_logger(self.__class__.__name__, debug)
+        if index_path:
+            os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+            self.database = index_path
+        else:
+            self.database = f"file:string_catalog_{id(self)}?mode=memory&cache=shared"
+        self.local = threading.local()
+        self.lock = threading.RLock()
+        self.views: Dict[Tuple[str, ...], StringView] = {}
+        # Also keeps a private in-memory index alive for as long as the catalog exists.
+        self.connection = self._connection()
+        self._create_schema(self.connection)
+        # Bumped by every process that re-indexes this root; a different value means cached values are stale.
+        self.generation: Optional[int] = None
+        self.checked = time.monotonic()
+        self.refresh()
+
+    def _connection(self) -> sqlite3.Connection:
+        return sqlite_util.connection(self.local, self.database)
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection) -> None:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # The index is derived data: an older layout is dropped and rebuilt.
+                for table in ("strings", "files", "generations"):
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+                for statement in SCHEMA.split(";"):
+                    if statement.strip():
+                        connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _generation(self, connection: sqlite3.Connection) -> int:
+        row = connection.execute("SELECT value FROM generations WHERE root = ?", (self.root,)).fetchone()
+        return row[0] if row else 0
+
+    def _source_files(self) -> Dict[str, os.stat_result]:
+        sources: Dict[str, os.stat_result] = {}
+        if not os.path.isdir(self.string_dir):
+            self.logger.warning("String directory does not exist: %s", self.string_dir)
+            return sources
+        for entry in os.scandir(self.string_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                sources[entry.name] = entry.stat()
+            elif entry.is_dir():
+                for child in os.scandir(entry.path):
+                    if child.is_file() and child.name.endswith(".json"):
+                        sources[f"{entry.name}/{child.name}"] = child.stat()
+        return sources
+
+    def refresh(self) -> List[str]:
+        """Re-indexes files whose size or mtime changed and drops cached values; returns the changed files."""
+        with self.lock:
+            connection = self._connection()
+            sources = self._source_files()
+            known = {row[0]: (row[1], row[2]) for row in connection.execute(
+                "SELECT relpath, mtime_ns, size FROM files WHERE root = ?", (self.root,))}
+            changed = sorted(relpath for relpath, stat in sources.items() if known.get(relpath) != (stat.st_mtime_ns, stat.st_size))
+            removed = sorted(set(known) - set(sources))
+            if changed or removed:
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    for relpath in removed + changed:
+                        connection.execute("DELETE FROM strings WHERE root = ? AND relpath = ?", (self.root, relpath))
+                        connection.execute("DELETE FROM files WHERE root = ? AND relpath = ?", (self.root, relpath))
+                    for relpath in changed:
+                        self._index_file(connection, relpath, sources[relpath])
+                    connection.execute("INSERT INTO generations (root, value) VALUES (?, 1) "
+                                       "ON CONFLICT (root) DO UPDATE SET value = value + 1", (self.root,))
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+                self._warn_collisions(connection, changed)
+            # Also catches re-indexing done by another process sharing the index file.
+            generation = self._generation(connection)
+            if generation != self.generation:
+                for view in self.views.values():
+                    view.invalidate()
+                self.generation = generation
+            self.checked = time.monotonic()
+            return changed + removed
+
+    def _index_file(self, connection: sqlite3.Connection, relpath: str, stat: os.stat_result) -> None:
+        self.logger.debug("Indexing string file: %s", relpath)
+        layer, _, filename = relpath.rpartition("/")
+        namespace = filename[:-len(".json")]
+        with open(os.path.join(self.string_dir, relpath), "rb") as file:
+            offsets = scan_offsets(file.read())
+        connection.executemany(
+            "INSERT INTO strings (root, layer, namespace, key, relpath, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((self.root, layer, namespace, key, relpath, offset, length) for key, (offset, length) in offsets.items()))
+        connection.execute("INSERT INTO files (root, relpath, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                           (self.root, relpath, stat.st_mtime_ns, stat.st_size))
+
+    def _warn_collisions(self, connection: sqlite3.Connection, changed: List[str]) -> None:
+        if not changed:
+            return
+        placeholders = ",".join("?" * len(changed))
+        rows = connection.execute(
+            "SELECT layer, key, GROUP_CONCAT(namespace) FROM strings WHERE root = ? AND (layer, key) IN "
+            f"(SELECT layer, key FROM strings WHERE root = ? AND relpath IN ({placeholders})) "
+            "GROUP BY layer, key HAVING COUNT(*) > 1", [self.root, self.root] + changed).fetchall()
+        for layer, key, namespaces in rows:
+            namespaces = sorted(namespaces.split(","))
+            self.logger.warning("String '%s' is defined in %s%s; using %s (qualify it as '<namespace>.%s' to choose)",
+                                key, ", ".join(namespaces), f" ({layer})" if layer else "", namespaces[-1], key)
+
+    def maybe_refresh(self) -> None:
+        if self.check_interval is not None and time.monotonic() - self.checked >= self.check_interval:
+            self.refresh()
+
+    def locate(self, key: str, layers: Tuple[str, ...]) -> Optional[Tuple[str, int, int, int, int]]:
+        """Returns (relpath, offset, length) of the value plus the file's indexed (mtime_ns, size)."""
+        connection = self._connection()
+        select = ("SELECT s.relpath, s.offset, s.length, f.mtime_ns, f.size FROM strings s "
+                  "JOIN files f ON f.root = s.root AND f.relpath = s.relpath WHERE s.root = ? AND s.layer = ? AND s.key = ?")
+        for layer in layers:
+            # Bare keys defined in several namespaces resolve to the last namespace in name order.
+            row = connection.execute(select + " ORDER BY s.namespace DESC LIMIT 1", (self.root, layer, key)).fetchone()
+            if row is None and "." in key:
+                namespace, _, bare_key = key.partition(".")
+                row = connection.execute(select + " AND s.namespace = ?", (self.root, layer, bare_key, namespace)).fetchone()
+            if row is not None:
+                return row
+        return None
+
+    def fetch(self, key: str, layers: Tuple[str, ...]) -> Any:
+        if not isinstance(key, str):
+            raise KeyError(key)
+        for attempt in range(2):
+            location = self.locate(key, layers)
+            if location is None:
+                raise KeyError(key)
+            relpath, offset, length, mtime_ns, size = location
+            try:
+                with open(os.path.join(self.string_dir, relpath), "rb") as file:
+                    stat = os.fstat(file.fileno())
+                    if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+                        file.seek(offset)
+                        return json.loads(file.read(length))
+                    if attempt:
+                        # Changed again since the re-index (still being written): parse it instead of trusting offsets.
+                        values = json.loads(file.read())
+                        return values[key] if key in values else values[key.partition(".")[2]]
+            except FileNotFoundError:
+                if attempt:
+                    raise KeyError(key)
+            # The file was edited after it was indexed: re-index changed files, then look the key up again.
+            self.refresh()
+
+    def keys(self, layers: Tuple[str, ...]) -> List[str]:
+        placeholders = ",".join("?" * len(layers))
+        return [row[0] for row in self._connection().execute(
+            f"SELECT DISTINCT key FROM strings WHERE root = ? AND layer IN ({placeholders}) ORDER BY key", (self.root,) + layers)]
+
+    def view(self, locale: Optional[str] = None) -> StringView:
+        layers = locale_layers(locale if locale is not None else self.locale)
+        view = self.views.get(layers)
+        if view is None:
+            with self.lock:
+                view = self.views.setdefault(layers, StringView(self, layers))
+        return view
+
+    def get(self, key: str, locale: Optional[str] = None, default: Any = None) -> Any:
+        return self.view(locale).get(key, default)
+
+    def namespace(self, namespace: str, locale: Optional[str] = None) -> Dict[str, Any]:
+        """Loads a whole namespace, locale overlays applied, with one read per file."""
+        values: Dict[str, Any] = {}
+        for layer in reversed(locale_layers(locale if locale is not None else self.locale)):
+            path = os.path.join(self.string_dir, layer, f"{namespace}.json")
+            if os.path.isfile(path):
+                with open(path, "r") as file:
+                    values.update(json.load(file))
+        return values
@@ -0,0 +1,46 @@
+# tests/conftest.py
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from core_system import CoreSystem
+from fake_llm import FakeLLMClient
+
+ANSWER = (
+    "First list the directory:\n"
+    "```python\nprint('first')\n```\n"
+    "Then report the python version:\n"
+    "```python\nimport sys\nprint(sys.version_info[0])\n```\n"
+)
+
+def make_config(tmp_path, **overrides):
+    config = {
+        'plugin_directory': [os.path.join(ROOT, "action_plugins"), os.path.join(ROOT, "base_plugin_lib")],
+        'template_dir': os.path.join(ROOT, "data", "templates"),
+        'string_dir': os.path.join(ROOT, "data", "strings"),
+        'action_store': {'backend': "sqlite", 'path': str(tmp_path / "actions" / "actions.sqlite")},
+        'string_catalog': {'index_path': str(tmp_path / "string_index.sqlite")},
+        'debug': False,
+    }
+    config.update(overrides)
+    return config
+
+@pytest.fixture
+def config(tmp_path):
+    return make_config(tmp_path)
+
+@pytest.fixture
+def core(config):
+    with contextlib.redirect_stdout(io.StringIO()):
+        core = CoreSystem(config)
+    core.set('llm_client', FakeLLMClient(ANSWER))
+    core.set('model', 'fake')
+    yield core
+    core.reloader.stop()
@@ -0,0 +1,57 @@
+# tests/test_action_manager.py
+import contextlib
+import io
+
+import pytest
+
+from action_store import SqliteActionStore
+from conftest import make_config
+
+def double(value):
+    return value * 2
+
+def triple(value):
+    return value * 3
+
+def quiet(call, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return call(*args, **kwargs)
+
+def test_compiled_actions_are_cached(core):
+    quiet(core.execute, 'add_action', 'scale', double)
+    assert quiet(core.execute, 'execute_action', 'scale', 4) == 8
+    assert quiet(core.execute, 'execute_action', 'scale', 5) == 10
+    stats = core.execute('action_cache_stats')
+    assert stats["misses"] == 1 and stats["hits"] == 1 and stats["size"] == 1
+
+def test_a_new_store_revision_recompiles_the_action(core, config):
+    quiet(core.execute, 'add_action', 'scale', double)
+    assert quiet(core.execute, 'execute_action', 'scale', 2) == 4
+    # Another process writing the same store: only the revision tells the cache the source changed.
+    other = SqliteActionStore(config['action_store']['path'])
+    other.put('scale', 'triple', "def triple(value):\n    return value * 3\n")
+    other.close()
+    assert quiet(core.execute, 'execute_action', 'scale', 2) == 6
+    assert core.execute('action_cache_stats')["misses"] == 2
+
+def test_add_and_remove_invalidate_the_cache(core):
+    quiet(core.execute, 'add_action', 'scale', double)
+    quiet(core.execute, 'execute_action', 'scale', 1)
+    quiet(core.execute, 'add_action', 'scale', triple)
+    assert quiet(core.execute, 'execute_action', 'scale', 1) == 3
+    quiet(core.execute, 'remove_action', 'scale')
+    with pytest.raises(Exception, match="scale"):
+        quiet(core.execute, 'execute_action', 'scale', 1)
+    assert core.execute('action_cache_stats')["invalidations"] == 2
+
+def test_least_recently_used_module_is_evicted(tmp_path):
+    from core_system import CoreSystem
+    with contextlib.redirect_stdout(io.StringIO()):
+        core = CoreSystem(make_config(tmp_path, action_cache_size=1))
+    quiet(core.execute, 'add_action', 'double', double)
+    quiet(core.execute, 'add_action', 'triple', triple)
+    quiet(core.execute, 'execute_action', 'double', 1)
+    quiet(core.execute, 'execute_action', 'triple', 1)
+    stats = core.execute('action_cache_stats')
+    assert stats["evictions"] == 1 and stats["size"] == 1
+    assert list(core.get('action_manager').module_cache) == ['triple']
@@ -0,0 +1,68 @@
+# tests/test_action_metrics.py
+import json
+
+import pytest
+
+from action_metrics import ActionMetrics
+from plugin_registry import PluginRegistry
+
+class Plugin:
+    def __init__(self, **actions):
+        self.actions = actions
+
+    def get_actions(self):
+        return list(self.actions)
+
+@pytest.fixture
+def registry():
+    registry = PluginRegistry()
+    registry.enable_metrics(True)
+
+    def outer():
+        return registry.execute_action('inner') + registry.execute_action('inner')
+
+    def fail():
+        raise RuntimeError("boom")
+
+    registry.register_plugin(Plugin(outer=outer, inner=lambda: 1, fail=fail))
+    return registry
+
+def test_nested_calls_form_a_span_tree(registry):
+    assert registry.execute_action('outer') == 2
+    with pytest.raises(RuntimeError):
+        registry.execute_action('fail')
+    snapshot = registry.metrics.snapshot()
+    assert snapshot["actions"]["outer"]["calls"] == 1
+    assert snapshot["actions"]["inner"]["calls"] == 2
+    assert snapshot["actions"]["fail"]["errors"] == 1
+    outer, fail = snapshot["spans"]
+    assert outer["action"] == "outer" and not outer["error"]
+    assert [child["action"] for child in outer["children"]] == ["inner", "inner"]
+    assert fail["action"] == "fail" and fail["error"]
+
+def test_prometheus_output(registry):
+    registry.execute_action('outer')
+    text = registry.metrics.export(format="prometheus")
+    assert 'promptflow_action_calls_total{action="inner"} 2' in text
+    assert 'promptflow_action_errors_total{action="outer"} 0' in text
+    assert 'promptflow_action_duration_seconds_bucket{action="inner",le="+Inf"} 2' in text
+    assert 'promptflow_action_duration_seconds_count{action="outer"} 1' in text
+
+def test_prometheus_escapes_label_values():
+    metrics = ActionMetrics(enabled=True)
+    metrics.wrap('say "hi"\\\n', lambda: None)()
+    assert 'promptflow_action_calls_total{action="say \\"hi\\"\\\\\\n"} 1' in metrics.to_prometheus()
+
+def test_chrome_trace_export(registry, tmp_path):
+    registry.execute_action('outer')
+    path = registry.metrics.export(format="chrome", path=str(tmp_path / "trace.json"))
+    with open(path) as file:
+        events = json.load(file)["traceEvents"]
+    assert [event["name"] for event in events] == ["outer", "inner", "inner"]
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    outer = events[0]
+    assert all(outer["ts"] <= event["ts"] <= outer["ts"] + outer["dur"] for event in events[1:])
+
+def test_unknown_export_format(registry):
+    with pytest.raises(ValueError):
+        registry.metrics.export(format="csv")
@@ -0,0 +1,46 @@
+# tests/test_action_store.py
+import pytest
+
+from action_store import ActionStore, JsonActionStore, SqliteActionStore, create_action_store
+
+SOURCE = "def {name}():\n    return {value!r}\n"
+
+def test_store_must_implement_the_abstract_methods():
+    with pytest.raises(TypeError):
+        ActionStore()
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_action_store({'backend': "redis"})
+
+@pytest.fixture(params=["sqlite", "json"])
+def action_store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SqliteActionStore(str(tmp_path / "actions.sqlite"))
+    else:
+        store = JsonActionStore(str(tmp_path / "actions"))
+    yield store
+    store.close()
+
+def test_action_revision_grows_across_remove_and_add(action_store):
+    action_store.put("greet", "greet", SOURCE.format(name="greet", value="hi"))
+    first = action_store.revision("greet")
+    action_store.put("greet", "greet", SOURCE.format(name="greet", value="hello"))
+    second = action_store.revision("greet")
+    assert second > first
+    assert action_store.remove("greet")
+    assert action_store.revision("greet") is None
+    action_store.put("greet", "greet", SOURCE.format(name="greet", value="hey"))
+    third = action_store.revision("greet")
+    assert third > second
+    assert action_store.get("greet").source == SOURCE.format(name="greet", value="hey")
+
+def test_json_action_store_sees_other_writers(tmp_path):
+    directory = str(tmp_path / "actions")
+    reader, writer = JsonActionStore(directory), JsonActionStore(directory)
+    assert reader.names() == []
+    writer.put("greet", "greet", SOURCE.format(name="greet", value="hi"))
+    assert reader.names() == ["greet"]
+    assert reader.revision("greet") == writer.revision("greet")
+    writer.remove("greet")
+    assert reader.get("greet") is None
@@ -0,0 +1,50 @@
+# tests/test_agent.py
+import contextlib
+import io
+import threading
+
+from conftest import ANSWER
+from fake_llm import FakeLLMClient
+
+def run_agent(core, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return core.execute('python_agent_exe', task='list the directory', **kwargs)
+
+def outputs(results):
+    return [result['output'] for result in results]
+
+def test_streaming_agent_runs_every_block(core):
+    results = run_agent(core, stream=True)
+    assert outputs(results) == ["first\n", "3\n"]
+    assert core.get('answer') == ANSWER
+    assert [code for (code,) in core.get('snippets')] == ["print('first')\n", "import sys\nprint(sys.version_info[0])\n"]
+
+def test_streaming_matches_buffered_agent(core):
+    assert outputs(run_agent(core, stream=True)) == outputs(run_agent(core, stream=False))
+
+def test_streaming_executes_first_block_before_answer_ends(core):
+    client = FakeLLMClient(ANSWER, chunk_size=4, token_delay=0.002)
+    core.set('llm_client', client)
+    executed = []
+    answer_done = threading.Event()
+    original_stream = client._stream
+
+    def stream(model, answer):
+        yield from original_stream(model, answer)
+        answer_done.set()
+
+    client._stream = stream
+    code_action = core.action('execute_code_snippet')
+
+    def record(code, *args, **kwargs):
+        executed.append(answer_done.is_set())
+        return code_action(code, *args, **kwargs)
+
+    plugin = core.plugin_layer.registry.actions['python_agent_exe']
+    plugin.action = lambda name: record if name == 'execute_code_snippet' else core.action(name)
+    run_agent(core, stream=True)
+    assert executed[0] is False
+
+def test_streaming_agent_with_split_fences(core):
+    core.set('llm_client', FakeLLMClient(ANSWER, chunk_size=1))
+    assert outputs(run_agent(core, stream=True)) == ["first\n", "3\n"]
@@ -0,0 +1,67 @@
+# tests/test_async_execution.py
+import asyncio
+import contextlib
+import io
+import threading
+
+from conftest import ANSWER
+
+def outputs(results):
+    return [result['output'] for result in results]
+
+def test_sync_actions_run_off_the_loop_thread(core):
+    threads = []
+
+    class Probe:
+        actions = {'probe': lambda: threads.append(threading.get_ident()) or "done"}
+
+        def get_actions(self):
+            return list(self.actions)
+
+    core.plugin_layer.registry.register_plugin(Probe())
+
+    async def main():
+        return await core.aexecute('probe'), threading.get_ident()
+
+    result, loop_thread = asyncio.run(main())
+    assert result == "done" and threads[0] != loop_thread
+
+def test_async_agent_runs_concurrently_in_scopes(core, capsys):
+    async def main():
+        async def one(task):
+            with core.scope():
+                return await core.aexecute('apython_agent_exe', task=task, model='fake', bypass_cache=True)
+        return await asyncio.gather(*[one(f"task {index}") for index in range(4)])
+
+    results = asyncio.run(main())
+    assert [outputs(result) for result in results] == [["first\n", "3\n"]] * 4
+    # Prompts and results are only printed in debug mode.
+    assert capsys.readouterr().out == ""
+
+def test_async_agent_keeps_the_loop_free(core):
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.001)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        result = await core.aexecute('apython_agent_exe', task="list the directory", model='fake', bypass_cache=True)
+        task.cancel()
+        return result
+
+    assert outputs(asyncio.run(main())) == ["first\n", "3\n"]
+    assert ticks
+
+def test_async_agent_publishes_answer_and_snippets(core):
+    result = asyncio.run(core.aexecute('apython_agent_exe', task='list the directory', model='fake'))
+    assert outputs(result) == ["first\n", "3\n"]
+    assert core.get('answer') == ANSWER
+    assert len(core.get('snippets')) == 2
+
+def test_async_action_runs_through_execute(core):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = core.execute('apython_agent_exe', task='list the directory', model='fake')
+    assert outputs(result) == ["first\n", "3\n"]
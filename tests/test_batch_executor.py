@@ -0,0 +1,34 @@
+# tests/test_batch_executor.py
+import contextlib
+import io
+
+import pytest
+
+from conftest import ANSWER
+
+def run_batch(core, inputs, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sorted(core.execute_many('python_agent_exe', inputs, **options), key=lambda result: result.index)
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_batch_runs_every_item(core, executor):
+    inputs = [{'prompt': f"prompt {index}", 'model': 'fake'} for index in range(6)]
+    results = sorted(core.execute_many('llm_chat', inputs, max_concurrency=3, executor=executor), key=lambda result: result.index)
+    assert [result.index for result in results] == list(range(6))
+    assert all(result.ok for result in results)
+    assert [result.value for result in results] == [ANSWER] * 6
+
+def test_batch_runs_the_agent(core):
+    results = run_batch(core, [{'task': f"task {index}", 'model': 'fake'} for index in range(4)], max_concurrency=2)
+    assert all(result.ok for result in results)
+    assert all(result.value[0]["output"] == "first\n" for result in results)
+
+def test_items_do_not_leak_into_the_shared_container(core):
+    run_batch(core, [{'task': "batch task", 'model': 'fake'}], max_concurrency=2)
+    assert core.get('task') is None
+    assert core.get('answer') is None
+
+def test_failures_are_reported_per_item(core):
+    results = sorted(core.execute_many('no_such_action', [1, 2]), key=lambda result: result.index)
+    assert [result.ok for result in results] == [False, False]
+    assert "no_such_action" in results[0].error
@@ -0,0 +1,37 @@
+# tests/test_code_block_extractor.py
+import pytest
+
+from code_block_extractor import CodeBlock, StreamingCodeBlockExtractor, extract_code_blocks
+from conftest import ANSWER
+
+def feed_in_chunks(text, size, **options):
+    extractor = StreamingCodeBlockExtractor(**options)
+    blocks = []
+    for start in range(0, len(text), size):
+        blocks.extend(extractor.feed(text[start:start + size]))
+    return blocks + extractor.close()
+
+def test_extracts_python_blocks():
+    assert extract_code_blocks(ANSWER) == [CodeBlock("python", "print('first')\n"),
+                                           CodeBlock("python", "import sys\nprint(sys.version_info[0])\n")]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_chunk_boundaries_do_not_change_blocks(size):
+    assert feed_in_chunks(ANSWER, size) == extract_code_blocks(ANSWER)
+
+def test_other_languages_are_skipped_unless_requested():
+    text = "```bash\nls\n```\n```py\nprint(1)\n```\n"
+    assert extract_code_blocks(text) == [CodeBlock("py", "print(1)\n")]
+    assert [block.language for block in extract_code_blocks(text, languages=None)] == ["bash", "py"]
+
+def test_unterminated_block_is_dropped():
+    assert extract_code_blocks("```python\nprint('never closed')\n") == []
+
+def test_oversized_block_is_dropped():
+    text = "```python\n" + "x = 1\n" * 100 + "```\n```python\nprint(2)\n```\n"
+    assert feed_in_chunks(text, 16, max_block_size=64) == [CodeBlock("python", "print(2)\n")]
+
+def test_block_is_returned_as_soon_as_it_closes():
+    extractor = StreamingCodeBlockExtractor()
+    assert extractor.feed("Intro\n```python\nprint(1)\n") == []
+    assert extractor.feed("```\nmore prose") == [CodeBlock("python", "print(1)\n")]
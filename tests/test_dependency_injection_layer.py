@@ -0,0 +1,81 @@
+# tests/test_dependency_injection_layer.py
+import threading
+import time
+
+from dependency_injection_layer import DependencyInjectionLayer, deep_size
+
+def test_scope_writes_stay_in_the_scope():
+    container = DependencyInjectionLayer()
+    container.set('task', "shared")
+    with container.scope(model="scoped"):
+        container.set('task', "private")
+        assert container.get('task') == "private"
+        assert container.get('model') == "scoped"
+    assert container.get('task') == "shared"
+    assert container.get('model') is None
+
+def test_scopes_are_isolated_between_threads():
+    container = DependencyInjectionLayer()
+    seen = {}
+
+    def run(name):
+        with container.scope():
+            container.set('answer', name)
+            time.sleep(0.01)
+            seen[name] = container.get('answer')
+
+    threads = [threading.Thread(target=run, args=(f"thread {index}",)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen == {name: name for name in seen} and len(seen) == 4
+
+def test_least_recently_used_evictable_key_goes_first():
+    container = DependencyInjectionLayer(max_bytes=deep_size("x" * 1000) * 2 + 100, evictable=['a', 'b', 'c'])
+    container.set('a', "a" * 1000)
+    container.set('b', "b" * 1000)
+    container.get('a')
+    container.set('c', "c" * 1000)
+    assert container.get('b') is None
+    assert container.get('a') is not None and container.get('c') is not None
+    assert container.stats()["evictions"] == 1
+
+def test_keys_outside_the_evictable_set_are_kept():
+    container = DependencyInjectionLayer(max_bytes=10, evictable=['a'])
+    container.set('kept', "k" * 1000)
+    container.set('a', "a" * 1000)
+    assert container.get('kept') is not None
+
+def test_expired_keys_are_swept_on_write_without_a_budget():
+    container = DependencyInjectionLayer(ttl={'session': 0.01})
+    container.set('session', {"user": "a"})
+    time.sleep(0.02)
+    container.set('other', 1)
+    assert 'session' not in container.data
+    assert container.counters["expirations"] == 1
+
+def test_overwritten_key_keeps_its_new_expiry():
+    container = DependencyInjectionLayer()
+    container.set('token', "old", ttl=0.01)
+    container.set('token', "new", ttl=60)
+    time.sleep(0.02)
+    container.set('other', 1)
+    assert container.get('token') == "new"
+
+def test_expiry_heap_stays_bounded_under_overwrites():
+    container = DependencyInjectionLayer(ttl={'answer': 60})
+    for index in range(1000):
+        container.set('answer', index)
+    assert len(container.expiry) < 100
+
+def test_infrastructure_keys_are_pinned():
+    container = DependencyInjectionLayer(max_bytes=10, evictable=['config'])
+    container.set('config', {"debug": False})
+    container.set('other', "o" * 1000)
+    assert container.get('config') == {"debug": False}
+    assert 'config' not in container.entries
+
+def test_deep_size_stops_at_max_objects():
+    values = [[index] for index in range(1000)]
+    assert deep_size(values, max_objects=10) < deep_size(values, max_objects=5000)
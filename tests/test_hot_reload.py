@@ -0,0 +1,65 @@
+# tests/test_hot_reload.py
+import contextlib
+import io
+import json
+import os
+import shutil
+import threading
+
+from conftest import ROOT, make_config
+from core_system import CoreSystem
+from hot_reload import FileWatcher
+
+def make_core(tmp_path):
+    shutil.copytree(os.path.join(ROOT, "data", "templates"), tmp_path / "templates")
+    shutil.copytree(os.path.join(ROOT, "data", "strings"), tmp_path / "strings")
+    config = make_config(tmp_path, template_dir=str(tmp_path / "templates"), string_dir=str(tmp_path / "strings"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return CoreSystem(config)
+
+def test_watcher_survives_a_failing_callback(tmp_path):
+    calls = []
+    called = threading.Event()
+
+    def callback(changed):
+        calls.append(changed)
+        called.set()
+        if len(calls) == 1:
+            raise ValueError("malformed file")
+
+    watcher = FileWatcher([str(tmp_path)], callback, interval=0.01).start()
+    try:
+        for name in ("first.json", "second.json"):
+            called.clear()
+            (tmp_path / name).write_text("{}")
+            assert called.wait(5)
+        assert watcher.thread.is_alive()
+        assert len(calls) == 2
+    finally:
+        watcher.stop()
+
+def test_malformed_string_file_is_reported(tmp_path):
+    core = make_core(tmp_path)
+    path = tmp_path / "strings" / "dev_strings.json"
+    path.write_text('{"python_dev_intro": "unterminated')
+    summary = core.reload(str(path))
+    assert summary["strings"] == []
+    assert len(summary["errors"]) == 1 and str(path) in summary["errors"][0]
+
+def test_changed_string_is_served_after_reload(tmp_path):
+    core = make_core(tmp_path)
+    path = tmp_path / "strings" / "dev_strings.json"
+    strings = json.loads(path.read_text())
+    strings["python_dev_intro"] = "context: reloaded"
+    path.write_text(json.dumps(strings))
+    summary = core.reload(str(path))
+    assert summary["errors"] == [] and summary["strings"] == ["dev_strings.json"]
+    assert core.execute('get_string', "python_dev_intro") == "context: reloaded"
+
+def test_reloaded_core_plugin_keeps_its_configured_directories(tmp_path):
+    core = make_core(tmp_path)
+    summary = core.reload(os.path.join(ROOT, "base_plugin_lib", "string_manager.py"))
+    assert summary["errors"] == []
+    string_manager = core.get('string_manager')
+    assert os.path.abspath(string_manager.template_dir) == str(tmp_path / "templates")
+    assert os.path.abspath(string_manager.string_dir) == str(tmp_path / "strings")
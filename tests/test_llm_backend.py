@@ -0,0 +1,100 @@
+# tests/test_llm_backend.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fake_llm import FakeLLMClient, FakeLLMServer
+from llm_backend import ClientBackend, LLMBackend, OllamaBackend
+
+class SlowClient:
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = 0
+
+    def chat(self, model, messages, stream=False, options=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {'message': {'content': f"answer {self.calls}"}}
+
+class FlakyClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def chat(self, model, messages, stream=False, options=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        return {'message': {'content': "ok"}}
+
+def test_backend_must_implement_chat():
+    with pytest.raises(TypeError):
+        LLMBackend()
+
+def test_identical_requests_share_one_call():
+    client = SlowClient()
+    backend = ClientBackend(client)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(backend.chat('m', 'p'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["answer 1"] * 4
+    assert client.calls == 1
+    stats = backend.get_stats()
+    assert stats["requests"] == 4 and stats["coalesced"] == 3
+
+def test_connection_errors_are_retried():
+    client = FlakyClient(failures=2)
+    backend = ClientBackend(client, retries=2, backoff=0.0)
+    assert backend.chat('m', 'p') == "ok"
+    assert backend.get_stats()["retries"] == 2
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    client = SlowClient()
+    backend = ClientBackend(client)
+
+    async def main():
+        leader = asyncio.create_task(backend.achat('m', 'p'))
+        await asyncio.sleep(0.02)
+        followers = [asyncio.create_task(backend.achat('m', 'p')) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    answers = asyncio.run(main())
+    assert len(set(answers)) == 1
+    assert client.calls == 2
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    backend = ClientBackend(SlowClient())
+
+    async def main():
+        leader = asyncio.create_task(backend.achat('m', 'p'))
+        await asyncio.sleep(0.02)
+        waiters = [asyncio.create_task(backend.achat('m', 'p')) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        waiters[0].cancel()
+        return await leader, await waiters[1]
+
+    assert asyncio.run(main()) == ("answer 1", "answer 1")
+
+def test_ollama_backend_closes_sync_and_async_clients():
+    with FakeLLMServer(FakeLLMClient("hello")) as server:
+        backend = OllamaBackend(host=server.url)
+        assert backend.chat('m', 'p') == "hello"
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(backend.achat('m', 'q')) == "hello"
+            client = backend.async_clients[loop]
+            backend.close()
+            assert client._client.is_closed
+        finally:
+            loop.close()
+        assert backend.client._client.is_closed
+        assert len(backend.async_clients) == 0
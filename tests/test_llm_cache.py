@@ -0,0 +1,50 @@
+# tests/test_llm_cache.py
+from llm_cache import ResponseCache
+
+def test_response_cache_memory_and_disk_tiers(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path, memory_entries=1)
+    key = cache.make_key('m', 'prompt', {'temperature': 0})
+    assert cache.get(key) is None
+    cache.set(key, "answer", 'm')
+    assert cache.get(key) == "answer"
+    cache.set(cache.make_key('m', 'other'), "other", 'm')
+    assert cache.get(key) == "answer"
+    assert ResponseCache(path).get(key) == "answer"
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 1 and stats["disk_hits"] == 1 and stats["misses"] == 1
+
+def test_response_cache_key_depends_on_options():
+    assert ResponseCache.make_key('m', 'p', {'temperature': 0}) != ResponseCache.make_key('m', 'p', {'temperature': 1})
+
+def accessed(cache, key):
+    return cache._connection().execute("SELECT accessed FROM responses WHERE key = ?", (key,)).fetchone()[0]
+
+def test_memory_hits_refresh_disk_access_time(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), touch_interval=0)
+    key = cache.make_key('m', 'hot')
+    cache.set(key, "answer", 'm')
+    before = accessed(cache, key)
+    assert cache.get(key) == "answer"
+    assert cache.get_stats()["memory_hits"] == 1
+    assert accessed(cache, key) > before
+
+def test_memory_hit_disk_updates_are_throttled(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), touch_interval=3600)
+    key = cache.make_key('m', 'hot')
+    cache.set(key, "answer", 'm')
+    before = accessed(cache, key)
+    assert cache.get(key) == "answer"
+    assert accessed(cache, key) == before
+
+def test_disk_eviction_keeps_entries_hot_in_memory(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path, touch_interval=0)
+    hot, cold = cache.make_key('m', 'hot'), cache.make_key('m', 'cold')
+    cache.set(hot, "h" * 1000, 'm')
+    cache.set(cold, "c" * 1000, 'm')
+    assert cache.get(hot) == "h" * 1000
+    other = ResponseCache(path, max_bytes=1500)
+    other.set(other.make_key('m', 'new'), "n" * 10, 'm')
+    assert other.get(hot) == "h" * 1000
+    assert other.get(cold) is None
@@ -0,0 +1,61 @@
+# tests/test_logger.py
+import logging
+import os
+import threading
+
+import pytest
+
+from logger import LoggerFactory
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+@pytest.fixture
+def root_handler():
+    handler = Collect()
+    logging.getLogger().addHandler(handler)
+    yield handler
+    logging.getLogger().removeHandler(handler)
+    LoggerFactory.configure()
+
+def test_unknown_level_name_is_rejected():
+    with pytest.raises(ValueError, match="verbose"):
+        LoggerFactory.configure(levels={'PluginRegistry': 'verbose'})
+
+def test_level_names_are_case_insensitive():
+    LoggerFactory.configure(levels={'LoggerTestLevels': 'warning'})
+    assert LoggerFactory.create_logger('LoggerTestLevels').level == logging.WARNING
+    LoggerFactory.configure()
+
+def test_records_reach_root_handlers(root_handler):
+    LoggerFactory.configure()
+    LoggerFactory.create_logger('LoggerTestPropagate').warning("visible")
+    assert root_handler.messages == ["visible"]
+
+def test_propagation_can_be_turned_off(root_handler):
+    logger = LoggerFactory.create_logger('LoggerTestQueueOnly')
+    LoggerFactory.configure(propagate=False)
+    logger.warning("queue only")
+    assert root_handler.messages == []
+
+def test_suspended_process_forks_children_with_their_own_listener():
+    LoggerFactory.configure()
+    pid = os.fork()
+    if pid == 0:
+        # Acts as the prefork zygote: no listener thread while it forks, one in every child it forks.
+        code = 1
+        try:
+            LoggerFactory.suspend()
+            if threading.active_count() == 1:
+                child = os.fork()
+                if child == 0:
+                    os._exit(0 if LoggerFactory._listener is not None and threading.active_count() == 2 else 1)
+                code = os.waitstatus_to_exitcode(os.waitpid(child, 0)[1])
+        finally:
+            os._exit(code)
+    assert os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) == 0
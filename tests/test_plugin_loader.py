@@ -0,0 +1,65 @@
+# tests/test_plugin_loader.py
+import contextlib
+import io
+import json
+import os
+import sys
+
+from conftest import ROOT, make_config
+from core_system import CoreSystem
+from plugin_loader import INDEX_VERSION, PluginLoader
+
+SOURCE = """from plugin_base import PluginBase
+
+class {name}Plugin(PluginBase):
+    def __init__(self, di_container, debug=False):
+        super().__init__(di_container, debug)
+        self.register_action('{action}', lambda *args, **kwargs: {value!r})
+"""
+
+def write_plugin(directory, name, action, value):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name.lower() + ".py")
+    with open(path, "w") as file:
+        file.write(SOURCE.format(name=name, action=action, value=value))
+    return os.path.normpath(path)
+
+def test_index_is_built_and_persisted(tmp_path):
+    path = write_plugin(str(tmp_path / "plugins"), "Greet", "greet", "hi")
+    index = str(tmp_path / "index.json")
+    actions, eager = PluginLoader([str(tmp_path / "plugins")], index_path=index).build_index()
+    assert actions == {"greet": (path, "GreetPlugin")}
+    assert eager == []
+    with open(index) as file:
+        stored = json.load(file)
+    assert stored["version"] == INDEX_VERSION
+    assert stored["files"][path]["classes"] == [{"name": "GreetPlugin", "actions": ["greet"], "dynamic": False}]
+    assert PluginLoader.module_name(path) not in sys.modules
+
+def test_stale_index_entries_are_rebuilt(tmp_path):
+    directory = str(tmp_path / "plugins")
+    path = write_plugin(directory, "Greet", "greet", "hi")
+    index = str(tmp_path / "index.json")
+    PluginLoader([directory], index_path=index).build_index()
+    write_plugin(directory, "Greet", "welcome", "hello there")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+    actions, _ = PluginLoader([directory], index_path=index).build_index()
+    assert actions == {"welcome": (path, "GreetPlugin")}
+    with open(index) as file:
+        assert json.load(file)["files"][path]["classes"][0]["actions"] == ["welcome"]
+
+def test_lazy_plugins_are_imported_on_first_use(tmp_path):
+    directory = str(tmp_path / "plugins")
+    path = write_plugin(directory, "Farewell", "farewell", "bye")
+    config = make_config(tmp_path, lazy_plugins=True, plugin_index=str(tmp_path / "index.json"),
+                         plugin_directory=[os.path.join(ROOT, "base_plugin_lib"), directory])
+    with contextlib.redirect_stdout(io.StringIO()):
+        core = CoreSystem(config)
+    try:
+        assert os.path.exists(tmp_path / "index.json")
+        assert PluginLoader.module_name(path) not in sys.modules
+        assert "farewell" in core.plugin_layer.registry.lazy_actions
+        assert core.execute('farewell') == "bye"
+        assert PluginLoader.module_name(path) in sys.modules
+    finally:
+        core.reloader.stop()
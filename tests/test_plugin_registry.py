@@ -0,0 +1,48 @@
+# tests/test_plugin_registry.py
+import pytest
+
+from custom_exceptions import PluginRegistryError
+from plugin_registry import PluginRegistry
+
+class Plugin:
+    def __init__(self, **actions):
+        self.actions = actions
+
+    def get_actions(self):
+        return list(self.actions)
+
+def test_resolved_actions_are_cached_in_the_dispatch_table():
+    registry = PluginRegistry()
+    registry.register_plugin(Plugin(greet=lambda name: f"hello {name}"))
+    assert registry.execute_action('greet', "bob") == "hello bob"
+    assert registry.resolve('greet') is registry.dispatch_table['greet']
+
+def test_handle_follows_a_re_registered_action():
+    registry = PluginRegistry()
+    registry.register_plugin(Plugin(greet=lambda: "old"))
+    handle = registry.handle('greet')
+    assert handle() == "old"
+    version = registry.version
+    registry.register_plugin(Plugin(greet=lambda: "new"))
+    assert registry.version > version
+    assert 'greet' not in registry.dispatch_table
+    assert handle() == "new"
+
+def test_unknown_action_raises():
+    with pytest.raises(PluginRegistryError, match="missing"):
+        PluginRegistry().resolve('missing')
+
+def test_async_actions_run_synchronously_through_resolve():
+    async def greet():
+        return "async hello"
+
+    registry = PluginRegistry()
+    registry.register_plugin(Plugin(greet=greet))
+    assert registry.execute_action('greet') == "async hello"
+
+def test_core_handles_survive_plugin_reloads(core):
+    handle = core.action('container_get')
+    core.set('task', "before")
+    assert handle('task') == "before"
+    core.plugin_layer.registry.register_plugin(Plugin(container_get=lambda key: f"replaced {key}"))
+    assert handle('task') == "replaced task"
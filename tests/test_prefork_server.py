@@ -0,0 +1,49 @@
+# tests/test_prefork_server.py
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from conftest import ANSWER
+
+SLEEP = "import time\ntime.sleep(30)"
+
+@pytest.fixture
+def server(core):
+    server = core.serve(workers=1, port=0, timeout=10.0, shutdown_timeout=1.0)
+    yield server
+    server.stop()
+
+def post(server, payload):
+    request = urllib.request.Request(f"{server.url}/execute", json.dumps(payload).encode("utf-8"),
+                                     {"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_executes_actions_over_http(server):
+    status, body = post(server, {"action": "llm_chat", "kwargs": {"prompt": "hello", "model": "fake"}})
+    assert status == 200 and body["value"] == ANSWER
+
+@pytest.mark.parametrize("timeout", ["abc", -1, 0, True, [1]])
+def test_invalid_timeout_is_a_bad_request(server, timeout):
+    status, body = post(server, {"action": "llm_chat", "kwargs": {"prompt": "hello"}, "timeout": timeout})
+    assert status == 400 and "timeout" in body["error"]
+
+def test_submit_rejects_invalid_timeout(server):
+    with pytest.raises(ValueError):
+        server.submit('llm_chat', prompt="hello", timeout="1")
+
+def test_timed_out_worker_is_replaced(server):
+    status, _ = post(server, {"action": "execute_code_snippet", "args": [SLEEP], "timeout": 0.5})
+    assert status == 504
+    assert server.execute('llm_chat', prompt="again", model="fake") == ANSWER
+    stats = server.stats()
+    assert stats["timeouts"] == 1 and stats["restarts"] >= 1
+
+def test_unknown_action_is_a_server_error(server):
+    status, body = post(server, {"action": "no_such_action"})
+    assert status == 500 and "no_such_action" in body["error"]
@@ -0,0 +1,78 @@
+# tests/test_run_store.py
+import contextlib
+import io
+import time
+
+import pytest
+
+from custom_exceptions import CoreSystemError
+from run_store import RunStore
+
+LONG_TASK = "a task long enough to be stored by reference"
+
+@pytest.fixture
+def store(tmp_path):
+    store = RunStore(str(tmp_path / "runs"), segment_records=4, block_records=2, inline_chars=16)
+    yield store
+    store.close()
+
+def record(store, task, model="fake", status="ok", started=None):
+    results = [{"status": status, "output": "out\n", "error": ""}]
+    return store.record(started or time.time(), 0.5, model=model, template="python_dev_final.j2", task=task,
+                        prompt=f"prompt for {task}", answer="answer", snippets=["print(1)"], results=results,
+                        timings={"llm": 0.25})
+
+def test_scan_filters_and_projects(store):
+    now = time.time()
+    for index in range(10):
+        record(store, f"task {index}", model="a" if index % 2 else "b", started=now + index)
+    runs = list(store.scan(since=now + 5, model="a", fields=["task", "model"]))
+    assert runs == [{"task": "task 5", "model": "a"}, {"task": "task 7", "model": "a"}, {"task": "task 9", "model": "a"}]
+    assert len(list(store.scan(limit=3))) == 3
+
+def test_long_texts_resolve(store):
+    record(store, LONG_TASK)
+    (run,) = store.scan()
+    assert isinstance(run["task"], dict)
+    (resolved,) = store.scan(texts=True)
+    assert resolved["task"] == LONG_TASK
+
+def test_stats_group_referenced_texts_by_hash(store):
+    for _ in range(2):
+        record(store, LONG_TASK)
+    record(store, "short", status="error")
+    groups = store.stats(group_by="task")
+    (reference,) = store.scan(fields=["task"], limit=1)
+    assert groups[reference["task"]["sha256"]]["runs"] == 2
+    assert groups["short"]["statuses"] == {"error": 1}
+    assert groups["short"]["failure_rate"] == 1.0
+
+@pytest.mark.parametrize("column", ["snippets", "results", "timings", "missing"])
+def test_stats_reject_collection_columns(store, column):
+    with pytest.raises(ValueError, match="Cannot group runs"):
+        store.stats(group_by=column)
+
+def test_agent_runs_are_recorded(core, tmp_path):
+    core.set('run_store', RunStore(str(tmp_path / "agent_runs")))
+    core.execute('python_agent_exe', task="list the directory", model="fake")
+    (run,) = core.execute('query_runs', fields=["status", "model", "timings"])
+    assert run["status"] == "ok" and run["model"] == "fake"
+    assert set(run["timings"]) >= {"render", "llm", "extract", "execute"}
+    assert core.execute('run_stats', group_by="model")["fake"]["runs"] == 1
+
+class BrokenStreamClient:
+    def chat(self, model, messages, stream=False, options=None):
+        def chunks():
+            yield {'message': {'content': "```python\nprint(1)\n"}}
+            raise RuntimeError("stream dropped")
+        return chunks() if stream else {'message': {'content': "answer"}}
+
+def test_failed_streaming_runs_are_recorded_once(core, tmp_path):
+    core.set('run_store', RunStore(str(tmp_path / "agent_runs")))
+    core.set('llm_client', BrokenStreamClient())
+    with contextlib.redirect_stdout(io.StringIO()):
+        with pytest.raises(CoreSystemError, match="stream dropped"):
+            core.execute('python_agent_exe', task="list the directory", model="fake", stream=True)
+    (run,) = core.execute('query_runs', fields=["status", "error"])
+    assert run["status"] == "failed"
+    assert "stream dropped" in run["error"]
@@ -0,0 +1,102 @@
+# tests/test_snippet_executor.py
+import os
+import sys
+import threading
+
+import pytest
+
+from snippet_executor import OutputCapture, ProcessPoolSnippetExecutor, SnippetExecutor, create_executor, run_snippet
+
+SLEEP = "import sys, time\nprint('started', flush=True)\nprint('warning', file=sys.stderr, flush=True)\ntime.sleep(30)"
+
+@pytest.fixture
+def pool():
+    executor = create_executor({'backend': "process_pool", 'workers': 1, 'timeout': 1.0})
+    yield executor
+    executor.shutdown()
+
+def test_executor_must_implement_run():
+    with pytest.raises(TypeError):
+        SnippetExecutor()
+
+def test_captures_output_and_errors():
+    assert run_snippet("print('hi')")["output"] == "hi\n"
+    result = run_snippet("raise ValueError('bad')")
+    assert result["status"] == "error" and result["error"] == "bad"
+
+def test_output_is_bounded_to_the_tail():
+    result = run_snippet("for i in range(1000): print(i)", max_output=20)
+    assert result["output_truncated"]
+    assert result["output"].endswith("998\n999\n")
+    assert len(result["output"]) <= 20 + 100
+
+def test_capture_keeps_only_the_last_max_chars():
+    capture = OutputCapture("stdout", max_chars=10)
+    for index in range(100):
+        capture.write(f"{index:03d}\n")
+    assert capture.getvalue() == "7\n098\n099\n"
+    assert capture.truncated and capture.total == 400
+
+def test_spill_file_keeps_the_full_output(tmp_path):
+    result = run_snippet("import sys\nfor i in range(1000): print(i)\nprint('oops', file=sys.stderr)",
+                         max_output=20, spill=True, spill_dir=str(tmp_path))
+    assert result["output_truncated"]
+    with open(result["output_file"]) as file:
+        assert file.read() == "".join(f"{i}\n" for i in range(1000))
+    with open(result["error_file"]) as file:
+        assert file.read() == "oops\n"
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in (result["output_file"], result["error_file"]))
+
+def test_output_is_streamed_to_the_callback():
+    seen = []
+    create_executor({'backend': "inprocess"}).run("print('a'); print('b')", lambda stream, text: seen.append((stream, text)))
+    assert "".join(text for stream, text in seen if stream == "stdout") == "a\nb\n"
+
+def test_threads_capture_their_own_output():
+    stdout = sys.stdout
+    failures = []
+
+    def run(index):
+        for _ in range(50):
+            output = run_snippet(f"print({index})")["output"]
+            if output != f"{index}\n":
+                failures.append(output)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
+    assert sys.stdout is stdout
+
+def test_process_pool_runs_snippets(pool):
+    results = pool.run_many(["print(1)", "raise ValueError('bad')"])
+    assert results[0]["status"] == "ok" and results[0]["output"] == "1\n"
+    assert results[1]["status"] == "error" and results[1]["error"] == "bad"
+
+def test_timeout_keeps_partial_output_and_replaces_the_worker(pool):
+    # Output streamed back before the kill is still reported.
+    result = pool.run(SLEEP, lambda stream, text: None)
+    assert result["status"] == "timeout"
+    assert result["output"] == "started\n"
+    assert result["error"].startswith("warning\n") and "time limit" in result["error"]
+    assert pool.run("print(2)")["output"] == "2\n"
+
+def test_crashed_worker_is_replaced(pool):
+    assert pool.run("import os\nos._exit(1)")["status"] == "crashed"
+    assert pool.run("print(3)")["output"] == "3\n"
+
+def test_failing_callback_does_not_lose_the_worker(pool):
+    def callback(stream, text):
+        raise RuntimeError("consumer gone")
+
+    with pytest.raises(RuntimeError):
+        pool.run("print('a')\nprint('b')", callback)
+    assert pool.idle.qsize() == 1
+    assert pool.run("print(4)")["output"] == "4\n"
+
+@pytest.mark.parametrize("timeout", [None, 0, -1, "10", True])
+def test_invalid_timeout_is_rejected(timeout):
+    with pytest.raises(ValueError, match="timeout"):
+        ProcessPoolSnippetExecutor(workers=1, timeout=timeout)
@@ -0,0 +1,18 @@
+# tests/test_sqlite_util.py
+import threading
+
+import sqlite_util
+
+def test_connection_is_reused_per_thread_and_not_shared(tmp_path):
+    database = str(tmp_path / "db.sqlite")
+    local = threading.local()
+    first = sqlite_util.connection(local, database)
+    assert sqlite_util.connection(local, database) is first
+    assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(sqlite_util.connection(local, database)))
+    thread.start()
+    thread.join()
+    assert seen[0] is not first
+    sqlite_util.close(local)
+    assert sqlite_util.connection(local, database) is not first
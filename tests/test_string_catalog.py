@@ -0,0 +1,90 @@
+# tests/test_string_catalog.py
+import json
+import os
+
+import pytest
+
+from string_catalog import StringCatalog, locale_layers, scan_offsets
+
+def write_strings(directory, values, name="app"):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w") as file:
+        json.dump(values, file)
+    return path
+
+@pytest.fixture
+def string_dir(tmp_path):
+    directory = str(tmp_path / "strings")
+    write_strings(directory, {"greeting": "hello", "farewell": "bye", "title": "App"})
+    write_strings(directory, {"greeting": "hi dev"}, name="dev")
+    write_strings(os.path.join(directory, "fr"), {"greeting": "bonjour", "farewell": "au revoir"})
+    write_strings(os.path.join(directory, "fr_CA"), {"greeting": "allo"})
+    return directory
+
+def test_scan_offsets_points_at_each_value():
+    data = json.dumps({"a": "x", "é": [1, {"b": 2}]}, ensure_ascii=False).encode("utf-8")
+    for key, (offset, length) in scan_offsets(data).items():
+        assert json.loads(data[offset:offset + length]) == json.loads(data)[key]
+
+def test_locale_layers_fall_back_to_the_base():
+    assert locale_layers("fr_CA") == ("fr_CA", "fr", "")
+    assert locale_layers(None) == ("",)
+
+def test_locale_overlays_fall_back_layer_by_layer(string_dir, tmp_path):
+    catalog = StringCatalog(string_dir, str(tmp_path / "index.sqlite"))
+    assert catalog.get("app.greeting", locale="fr_CA") == "allo"
+    assert catalog.get("farewell", locale="fr_CA") == "au revoir"
+    assert catalog.get("title", locale="fr_CA") == "App"
+    assert catalog.get("missing", locale="fr_CA", default="?") == "?"
+
+def test_namespace_qualified_keys(string_dir, tmp_path):
+    catalog = StringCatalog(string_dir, str(tmp_path / "index.sqlite"))
+    # A bare key defined in several namespaces resolves to the last one in name order.
+    assert catalog.get("greeting") == "hi dev"
+    assert catalog.get("app.greeting") == "hello"
+    assert catalog.get("dev.greeting") == "hi dev"
+    assert catalog.get("nope.greeting") is None
+    assert catalog.namespace("app", locale="fr") == {"greeting": "bonjour", "farewell": "au revoir", "title": "App"}
+
+def test_edited_file_is_read_correctly_without_a_refresh(tmp_path):
+    directory = str(tmp_path / "strings")
+    write_strings(directory, {"a": "one", "b": "two"})
+    catalog = StringCatalog(directory, str(tmp_path / "index.sqlite"))
+    write_strings(directory, {"intro": "a much longer value that shifts every offset", "b": "changed"})
+    assert catalog.fetch("b", ("",)) == "changed"
+    assert catalog.fetch("intro", ("",)).startswith("a much longer")
+    with pytest.raises(KeyError):
+        catalog.fetch("a", ("",))
+
+def test_file_still_changing_after_a_refresh_is_parsed_whole(tmp_path, monkeypatch):
+    directory = str(tmp_path / "strings")
+    write_strings(directory, {"a": "one", "b": "two"})
+    catalog = StringCatalog(directory, str(tmp_path / "index.sqlite"))
+    write_strings(directory, {"intro": "a much longer value that shifts every offset", "b": "changed"})
+    monkeypatch.setattr(catalog, "refresh", lambda: [])
+    assert catalog.fetch("b", ("",)) == "changed"
+    assert catalog.fetch("app.b", ("",)) == "changed"
+
+def test_string_catalogs_sharing_an_index_stay_apart(tmp_path):
+    index = str(tmp_path / "index.sqlite")
+    write_strings(str(tmp_path / "a"), {"greeting": "hello"})
+    write_strings(str(tmp_path / "b"), {"greeting": "bonjour"})
+    first = StringCatalog(str(tmp_path / "a"), index)
+    second = StringCatalog(str(tmp_path / "b"), index)
+    assert first.get("greeting") == "hello"
+    assert second.get("greeting") == "bonjour"
+    assert first.keys(("",)) == ["greeting"]
+
+def test_string_catalog_sees_reindex_by_another_instance(tmp_path):
+    index = str(tmp_path / "index.sqlite")
+    directory = str(tmp_path / "strings")
+    write_strings(directory, {"greeting": "hello"})
+    first = StringCatalog(directory, index)
+    second = StringCatalog(directory, index)
+    assert first.get("greeting") == "hello"
+    write_strings(directory, {"greeting": "hello again"})
+    assert second.refresh() == ["app.json"]
+    # Nothing changed on disk since the other instance re-indexed, but the shared generation moved.
+    assert first.refresh() == []
+    assert first.get("greeting") == "hello again"
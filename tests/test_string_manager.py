@@ -0,0 +1,54 @@
+# tests/test_string_manager.py
+import contextlib
+import io
+import json
+import os
+
+import pytest
+
+from conftest import make_config
+from core_system import CoreSystem
+
+@pytest.fixture
+def string_core(tmp_path):
+    templates, strings = tmp_path / "templates", tmp_path / "strings"
+    templates.mkdir()
+    strings.mkdir()
+    (templates / "greet.j2").write_text("{{ greeting }}, {{ name }}!")
+    (templates / "intro.j2").write_text("{{ greeting }} from {{ name }}")
+    (strings / "app.json").write_text(json.dumps({"greeting": "hello", "name": "world"}))
+    config = make_config(tmp_path, template_dir=str(templates), string_dir=str(strings),
+                         template_bytecode_cache=str(tmp_path / "bytecode"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return CoreSystem(config)
+
+def render(core, template, **kwargs):
+    return core.execute('render_template', 'render_template', template, **kwargs)
+
+def test_warm_up_compiles_every_template(string_core):
+    names = string_core.execute('warm_up_templates')
+    assert sorted(names) == ["greet.j2", "intro.j2"]
+    string_manager = string_core.get('string_manager')
+    assert sorted(string_manager.templates) == ["greet.j2", "intro.j2"]
+    assert os.listdir(string_manager.env.bytecode_cache.directory)
+
+def test_compiled_template_is_reused(string_core):
+    render(string_core, "greet.j2")
+    string_manager = string_core.get('string_manager')
+    template = string_manager.templates["greet.j2"]
+    render(string_core, "greet.j2")
+    assert string_manager.templates["greet.j2"] is template
+
+def test_strings_fill_the_template_context(string_core):
+    assert render(string_core, "greet.j2") == "hello, world!"
+
+def test_keyword_arguments_override_strings(string_core):
+    assert render(string_core, "greet.j2", name="alice") == "hello, alice!"
+    # The override is per call; the strings layer itself is untouched.
+    assert render(string_core, "greet.j2") == "hello, world!"
+
+def test_invalidated_template_is_recompiled(string_core, tmp_path):
+    render(string_core, "greet.j2")
+    (tmp_path / "templates" / "greet.j2").write_text("{{ greeting }} again")
+    string_core.get('string_manager').invalidate_template("greet.j2")
+    assert render(string_core, "greet.j2") == "hello again"
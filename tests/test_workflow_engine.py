@@ -0,0 +1,88 @@
+# tests/test_workflow_engine.py
+import os
+
+import pytest
+
+from custom_exceptions import WorkflowError
+from workflow_engine import Workflow, WorkflowEngine
+
+RENDER = {
+    'inputs': {'task': None},
+    'steps': {
+        'prompt': {'action': 'render_template', 'args': ['render_template', 'python_dev_final.j2'], 'kwargs': {'task': '${task}'}},
+        'answer': {'action': 'llm_chat', 'kwargs': {'prompt': '${prompt}', 'model': 'fake'}},
+        'snippets': {'action': 'extract_markdown_python_code_blocks', 'container': {'answer': '${answer}'}, 'memoize': True},
+    },
+    'outputs': {'answer': '${answer}', 'snippets': '${snippets}'},
+}
+
+def test_steps_run_in_dependency_order_and_memoize_opted_in_steps(core):
+    engine = WorkflowEngine(core)
+    workflow = Workflow.from_dict(RENDER)
+    first = engine.run(workflow, {'task': "list files"})
+    second = engine.run(workflow, {'task': "list files"})
+    assert first["outputs"] == second["outputs"]
+    assert len(first["outputs"]["snippets"]) == 2
+    assert second["steps"]["snippets"]["cached"]
+    assert not second["steps"]["prompt"]["cached"] and not second["steps"]["answer"]["cached"]
+    engine.shutdown()
+
+def test_rendered_prompts_follow_template_edits(core, tmp_path):
+    template = tmp_path / "templates" / "note.j2"
+    template.parent.mkdir()
+    template.write_text("v1 {{ task }}")
+    plugin = core.get('string_manager')
+    plugin.env.loader.searchpath.append(str(template.parent))
+    engine = WorkflowEngine(core)
+    workflow = Workflow.from_dict({'inputs': {'task': None},
+                                   'steps': {'prompt': {'action': 'render_template', 'args': ['render_template', 'note.j2'],
+                                                        'kwargs': {'task': '${task}'}}},
+                                   'outputs': {'prompt': '${prompt}'}})
+    assert engine.run(workflow, {'task': "x"})["outputs"]["prompt"] == "v1 x"
+    template.write_text("v2 {{ task }}")
+    plugin.invalidate_template('note.j2')
+    assert engine.run(workflow, {'task': "x"})["outputs"]["prompt"] == "v2 x"
+
+def test_cycles_are_rejected():
+    with pytest.raises(WorkflowError, match="cycle"):
+        Workflow.from_dict({'steps': {'a': {'action': 'x', 'args': ['${b}']}, 'b': {'action': 'x', 'args': ['${a}']}}})
+
+def test_memo_is_a_bounded_lru():
+    engine = WorkflowEngine(None, memo_entries=2)
+    for key in ("a", "b"):
+        engine._memo_set(key, key)
+    assert engine._memo_get("a") == (True, "a")
+    engine._memo_set("c", "c")
+    assert list(engine.memo) == ["a", "c"]
+
+def test_memo_key_is_canonical():
+    key = WorkflowEngine.memo_key
+    assert key('act', [1], {'b': 2, 'a': 1}, {}) == key('act', [1], {'a': 1, 'b': 2}, {})
+    assert key('act', [1], {}, {}) != key('act', [1.5], {}, {})
+
+class Thing:
+    def __repr__(self):
+        return "Thing()"
+
+@pytest.mark.parametrize("value", [Thing(), {1: "int key"}, float("nan"), {"nested": [object()]}])
+def test_inputs_without_a_json_form_are_not_memoized(value):
+    assert WorkflowEngine.memo_key('act', [value], {}, {}) is None
+
+def test_int_and_string_keys_do_not_collide():
+    assert WorkflowEngine.memo_key('act', [{"1": "x"}], {}, {}) is not None
+    assert WorkflowEngine.memo_key('act', [{1: "x"}], {}, {}) is None
+
+def test_memo_dir_persists_between_engines(tmp_path):
+    WorkflowEngine(None, memo_dir=str(tmp_path))._memo_set("a", [1, 2])
+    assert WorkflowEngine(None, memo_dir=str(tmp_path))._memo_get("a") == (True, [1, 2])
+
+def test_memo_dir_is_trimmed_least_recently_used_first(tmp_path):
+    value = "x" * 1000
+    engine = WorkflowEngine(None, memo_dir=str(tmp_path), memo_dir_bytes=3500)
+    for index, key in enumerate(("a", "b", "c")):
+        engine._memo_set(key, value)
+        os.utime(tmp_path / f"{key}.pkl", ns=(index * 10**9, index * 10**9))
+    engine._memo_get("a")
+    engine._memo_set("d", value)
+    assert sorted(os.listdir(tmp_path)) == ["a.pkl", "c.pkl", "d.pkl"]
+    assert engine.memo_dir_size <= 3500
@@ -0,0 +1,311 @@
+# workflow_engine.py
+import contextvars
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set, Tuple
+from custom_exceptions import WorkflowError
+
+REFERENCE_PATTERN = re.compile(r"^\$\{([A-Za-z_]\w*)\}$")
+
+_process_core: Any = None
+
+def _execute_in_process(action: str, args: List[Any], kwargs: Dict[str, Any], container: Dict[str, Any]) -> Any:
+    with _process_core.scope(**container):
+        return _process_core.execute(action, *args, **kwargs)
+
+def _references(value: Any, found: Set[str]) -> Set[str]:
+    if isinstance(value, str):
+        match = REFERENCE_PATTERN.match(value)
+        if match:
+            found.add(match.group(1))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _references(item, found)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _references(item, found)
+    return found
+
+def _is_plain_json(value: Any) -> bool:
+    # Only values JSON encodes faithfully: no int dict keys turned into strings, no repr() of objects.
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain_json(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_plain_json(item) for key, item in value.items())
+    return False
+
+def _substitute(value: Any, values: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        match = REFERENCE_PATTERN.match(value)
+        return values[match.group(1)] if match else value
+    if isinstance(value, (list, tuple)):
+        return [_substitute(item, values) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, values) for key, item in value.items()}
+    return value
+
+class WorkflowStep:
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        if "action" not in spec:
+            raise WorkflowError(f"Workflow step '{name}' has no action.")
+        self.name = name
+        self.action: str = spec["action"]
+        self.args: List[Any] = spec.get("args", [])
+        self.kwargs: Dict[str, Any] = spec.get("kwargs", {})
+        self.container: Dict[str, Any] = spec.get("container", {})
+        # Opt-in: the memo key only covers the resolved inputs, not files or state an action reads (templates, strings).
+        self.memoize: bool = spec.get("memoize", False)
+        self.dependencies = _references([self.args, self.kwargs, self.container], set())
+
+class Workflow:
+    def __init__(self, name: str, inputs: Dict[str, Any], steps: Dict[str, WorkflowStep], outputs: Dict[str, Any]):
+        self.name = name
+        self.inputs = inputs
+        self.steps = steps
+        self.outputs = outputs
+        self._validate()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Workflow':
+        steps = {name: WorkflowStep(name, spec) for name, spec in data.get("steps", {}).items()}
+        return cls(data.get("name", "workflow"), data.get("inputs", {}), steps, data.get("outputs", {}))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Workflow':
+        with open(path, "r") as file:
+            data = json.load(file)
+        data.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+        return cls.from_dict(data)
+
+    def _validate(self) -> None:
+        known = set(self.inputs) | set(self.steps)
+        for name in set(self.inputs) & set(self.steps):
+            raise WorkflowError(f"Workflow '{self.name}' uses '{name}' as both an input and a step.")
+        for step in self.steps.values():
+            unknown = step.dependencies - known
+            if unknown:
+                raise WorkflowError(f"Step '{step.name}' references unknown values: {sorted(unknown)}")
+        unknown = _references(self.outputs, set()) - known
+        if unknown:
+            raise WorkflowError(f"Workflow '{self.name}' outputs reference unknown values: {sorted(unknown)}")
+        remaining = {name: step.dependencies & set(self.steps) for name, step in self.steps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise WorkflowError(f"Workflow '{self.name}' has a dependency cycle between {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+class WorkflowEngine:
+    def __init__(self, core_system: Any, executor: str = "thread", max_workers: Optional[int] = None,
+                 memo_dir: Optional[str] = None, memo_entries: int = 256, memo_dir_bytes: Optional[int] = 256 * 1024 * 1024):
+        self.core_system = core_system
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.memo_dir = memo_dir
+        self.memo_entries = memo_entries
+        self.memo_dir_bytes = memo_dir_bytes
+        self.memo: "OrderedDict[str, Any]" = OrderedDict()
+        self.memo_lock = threading.Lock()
+        self.pool: Optional[Executor] = None
+        self.memo_dir_size = 0
+        if memo_dir:
+            os.makedirs(memo_dir, exist_ok=True)
+            self.memo_dir_size = sum(size for _, size, _ in self._memo_files())
+
+    def _get_pool(self) -> Executor:
+        if self.pool is None:
+            if self.executor_kind == "thread":
+                self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="workflow")
+            elif self.executor_kind == "process":
+                if "fork" not in multiprocessing.get_all_start_methods():
+                    raise WorkflowError("The process executor needs the 'fork' start method to share the CoreSystem.")
+                global _process_core
+                _process_core = self.core_system
+                # Workers are forked from a process that has other threads running (reloader, log listener, pools).
+                # Locks those threads hold are copied in the held state; the logger re-arms itself after fork and
+                # the SQLite stores open one connection per pid, but actions sharing other locks with background
+                # threads can deadlock in a worker. Use the thread executor for such actions.
+                self.pool = ProcessPoolExecutor(max_workers=self.max_workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("fork"))
+            else:
+                raise WorkflowError(f"Unknown workflow executor '{self.executor_kind}'.")
+        return self.pool
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+    @staticmethod
+    def memo_key(action: str, args: List[Any], kwargs: Dict[str, Any], container: Dict[str, Any]) -> Optional[str]:
+        # Steps whose inputs have no canonical JSON form are not memoized.
+        inputs = [action, args, kwargs, container]
+        if not _is_plain_json(inputs):
+            return None
+        try:
+            payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"), allow_nan=False)
+        except ValueError:
+            return None
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _memo_get(self, key: str) -> Any:
+        path = os.path.join(self.memo_dir, f"{key}.pkl") if self.memo_dir else None
+        with self.memo_lock:
+            hit = key in self.memo
+            if hit:
+                self.memo.move_to_end(key)
+                value = self.memo[key]
+        if hit:
+            if path:
+                self._memo_touch(path)
+            return True, value
+        if path:
+            try:
+                with open(path, "rb") as file:
+                    value = pickle.load(file)
+            except FileNotFoundError:
+                return False, None
+            self._memo_touch(path)
+            self._memo_remember(key, value)
+            return True, value
+        return False, None
+
+    @staticmethod
+    def _memo_touch(path: str) -> None:
+        # Keeps the file's mtime current, so trimming memo_dir removes results that are cold in every engine first.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _memo_remember(self, key: str, value: Any) -> None:
+        with self.memo_lock:
+            self.memo[key] = value
+            self.memo.move_to_end(key)
+            while len(self.memo) > self.memo_entries:
+                self.memo.popitem(last=False)
+
+    def _memo_set(self, key: str, value: Any) -> None:
+        self._memo_remember(key, value)
+        if self.memo_dir:
+            path = os.path.join(self.memo_dir, f"{key}.pkl")
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "wb") as file:
+                    pickle.dump(value, file)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                os.remove(temp_path)
+                return
+            os.replace(temp_path, path)
+            with self.memo_lock:
+                self.memo_dir_size += os.path.getsize(path)
+                trim = self.memo_dir_bytes is not None and self.memo_dir_size > self.memo_dir_bytes
+            if trim:
+                self._memo_trim()
+
+    def _memo_files(self) -> List[Tuple[str, int, int]]:
+        files = []
+        for name in os.listdir(self.memo_dir):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.memo_dir, name))
+                except FileNotFoundError:
+                    continue
+                files.append((name, stat.st_size, stat.st_mtime_ns))
+        return files
+
+    def _memo_trim(self) -> None:
+        # The running size is only an estimate when several engines share memo_dir; rescan, then drop least recently used.
+        files = sorted(self._memo_files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        for name, size, _ in files:
+            if total <= self.memo_dir_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.memo_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self.memo_lock:
+            self.memo_dir_size = total
+
+    def _submit(self, step: WorkflowStep, args: List[Any], kwargs: Dict[str, Any], container: Dict[str, Any]) -> Future:
+        pool = self._get_pool()
+        if self.executor_kind == "process":
+            return pool.submit(_execute_in_process, step.action, args, kwargs, container)
+        context = contextvars.copy_context()
+        return pool.submit(context.run, self._execute_step, step.action, args, kwargs, container)
+
+    def _execute_step(self, action: str, args: List[Any], kwargs: Dict[str, Any], container: Dict[str, Any]) -> Any:
+        with self.core_system.scope(**container):
+            return self.core_system.execute(action, *args, **kwargs)
+
+    def run(self, workflow: Workflow, inputs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        values: Dict[str, Any] = dict(workflow.inputs)
+        values.update(inputs or {})
+        missing = [name for name in workflow.inputs if values.get(name) is None]
+        if missing:
+            raise WorkflowError(f"Workflow '{workflow.name}' is missing inputs: {missing}")
+
+        started = time.perf_counter()
+        pending = {name: step.dependencies & set(workflow.steps) for name, step in workflow.steps.items()}
+        running: Dict[Future, tuple] = {}
+        report: Dict[str, Dict[str, Any]] = {}
+
+        def complete(name: str, value: Any) -> None:
+            values[name] = value
+            for deps in pending.values():
+                deps.discard(name)
+
+        try:
+            while pending or running:
+                for name in [name for name, deps in pending.items() if not deps]:
+                    del pending[name]
+                    step = workflow.steps[name]
+                    args = _substitute(step.args, values)
+                    kwargs = _substitute(step.kwargs, values)
+                    container = _substitute(step.container, values)
+                    key = self.memo_key(step.action, args, kwargs, container) if step.memoize else None
+                    hit, value = self._memo_get(key) if key else (False, None)
+                    if hit:
+                        report[name] = {"action": step.action, "cached": True, "start": time.perf_counter() - started, "duration": 0.0}
+                        complete(name, value)
+                        continue
+                    running[self._submit(step, args, kwargs, container)] = (name, key, time.perf_counter())
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, key, step_started = running.pop(future)
+                    finished = time.perf_counter()
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        raise WorkflowError(f"Step '{name}' ({workflow.steps[name].action}) failed: {str(e)}") from e
+                    report[name] = {"action": workflow.steps[name].action, "cached": False,
+                                    "start": step_started - started, "duration": finished - step_started}
+                    if key:
+                        self._memo_set(key, value)
+                    complete(name, value)
+        finally:
+            for future in running:
+                future.cancel()
+
+        return {
+            "workflow": workflow.name,
+            "outputs": _substitute(workflow.outputs, values),
+            "steps": report,
+            "duration": time.perf_counter() - started,
+        }
@@ -0,0 +1,14 @@
+# workspace/serve.py
+from core_system import CoreSystem
+
+config = {
+    'plugin_directory': ["action_plugins", "base_plugin_lib"],
+    'template_dir': "data/templates/",
+    'string_dir': "data/strings/",
+    'debug': False,
+    'server': {'port': 8765, 'timeout': 120}
+}
+
+core = CoreSystem(config)
+core.set('model', 'llama3')
+core.serve().serve_forever()